@@ -1,8 +1,10 @@
 import argparse
 import datetime
+import os
 import sys
 
 TASKS_LOAD_TRANS = "load_transactions"
+TASKS_PIPELINE = "pipeline"
 
 
 def main():  # pragma: no cover
@@ -26,12 +28,26 @@ def create_known_arg_parser():  # pragma: no cover
     """
 
     parser = argparse.ArgumentParser(description="PyFynance Known Arguments parser")
+    task_group = parser.add_mutually_exclusive_group(required=True)
+    task_group.add_argument(
+        "--task_type", metavar="task_type", help="task_type", choices=[TASKS_LOAD_TRANS]
+    )
+    task_group.add_argument(
+        "--pipeline",
+        metavar="pipeline",
+        help="comma separated list of task types, or the path to a pipeline json file, to run in order",
+    )
     parser.add_argument(
-        "--task_type",
-        metavar="task_type",
-        help="task_type",
-        choices=[TASKS_LOAD_TRANS],
-        required=True,
+        "--task_workers",
+        metavar="task_workers",
+        help="number of pipeline tasks run at once, in dependency order",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--daemon",
+        help="keep running and load transaction files as they land in the landing folder",
+        action="store_true",
     )
     return parser
 
@@ -49,9 +65,24 @@ def create_load_tran_parser():
         "--institution", metavar="institution", help="institution", required=True
     )
     parser.add_argument("--account", metavar="account", help="account", required=True)
+    parser.add_argument(
+        "--workers",
+        metavar="workers",
+        help="number of processes used to parse the input files",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--input_glob",
+        metavar="input_glob",
+        help="file name pattern of the input files to load, such as 'cc_*.ofx'",
+    )
     return parser
 
 
+TASK_PARSERS = {TASKS_LOAD_TRANS: create_load_tran_parser}
+
+
 def parse_arguments(cmd_line_args):  # pragma: no cover
     """
     this method will setup and load the arguments using the Arg Parser class
@@ -60,15 +91,78 @@ def parse_arguments(cmd_line_args):  # pragma: no cover
     """
     known_args_parser = create_known_arg_parser()
     args, remaining_args = known_args_parser.parse_known_args(cmd_line_args)
-
-    if args.task_type == TASKS_LOAD_TRANS:
-        lt_parser = create_load_tran_parser()
-        lt_parser.parse_args(remaining_args, namespace=args)
-
     args.runtime = datetime.datetime.now()
 
+    if args.daemon and args.task_type != TASKS_LOAD_TRANS:
+        known_args_parser.error(
+            "argument --daemon: only allowed with --task_type {}".format(
+                TASKS_LOAD_TRANS
+            )
+        )
+
+    if args.task_workers != 1 and args.pipeline is None:
+        known_args_parser.error("argument --task_workers: only allowed with --pipeline")
+
+    if args.pipeline is not None:
+        args.task_type = TASKS_PIPELINE
+        args.steps = parse_pipeline_steps(
+            known_args_parser, args.pipeline, remaining_args, args.runtime
+        )
+    else:
+        task_parser = TASK_PARSERS[args.task_type]()
+        task_parser.parse_args(remaining_args, namespace=args)
+
     return args
 
 
+def parse_pipeline_steps(known_args_parser, pipeline, remaining_args, runtime):
+    """
+    this method will parse the arguments of each task in a pipeline. The pipeline is either a comma separated list of
+    task types, which are all given the remaining command line arguments, or the path to a pipeline json file, whose
+    task arguments are added to the remaining command line arguments. The scheduling values of each task, see
+    core.pipeline.check_pipeline_steps, are set on its arguments rather than parsed by its task parser.
+
+    :param known_args_parser: the parser of the known arguments, used to report invalid pipelines
+    :param pipeline: the value of the --pipeline argument
+    :param remaining_args: the command line arguments not parsed by the known arguments parser
+    :param runtime: the time the run started, shared by every task
+    :return: List of python objects containing the arguments of each task, in the order they are run
+    """
+
+    # delayed import for python path addition
+    from core.exceptions import PipelineError
+    from core.pipeline import SCHEDULE_KEYS, check_pipeline_steps, read_pipeline_file
+
+    try:
+        if os.path.isfile(pipeline):
+            pipeline_steps = read_pipeline_file(pipeline)
+        else:
+            pipeline_steps = check_pipeline_steps(
+                [{"task_type": task_type.strip()} for task_type in pipeline.split(",")],
+                "--pipeline",
+            )
+    except PipelineError as e:
+        known_args_parser.error(str(e))
+
+    steps = []
+    for pipeline_step in pipeline_steps:
+        task_type = pipeline_step["task_type"]
+        if task_type not in TASK_PARSERS:
+            known_args_parser.error(
+                "invalid pipeline task_type '{}' (choose from {})".format(
+                    task_type, ", ".join(sorted(TASK_PARSERS))
+                )
+            )
+        step_args = list(remaining_args)
+        for key, value in pipeline_step.items():
+            if key not in SCHEDULE_KEYS:
+                step_args += ["--{}".format(key), str(value)]
+        namespace = argparse.Namespace(
+            runtime=runtime, **{key: pipeline_step[key] for key in SCHEDULE_KEYS}
+        )
+        steps.append(TASK_PARSERS[task_type]().parse_args(step_args, namespace))
+    return steps
+
+
 if __name__ == "__main__":  # pragma: no cover
     main()
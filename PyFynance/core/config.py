@@ -1,5 +1,7 @@
 import os
-from pkg_resources import resource_string
+import threading
+from contextlib import contextmanager
+from importlib import resources
 from string import Template
 
 from schemas.config import ConfigSchema
@@ -20,24 +22,138 @@ class Configuration(object):
     the schemas.config module, as well as the configuration json from the resources/config module that holds all of
     the actual config values to be loaded.
 
+    The configuration is loaded once per process and shared by every Configuration object, which reads its values from
+    the shared configuration at the time they are accessed. The shared configuration is reloaded when a Configuration
+    object is created, or reload is called, after the config.json file has been modified, so long running processes
+    pick up changes without a restart. Configuration values are read only; tests change them with override.
+
+    .. code-block:: python
+
+        with Configuration.override({"paths.db_path": str(tmp_path)}):
+            db = Database()  # db._config.paths.db_path is tmp_path until the block exits
     """
 
+    _lock = threading.RLock()
+    _loaded_config = None
+    _loaded_mtime = None
+    _shared_config = None
+    _overrides = []
+
     def __init__(self):
         """
         Constructor of the configuration service object
         """
 
-        self._config = self._load_config()
+        self._config = None
+        self.reload()
 
     def __getattr__(self, item):
         """
-        returns an attribute from the private configuration object
+        returns an attribute from the shared configuration object, or from the configuration object this instance was
+        unpickled with
 
         :param item: the item to return
         :return: the value of the item name passed
         """
 
-        return getattr(self._config, item)
+        # _config is only missing while unpickling, e.g. when passed to a worker process
+        if item == "_config":
+            raise AttributeError(item)
+        return getattr(self._config or Configuration._shared_config, item)
+
+    def __getstate__(self):
+        """
+        returns the state to pickle, which is the configuration currently in use including any overrides, so that
+        worker processes see the same values as their parent
+
+        :return: Dictionary
+        """
+
+        return {"_config": self._config or Configuration._shared_config}
+
+    def reload(self):
+        """
+        this method will reload the shared configuration if the config.json file has been modified since it was last
+        loaded
+
+        :return: Boolean, True if the configuration was reloaded
+        """
+
+        config_mtime = os.stat(self._get_config_file_path()).st_mtime_ns
+        with Configuration._lock:
+            if config_mtime == Configuration._loaded_mtime:
+                return False
+            Configuration._loaded_config = self._load_config()
+            Configuration._loaded_mtime = config_mtime
+            Configuration._apply_overrides()
+            return True
+
+    @staticmethod
+    @contextmanager
+    def override(overrides):
+        """
+        this method will override configuration values for the duration of a with block. Overrides apply to every
+        Configuration object, including those created before the block, and are removed when the block exits.
+
+        .. code-block:: python
+
+            with Configuration.override({"database.sql_cache_size": 2, "ofx_parser.parallel_min_size": 0}):
+                ...
+
+        :param overrides: the values to override, keyed by the dotted path of the configuration value
+        :type overrides: Dictionary
+        :return: None
+        """
+
+        Configuration()
+        with Configuration._lock:
+            Configuration._overrides.append(overrides)
+            try:
+                Configuration._apply_overrides()
+            except AttributeError:
+                Configuration._overrides.remove(overrides)
+                raise
+        try:
+            yield
+        finally:
+            with Configuration._lock:
+                Configuration._overrides.remove(overrides)
+                Configuration._apply_overrides()
+
+    @staticmethod
+    def _apply_overrides():
+        """
+        this method will rebuild the shared configuration from the loaded configuration and the active overrides
+
+        :return: None
+        """
+
+        config = Configuration._loaded_config
+        for overrides in Configuration._overrides:
+            for path, value in overrides.items():
+                config = Configuration._replace_value(config, path.split("."), value)
+        Configuration._shared_config = config
+
+    @staticmethod
+    def _replace_value(config, path_elements, value):
+        """
+        this method will return a copy of the configuration object with the value at the path replaced, leaving the
+        original configuration object unchanged
+
+        :param config: the configuration object to copy
+        :param path_elements: the attribute names leading to the value to replace
+        :param value: the new value
+        :return: the copied configuration object
+        """
+
+        name = path_elements[0]
+        if not hasattr(config, name):
+            raise AttributeError("Configuration has no value '{}'".format(name))
+        if len(path_elements) > 1:
+            value = Configuration._replace_value(
+                getattr(config, name), path_elements[1:], value
+            )
+        return config.replace(**{name: value})
 
     def _get_repo_base_path(self):
         """
@@ -50,6 +166,19 @@ class Configuration(object):
         path_elements = full_path.split(os.sep)
         return os.sep.join(path_elements[: len(path_elements) - 3])
 
+    def _get_config_file_path(self):
+        """
+        this method will determine the full path to the config.json file
+
+        :return: the path to the config.json file
+        """
+
+        if hasattr(resources, "files"):
+            return str(resources.files("resources.config").joinpath("config.json"))
+        # importlib.resources.files is only available from python 3.9
+        with resources.path("resources.config", "config.json") as config_path:
+            return str(config_path)
+
     def _load_config(self):
         """
         this method will load the configuration information from the appropriate json file and substitute in the
@@ -58,10 +187,8 @@ class Configuration(object):
         :return: None
         """
 
-        config_resource_string = resource_string(
-            "resources.config", "config.json"
-        ).decode("utf-8")
-        config_json = self._substitute_params(config_resource_string)
+        with open(self._get_config_file_path(), encoding="utf-8") as config_file:
+            config_json = self._substitute_params(config_file.read())
         return ConfigSchema().loads(config_json.replace("\\", "\\\\"))
 
     def _substitute_params(self, input_string):
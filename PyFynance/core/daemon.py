@@ -0,0 +1,275 @@
+import argparse
+import datetime
+import logging
+import os
+import signal
+import threading
+import time
+
+from core.config import Configuration
+from core.exceptions import DatabaseError
+
+
+class DaemonDatabase:
+    """
+    The Daemon Database class wraps the Database service shared by the tasks run by the daemon, so that its
+    connections stay open between tasks and it is backed up on a schedule rather than by every task.
+
+    Each database is started the first time a task starts it, with that task's profile, and is stopped by close.
+    In between, a task stopping a database ends its unit of work:
+        * stop_db(commit=True) commits the task's changes, without backing up the database
+        * stop_db(commit=False) rolls back the task's changes
+
+    Only databases a committed task changed rows of are backed up, so files whose transactions were all loaded before
+    do not cause a backup.
+
+    Every other call is passed on to the wrapped Database.
+    """
+
+    def __init__(self, database):
+        """
+        initialises a new instance of the DaemonDatabase class
+
+        :param database: The Database service to keep started between tasks
+        :type database: Database
+        """
+
+        self._logger = logging.getLogger(__name__)
+        self._database = database
+        self._started = []
+        self._changed = set()
+        self._task_changes = {}
+
+    def __getattr__(self, item):
+        return getattr(self._database, item)
+
+    def start_db(self, db_name, current=True, profile=None, pooled=False):
+        """
+        This public method will start the database the first time it is called for it, and note how many rows the
+        connection has changed so far so that stop_db can tell whether the calling task changed any. See
+        Database.start_db.
+
+        :param db_name: The name of the database to start
+        :type db_name: String
+        :param current: Optional. Only the current database can be started by the daemon. Default value is True
+        :type current: Boolean
+        :param profile: Optional. The name of the performance profile to apply when the database is started. Default
+            value is None
+        :type profile: String
+        :param pooled: Optional. Pooled databases are not supported by the daemon. Default value is False
+        :type pooled: Boolean
+        :return: None
+        """
+
+        if pooled or not current:
+            raise DatabaseError(
+                "Database '{}' can only be started as the current, unpooled database by the daemon".format(
+                    db_name
+                )
+            )
+        if db_name not in self._started:
+            self._database.start_db(db_name, current, profile)
+            self._started.append(db_name)
+        self._task_changes[db_name] = self._database.total_changes(db_name)
+
+    def stop_db(self, db_name, commit=True):
+        """
+        This public method will commit or roll back the changes the calling task made to the database, leaving the
+        database started until close is called. The database is only marked for backup if the task changed any rows.
+
+        :param db_name: The name of the database to stop
+        :type db_name: String
+        :param commit: Optional. True to commit the changes the task made, False to roll them back. Default value is
+            True
+        :type commit: Boolean
+        :return: None
+        """
+
+        if db_name not in self._started:
+            raise DatabaseError(
+                "Database '{}' has not been started by the daemon".format(db_name)
+            )
+        task_changes = self._task_changes.pop(db_name, None)
+        if commit:
+            self._database.commit(db_name)
+            if self._database.total_changes(db_name) != task_changes:
+                self._changed.add(db_name)
+        else:
+            self._database.rollback(db_name)
+
+    def backup(self):
+        """
+        This public method will back up every database committed to since it was last backed up
+
+        :return: None
+        """
+
+        for db_name in self._started:
+            if db_name in self._changed:
+                self._database.backup(db_name)
+                self._changed.discard(db_name)
+
+    def close(self):
+        """
+        This public method will stop every database started by the daemon, backing up those committed to since they
+        were last backed up
+
+        :return: None
+        """
+
+        for db_name in list(self._started):
+            self._database.stop_db(db_name, commit=db_name in self._changed)
+            self._changed.discard(db_name)
+            self._started.remove(db_name)
+
+
+class Daemon:
+    """
+    The Daemon class keeps PyFynance running to load transaction files as they land in the
+    input/banking_transactions/landing folder, rather than loading them with a new run of PyFynance each time.
+
+    .. code-block:: bash
+
+        python -m PyFynance --task_type load_transactions --institution mybank --account cc --daemon
+
+    The services of the tasks, such as the Database, OFXParser and parse cache, are created once and shared by every
+    task the daemon runs, so each file is loaded without paying their setup cost again. Each batch of settled files,
+    see services.folder_watcher.FolderWatcher, is loaded by a new LoadTransactionsTask and committed once it passes.
+    The databases are backed up every config.daemon.backup_interval seconds when changed, and when the daemon stops.
+
+    A file that fails to load is moved to the error folder as in a normal run, and the daemon carries on. The daemon
+    runs until it is stopped with stop, SIGTERM or ctrl-c.
+    """
+
+    def __init__(self, args, create_task):
+        """
+        initialises a new instance of the Daemon class
+
+        :param args: The arguments of the tasks to run for each batch of files
+        :param create_task: Function creating a task from its arguments and the shared services, as
+            create_task(args, services)
+        :type create_task: Function
+        """
+
+        self._logger = logging.getLogger(__name__)
+        self._config = Configuration()
+        self._args = args
+        self._create_task = create_task
+        self._stopped = threading.Event()
+        self._passed = True
+
+        # delayed import, the database and folder watcher are only imported once the daemon is created
+        from services.database import Database
+        from services.folder_watcher import FolderWatcher
+        from tasks.task_load_transactions import get_input_patterns
+
+        self._database = DaemonDatabase(Database())
+        self._services = {"db": self._database}
+        self._watcher = FolderWatcher(
+            os.sep.join(
+                [self._config.paths.input_path, "banking_transactions", "landing"]
+            ),
+            get_input_patterns(args),
+        )
+        self._last_backup = time.monotonic()
+
+    def run(self):
+        """
+        This public method will load the files that land in the landing folder until the daemon is stopped, then
+        back up and stop the databases
+
+        :return: Boolean: True if every batch of files loaded, False if any batch failed
+        """
+
+        self._logger.info("Started PyFynance daemon")
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            previous_handler = signal.signal(signal.SIGTERM, self._handle_sigterm)
+
+        try:
+            while not self._stopped.is_set():
+                self.poll()
+                self._watcher.wait(self._get_wait_time())
+        except KeyboardInterrupt:
+            self._logger.info("PyFynance daemon interrupted")
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGTERM, previous_handler)
+            self._watcher.close()
+            self._database.close()
+            self._logger.info("Stopped PyFynance daemon")
+        return self._passed
+
+    def poll(self):
+        """
+        This public method will load any files that have settled in the landing folder, and back up the databases
+        if the backup interval has passed
+
+        :return: None
+        """
+
+        input_files = self._watcher.get_ready_files()
+        if input_files:
+            self._load_files(input_files)
+
+        if time.monotonic() - self._last_backup >= self._config.daemon.backup_interval:
+            self._database.backup()
+            self._last_backup = time.monotonic()
+
+    def stop(self):
+        """
+        This public method will stop the daemon once the batch of files it is loading, if any, is finished
+
+        :return: None
+        """
+
+        self._stopped.set()
+
+    def _load_files(self, input_files):
+        """
+        This private method will load a batch of files with a new task that shares the daemon's services
+
+        :param input_files: The full paths of the files to load
+        :type input_files: List
+        :return: None
+        """
+
+        self._logger.info(
+            "Loading {} new file(s).  {}".format(len(input_files), input_files)
+        )
+        args = argparse.Namespace(
+            **dict(
+                vars(self._args),
+                runtime=datetime.datetime.now(),
+                input_files=input_files,
+            )
+        )
+        try:
+            if not self._create_task(args, self._services).execute():
+                self._passed = False
+        except Exception as e:
+            self._passed = False
+            self._logger.error("Failed to load files {}.  {}".format(input_files, e))
+
+    def _get_wait_time(self):
+        """
+        This private method will determine how long to wait for files before polling again, so that the next
+        scheduled backup is not delayed
+
+        :return: Float, the number of seconds to wait
+        """
+
+        until_backup = self._config.daemon.backup_interval - (
+            time.monotonic() - self._last_backup
+        )
+        return max(0, min(self._watcher.get_wait_time(), until_backup))
+
+    def _handle_sigterm(self, signum, frame):
+        """
+        This private method stops the daemon when the process is sent SIGTERM
+
+        :return: None
+        """
+
+        self._logger.info("PyFynance daemon received SIGTERM")
+        self.stop()
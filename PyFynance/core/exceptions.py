@@ -43,3 +43,11 @@ class FileSystemError(ValueError):
     """
 
     pass
+
+
+class PipelineError(ValueError):
+    """
+    Represents an error that occurs while reading or running a pipeline of tasks
+    """
+
+    pass
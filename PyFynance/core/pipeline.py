@@ -0,0 +1,341 @@
+import json
+import logging
+import os
+
+from core.exceptions import DatabaseError, FileSystemError, PipelineError, TaskError
+
+SCHEDULE_KEYS = ["task_type", "name", "depends_on", "reads", "writes"]
+
+
+def read_pipeline_file(path):
+    """
+    This public function will read the steps of a pipeline from a pipeline json file. The file holds the ordered list
+    of tasks to run, each with its task_type and the command line arguments of that task type. Tasks may also set
+    the scheduling values described in check_pipeline_steps.
+
+    .. code-block:: json
+
+        {
+            "tasks": [
+                {"task_type": "load_transactions", "institution": "mybank", "account": "cc"},
+                {"task_type": "load_transactions", "institution": "mybank", "account": "debit"}
+            ]
+        }
+
+    :param path: The full path to the pipeline json file
+    :type path: String
+    :return: List of Dictionaries, the arguments of each task in the order they are run
+    """
+
+    try:
+        with open(path, encoding="utf-8") as pipeline_file:
+            steps = json.load(pipeline_file)["tasks"]
+    except Exception as e:
+        raise PipelineError(
+            "Exception occurred while reading pipeline file '{}'.  {}".format(path, e)
+        )
+
+    return check_pipeline_steps(steps, "pipeline file '{}'".format(path))
+
+
+def check_pipeline_steps(steps, source):
+    """
+    This public function will check the steps of a pipeline and fill in the default of each scheduling value a step
+    does not set:
+        * name          the name of the task, unique within the pipeline. Default is "{task_type}_{position}"
+        * depends_on    List of the names of the tasks that must pass before the task runs. Default is []
+        * reads         List of the databases the task reads, in addition to those its task class declares. Default
+                        is []
+        * writes        List of the databases the task writes, in addition to those its task class declares.
+                        Default is []
+
+    A task may only depend on tasks listed before it, so the order of the steps is always one the tasks can be run
+    in one at a time.
+
+    :param steps: the arguments of each task, in order. Each must have a task_type
+    :type steps: List
+    :param source: description of where the steps came from, used in error messages
+    :type source: String
+    :return: List of Dictionaries, the checked steps with their scheduling values set
+    """
+
+    if not isinstance(steps, list) or len(steps) == 0:
+        raise PipelineError("There are no tasks to run in {}".format(source))
+
+    names = []
+    checked_steps = []
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict) or "task_type" not in step:
+            raise PipelineError("Task {} of {} has no task_type".format(index, source))
+        step = dict(
+            {
+                "name": "{}_{}".format(step["task_type"], index + 1),
+                "depends_on": [],
+                "reads": [],
+                "writes": [],
+            },
+            **step
+        )
+        if step["name"] in names:
+            raise PipelineError(
+                "Task name '{}' is used more than once in {}".format(
+                    step["name"], source
+                )
+            )
+        for dependency in step["depends_on"]:
+            if dependency not in names:
+                raise PipelineError(
+                    "Task '{}' of {} depends on '{}', which is not a task listed before it".format(
+                        step["name"], source, dependency
+                    )
+                )
+        names.append(step["name"])
+        checked_steps.append(step)
+    return checked_steps
+
+
+class PipelineDatabase:
+    """
+    The Pipeline Database class wraps the Database service shared by the tasks of a pipeline, so that every task uses
+    the same connections and the pipeline is committed and backed up once, when it closes.
+
+    Each database is started the first time a task starts it, with that task's profile, and is stopped by close. In
+    between, a task starting a database opens a savepoint on it and stopping the database ends the savepoint:
+        * stop_db(commit=True) releases the savepoint, keeping the task's changes for the final commit
+        * stop_db(commit=False) rolls back to the savepoint, undoing only the changes of that task
+
+    Every other call is passed on to the wrapped Database.
+    """
+
+    def __init__(self, database):
+        """
+        initialises a new instance of the PipelineDatabase class
+
+        :param database: The Database service to share between the tasks
+        :type database: Database
+        """
+
+        self._logger = logging.getLogger(__name__)
+        self._database = database
+        self._started = []
+        self._savepoints = {}
+        self._savepoint_count = 0
+
+    def __getattr__(self, item):
+        return getattr(self._database, item)
+
+    def start_db(self, db_name, current=True, profile=None, pooled=False):
+        """
+        This public method will start the database the first time it is called for it and then open a savepoint for
+        the calling task. See Database.start_db.
+
+        :param db_name: The name of the database to start
+        :type db_name: String
+        :param current: Optional. True to start the current database or False to start its latest backup. Default
+            value is True
+        :type current: Boolean
+        :param profile: Optional. The name of the performance profile to apply when the database is started. Default
+            value is None
+        :type profile: String
+        :param pooled: Optional. Pooled databases are not supported within a pipeline. Default value is False
+        :type pooled: Boolean
+        :return: None
+        """
+
+        if pooled:
+            raise DatabaseError(
+                "Database '{}' cannot be started in pooled mode within a pipeline".format(
+                    db_name
+                )
+            )
+        if db_name not in self._started:
+            self._database.start_db(db_name, current, profile)
+            self._started.append(db_name)
+
+        self._savepoint_count += 1
+        savepoint = "pipeline_task_{}".format(self._savepoint_count)
+        self._database.savepoint(db_name, savepoint)
+        self._savepoints[db_name] = savepoint
+
+    def stop_db(self, db_name, commit=True):
+        """
+        This public method will end the calling task's savepoint on the database, keeping its changes if commit is
+        True or undoing them if it is False. The database itself is left open until close is called.
+
+        :param db_name: The name of the database to stop
+        :type db_name: String
+        :param commit: Optional. True to keep the changes the task made, False to undo them. Default value is True
+        :type commit: Boolean
+        :return: None
+        """
+
+        savepoint = self._savepoints.pop(db_name, None)
+        if savepoint is None:
+            raise DatabaseError(
+                "Database '{}' has not been started within the pipeline".format(db_name)
+            )
+        if commit:
+            self._database.release_savepoint(db_name, savepoint)
+        else:
+            self._database.rollback_savepoint(db_name, savepoint)
+
+    def close(self, commit=True):
+        """
+        This public method will stop every database started within the pipeline. Changes of a task that did not stop
+        its database are undone first. The databases are committed and backed up only if commit is True.
+
+        :param commit: Optional. True to commit and back up the databases. Default value is True
+        :type commit: Boolean
+        :return: None
+        """
+
+        for db_name in list(self._started):
+            if db_name in self._savepoints:
+                self._database.rollback_savepoint(
+                    db_name, self._savepoints.pop(db_name)
+                )
+            self._database.stop_db(db_name, commit)
+            self._started.remove(db_name)
+
+
+class PipelineFileSystem:
+    """
+    The Pipeline File System class wraps the FileSystem service shared by the tasks of a pipeline, so that the input
+    files of the tasks are only moved once the pipeline has been committed.
+
+    The changes of every task are committed when the pipeline closes, so a task moving its input files to processed
+    straight away would leave them there if a later error rolls the pipeline back. Instead move_file checks the move
+    can be made and queues it, and the queued moves are made by apply_moves after the pipeline commits. Moves are
+    dropped along with the changes of the tasks when the pipeline is rolled back, leaving the files to be loaded again.
+
+    Every other call is passed on to the wrapped FileSystem.
+    """
+
+    def __init__(self, file_system):
+        """
+        initialises a new instance of the PipelineFileSystem class
+
+        :param file_system: The FileSystem service to share between the tasks
+        :type file_system: FileSystem
+        """
+
+        self._logger = logging.getLogger(__name__)
+        self._file_system = file_system
+        self._moves = []
+
+    def __getattr__(self, item):
+        return getattr(self._file_system, item)
+
+    def move_file(self, source_path, dest_path):
+        """
+        This public method will queue the move of the file from the source path to the destination path, to be made
+        once the pipeline has been committed. See FileSystem.move_file.
+
+        :param source_path: The full filepath (including file name) to the source file
+        :type source_path: String
+        :param dest_path: The full filepath (including file name) to the destination file
+        :type dest_path: String
+        :return: None
+        """
+
+        queued_sources = [move[0] for move in self._moves]
+        if source_path in queued_sources or not self.path_exists(source_path):
+            raise FileSystemError(
+                "Source Path '{}' does not exist.".format(source_path)
+            )
+        if not self.is_directory(os.path.dirname(dest_path)):
+            raise FileSystemError(
+                "destination path '{}' either isnt a directory or dosent exist.".format(
+                    os.path.dirname(dest_path)
+                )
+            )
+        self._moves.append((source_path, dest_path))
+
+    def apply_moves(self):
+        """
+        This public method will make every queued move, in the order they were queued.
+
+        :return: None
+        """
+
+        while self._moves:
+            source_path, dest_path = self._moves.pop(0)
+            self._file_system.move_file(source_path, dest_path)
+
+
+class Pipeline:
+    """
+    The Pipeline class runs an ordered list of PyFynance tasks within one shared service context. The tasks share a
+    single Database, FileSystem, OFXParser and parse cache, so services are set up once per pipeline rather than once
+    per task, and the databases are committed and backed up once after the last task. The input files of the tasks
+    are moved only after that commit, so they always match the changes kept in the databases.
+
+    .. code-block:: python
+
+        pipeline = Pipeline(steps, create_task)
+        passed = pipeline.run()
+
+    The tasks run in order, and the pipeline stops at the first task that fails. The changes of a failed task are
+    undone while those of the tasks before it are kept. Tasks can only share services they create lazily through the
+    BaseTask service properties.
+    """
+
+    def __init__(self, steps, create_task):
+        """
+        initialises a new instance of the Pipeline class
+
+        :param steps: The arguments of each task to run, in order. Each must have a task_type
+        :type steps: List
+        :param create_task: Function creating a task from its arguments and the shared services, as
+            create_task(args, services)
+        :type create_task: Function
+        """
+
+        self._logger = logging.getLogger(__name__)
+        self._steps = steps
+        self._create_task = create_task
+
+    def run(self):
+        """
+        This public method will run each task of the pipeline in order, stopping at the first task that fails, and
+        then commit and back up the databases used and move the input files of the tasks. If the pipeline is ended
+        by an unexpected exception, the changes of every task are rolled back instead and no input files are moved.
+
+        :return: Boolean: True if every task passed, False if a task failed
+        """
+
+        # delayed import, the database is only imported once a pipeline is run
+        from services.database import Database
+        from services.file_system import FileSystem
+
+        database = PipelineDatabase(Database())
+        file_system = PipelineFileSystem(FileSystem())
+        services = {"db": database, "fs": file_system}
+        passed = True
+        completed = False
+
+        try:
+            for index, step in enumerate(self._steps, start=1):
+                self._logger.info(
+                    "Running pipeline task {} of {}, task_type = '{}'".format(
+                        index, len(self._steps), step.task_type
+                    )
+                )
+                try:
+                    passed = self._create_task(step, services).execute()
+                except TaskError:
+                    passed = False
+                if not passed:
+                    self._logger.info(
+                        "Stopping pipeline after task {} of {} failed".format(
+                            index, len(self._steps)
+                        )
+                    )
+                    break
+            completed = True
+        finally:
+            # the databases are only committed when the pipeline was not ended by an unexpected exception
+            database.close(commit=completed)
+        # the input files are only moved once the changes loaded from them have been committed
+        file_system.apply_moves()
+        return passed
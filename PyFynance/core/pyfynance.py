@@ -62,29 +62,63 @@ class PyFynance:
 
     def _execute_tasks(self):
         """
-        this method is responsible for selecting and triggering the correct task class based on the task_type selected
+        this method is responsible for selecting and triggering the correct task class based on the task_type selected.
+        The pipeline task_type runs each of the tasks in self._args.steps in order, sharing their services, or when
+        more than one task worker is requested runs them concurrently in dependency order. In daemon mode the task is
+        run for each batch of files that lands in the landing folder until the daemon is stopped.
 
         :return: task_passed: Boolean: returns True of the task that was executed passed, False if the task
         encountered an error
         """
 
-        task_class_name = self._resolve_task_class()
-        task_class_object = self._new_instance(task_class_name)
-        task = task_class_object(self._args)
+        if self._args.task_type == "pipeline" and self._args.task_workers > 1:
+            # delayed import, the scheduler is only required for concurrent pipeline runs
+            from core.scheduler import TaskScheduler
+
+            return TaskScheduler(
+                self._args.steps, self._create_task, self._args.task_workers
+            ).run()
+        if self._args.task_type == "pipeline":
+            # delayed import, the pipeline is only required for pipeline runs
+            from core.pipeline import Pipeline
+
+            return Pipeline(self._args.steps, self._create_task).run()
+        if self._args.daemon:
+            # delayed import, the daemon is only required for daemon runs
+            from core.daemon import Daemon
+
+            return Daemon(self._args, self._create_task).run()
+
+        task = self._create_task(self._args)
         task_passed = task.execute()
         return task_passed
 
-    def _resolve_task_class(self):
+    def _create_task(self, args, services=None):
+        """
+        This private method will create an instance of the task class for the task_type within the args object
+
+        :param args: the arguments of the task to create
+        :param services: Optional. Dictionary of service instances for the task to share. Default value is None
+        :type services: Dictionary
+        :return: PyFynance Task Instance
+        """
+
+        task_class_name = self._resolve_task_class(args.task_type)
+        task_class_object = self._new_instance(task_class_name)
+        return task_class_object(args, services)
+
+    def _resolve_task_class(self, task_type):
         """
-        This private method will resolve the task class based on the task_type within the args object
+        This private method will resolve the task class based on the task_type provided
 
-        :return: PyFynance Task Class: returns the appropriate task class based on the task type on the self._args
-        object
+        :param task_type: the task type to resolve
+        :type task_type: String
+        :return: PyFynance Task Class: returns the appropriate task class name for the task type
         """
 
         return {
             "load_transactions": "tasks.task_load_transactions.LoadTransactionsTask"
-        }[self._args.task_type]
+        }[task_type]
 
     @staticmethod
     def _configure_logger(log_path, version, task_type, runtime):
@@ -0,0 +1,223 @@
+import logging
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class DatabaseLocks:
+    """
+    The Database Locks class tracks the read and write locks held on databases by the running tasks of a
+    TaskScheduler. Any number of tasks can hold a read lock on a database at once, while a write lock is held by a
+    single task and excludes any reader.
+
+    The locks of a task are acquired all at once or not at all, so tasks never wait on each other while holding a
+    lock. The locks are only acquired and released by the scheduling thread, so they are not thread safe.
+    """
+
+    def __init__(self):
+        """
+        initialises a new instance of the DatabaseLocks class with no locks held
+        """
+
+        self._readers = {}
+        self._writers = set()
+
+    def acquire(self, reads, writes):
+        """
+        This public method will acquire the read and write locks provided if none of them conflict with a lock held
+
+        :param reads: the names of the databases to lock for reading
+        :type reads: Set
+        :param writes: the names of the databases to lock for writing
+        :type writes: Set
+        :return: Boolean: True if the locks were acquired, False if they conflict with a lock held
+        """
+
+        if any(db_name in self._writers for db_name in reads | writes):
+            return False
+        if any(self._readers.get(db_name) for db_name in writes):
+            return False
+
+        for db_name in reads:
+            self._readers[db_name] = self._readers.get(db_name, 0) + 1
+        self._writers.update(writes)
+        return True
+
+    def release(self, reads, writes):
+        """
+        This public method will release read and write locks acquired together with acquire
+
+        :param reads: the names of the databases locked for reading
+        :type reads: Set
+        :param writes: the names of the databases locked for writing
+        :type writes: Set
+        :return: None
+        """
+
+        for db_name in reads:
+            self._readers[db_name] -= 1
+        self._writers.difference_update(writes)
+
+
+class TaskScheduler:
+    """
+    The Task Scheduler class runs the tasks of a pipeline concurrently in a pool of worker threads, in dependency order
+    rather than one at a time.
+
+    .. code-block:: python
+
+        scheduler = TaskScheduler(steps, create_task, workers=2)
+        passed = scheduler.run()
+        statuses = scheduler.statuses  # {"load_cc": "passed", "load_debit": "failed", "report": "skipped"}
+
+    A task is started once every task it depends_on has passed and the database locks it needs can be acquired. The
+    locks of a task are the databases in the READS and WRITES of its task class, plus those of its pipeline step:
+        * tasks reading a database can run alongside each other
+        * a task writing a database runs alone on that database
+    Each task uses its own services and commits its databases when it stops them, so tasks that depend on it see its
+    changes. A task that fails does not stop the tasks independent of it, but the tasks that depend on it are skipped.
+    """
+
+    def __init__(self, steps, create_task, workers):
+        """
+        initialises a new instance of the TaskScheduler class
+
+        :param steps: The arguments of each task to run, in pipeline order. Each must have the task_type, name,
+            depends_on, reads and writes set by core.pipeline.check_pipeline_steps
+        :type steps: List
+        :param create_task: Function creating a task from its arguments and services, as create_task(args, services)
+        :type create_task: Function
+        :param workers: The maximum number of tasks run at once
+        :type workers: Integer
+        """
+
+        self._logger = logging.getLogger(__name__)
+        self._steps = steps
+        self._create_task = create_task
+        self._workers = workers
+        self._locks = DatabaseLocks()
+        self.statuses = OrderedDict((step.name, "pending") for step in steps)
+
+    def run(self):
+        """
+        This public method will run every task of the pipeline, each as soon as its dependencies have passed and its
+        database locks are free, and record the status of each task in self.statuses as one of "passed", "failed" or
+        "skipped"
+
+        :return: Boolean: True if every task passed, False if any task failed or was skipped
+        """
+
+        self._logger.info(
+            "Scheduling {} tasks with {} workers".format(
+                len(self._steps), self._workers
+            )
+        )
+        waiting = list(self._steps)
+        running = {}
+        tasks = {}
+
+        with ThreadPoolExecutor(
+            max_workers=self._workers, thread_name_prefix="PyFynance-task"
+        ) as executor:
+            while waiting or running:
+                for step in list(waiting):
+                    if len(running) == self._workers:
+                        break
+                    status = self._get_dependency_status(step)
+                    if status == "failed":
+                        waiting.remove(step)
+                        self._set_status(step, "skipped")
+                    elif status == "passed":
+                        if step.name not in tasks:
+                            tasks[step.name] = self._create_task(step, None)
+                        task = tasks[step.name]
+                        locks = self._get_task_locks(step, task)
+                        if self._locks.acquire(*locks):
+                            waiting.remove(step)
+                            self._logger.info(
+                                "Starting task '{}', task_type = '{}'".format(
+                                    step.name, step.task_type
+                                )
+                            )
+                            running[executor.submit(task.execute)] = (step, locks)
+
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    step, locks = running.pop(future)
+                    self._locks.release(*locks)
+                    self._set_status(step, self._get_result_status(step, future))
+
+        self._logger.info(
+            "Finished scheduled tasks.  {}".format(
+                ", ".join(
+                    "{} = '{}'".format(name, status)
+                    for name, status in self.statuses.items()
+                )
+            )
+        )
+        return all(status == "passed" for status in self.statuses.values())
+
+    def _get_dependency_status(self, step):
+        """
+        This private method will determine whether the task of a step can run, based on the status of the tasks it
+        depends on
+
+        :param step: the arguments of the task
+        :return: String: "passed" if every dependency passed, "failed" if any dependency failed or was skipped,
+            otherwise "pending"
+        """
+
+        statuses = [self.statuses[name] for name in step.depends_on]
+        if any(status in ("failed", "skipped") for status in statuses):
+            return "failed"
+        if all(status == "passed" for status in statuses):
+            return "passed"
+        return "pending"
+
+    def _get_result_status(self, step, future):
+        """
+        This private method will determine the status of a finished task from its future
+
+        :param step: the arguments of the task
+        :param future: the future the task was executed with
+        :type future: concurrent.futures.Future
+        :return: String: "passed" or "failed"
+        """
+
+        if future.exception() is not None:
+            self._logger.error(
+                "Task '{}' raised an exception.  {}".format(
+                    step.name, future.exception()
+                )
+            )
+            return "failed"
+        return "passed" if future.result() else "failed"
+
+    def _set_status(self, step, status):
+        """
+        This private method will record and log the status of a task
+
+        :param step: the arguments of the task
+        :param status: the status of the task
+        :type status: String
+        :return: None
+        """
+
+        self.statuses[step.name] = status
+        self._logger.info("Task '{}' {}".format(step.name, status))
+
+    @staticmethod
+    def _get_task_locks(step, task):
+        """
+        This private method will determine the database locks a task needs, from its task class and pipeline step
+
+        :param step: the arguments of the task
+        :param task: the task
+        :type task: BaseTask
+        :return: tuple of (Set of the databases read, Set of the databases written)
+        """
+
+        writes = set(task.WRITES) | set(step.writes)
+        reads = (set(task.READS) | set(step.reads)) - writes
+        return reads, writes
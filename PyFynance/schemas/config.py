@@ -1,5 +1,5 @@
 from marshmallow import Schema, fields, post_load
-from schemas.model import Model
+from schemas.model import ConfigModel
 
 
 class ConfigPathsSchema(Schema):
@@ -16,6 +16,7 @@ class ConfigPathsSchema(Schema):
     resources_path = fields.Str(data_key="resourcesPath")
     db_path = fields.Str(data_key="dbPath")
     test_path = fields.Str(data_key="testPath")
+    parse_cache_path = fields.Str(data_key="parseCachePath")
 
     @post_load
     def create(self, data, **kwargs):
@@ -25,7 +26,7 @@ class ConfigPathsSchema(Schema):
         :return: None
         """
 
-        return Model(**data)
+        return ConfigModel(**data)
 
 
 class OFXParserSchema(Schema):
@@ -37,6 +38,17 @@ class OFXParserSchema(Schema):
     object_types = fields.List(fields.String(), data_key="objectTypes")
     cast_fields = fields.List(fields.String(), data_key="castFields")
     html_tags = fields.List(fields.String(), data_key="htmlTags")
+    chunk_size = fields.Int(data_key="chunkSize")
+    load_batch_size = fields.Int(data_key="loadBatchSize")
+    output_types = fields.List(fields.String(), data_key="outputTypes")
+    trn_types = fields.List(fields.String(), data_key="trnTypes")
+    amount_format = fields.String(data_key="amountFormat")
+    parse_cache_enabled = fields.Bool(data_key="parseCacheEnabled")
+    parse_cache_max_size = fields.Int(data_key="parseCacheMaxSize")
+    parallel_min_size = fields.Int(data_key="parallelMinSize")
+    currency_exponents = fields.Dict(
+        keys=fields.String(), values=fields.Int(), data_key="currencyExponents"
+    )
 
     @post_load
     def create(self, data, **kwargs):
@@ -46,7 +58,7 @@ class OFXParserSchema(Schema):
         :return: None
         """
 
-        return Model(**data)
+        return ConfigModel(**data)
 
 
 class DatabaseTablesSchema(Schema):
@@ -66,7 +78,7 @@ class DatabaseTablesSchema(Schema):
         :return: None
         """
 
-        return Model(**data)
+        return ConfigModel(**data)
 
 
 class DatabaseColumnSpecsSchema(Schema):
@@ -94,7 +106,92 @@ class DatabasePrimaryKeysSchema(Schema):
         :return: None
         """
 
-        return Model(**data)
+        return ConfigModel(**data)
+
+
+class DatabaseIndexSchema(Schema):
+    """
+    This class represents the schema of a single index within a configuration.database.indexes object. Marshmallow
+    uses this class to serialise and deserialize python objects to and from json
+    """
+
+    name = fields.Str()
+    columns = fields.List(fields.String())
+
+    @post_load
+    def create(self, data, **kwargs):
+        """
+        called by marshmallow package when deserialising completes in order to construct a valid instance.
+        :param data:
+        :return: None
+        """
+
+        return ConfigModel(**data)
+
+
+class DatabaseIndexesSchema(Schema):
+    """
+    This class represents the schema of a configuration.database.indexes object. Marshmallow uses this class to
+    serialise and deserialize python objects to and from json
+    """
+
+    transactions = fields.List(fields.Nested(DatabaseIndexSchema))
+
+    @post_load
+    def create(self, data, **kwargs):
+        """
+        called by marshmallow package when deserialising completes in order to construct a valid instance.
+        :param data:
+        :return: None
+        """
+
+        return ConfigModel(**data)
+
+
+class DatabaseProfileSchema(Schema):
+    """
+    This class represents the schema of a configuration.database.profiles object. Marshmallow uses this class to
+    serialise and deserialize python objects to and from json
+    """
+
+    journal_mode = fields.Str(data_key="journalMode")
+    synchronous = fields.Str()
+    cache_size = fields.Int(data_key="cacheSize")
+    mmap_size = fields.Int(data_key="mmapSize")
+    temp_store = fields.Str(data_key="tempStore")
+    busy_timeout = fields.Int(data_key="busyTimeout")
+
+    @post_load
+    def create(self, data, **kwargs):
+        """
+        called by marshmallow package when deserialising completes in order to construct a valid instance.
+        :param data:
+        :return: None
+        """
+
+        return ConfigModel(**data)
+
+
+class DatabaseBackupSchema(Schema):
+    """
+    This class represents the schema of a configuration.database.backup object. Marshmallow uses this class to
+    serialise and deserialize python objects to and from json
+    """
+
+    pages_per_step = fields.Int(data_key="pagesPerStep")
+    keep_recent = fields.Int(data_key="keepRecent")
+    keep_daily = fields.Int(data_key="keepDaily")
+    keep_monthly = fields.Int(data_key="keepMonthly")
+
+    @post_load
+    def create(self, data, **kwargs):
+        """
+        called by marshmallow package when deserialising completes in order to construct a valid instance.
+        :param data:
+        :return: None
+        """
+
+        return ConfigModel(**data)
 
 
 class DatabaseSchema(Schema):
@@ -107,6 +204,42 @@ class DatabaseSchema(Schema):
     tables = fields.Nested(DatabaseTablesSchema())
     column_specs = fields.Nested(DatabaseColumnSpecsSchema(), data_key="columnSpecs")
     primary_keys = fields.Nested(DatabasePrimaryKeysSchema(), data_key="primaryKeys")
+    indexes = fields.Nested(DatabaseIndexesSchema())
+    analyze_min_rows = fields.Int(data_key="analyzeMinRows")
+    backup = fields.Nested(DatabaseBackupSchema())
+    insert_batch_size = fields.Int(data_key="insertBatchSize")
+    conflict_policies = fields.List(fields.String(), data_key="conflictPolicies")
+    select_chunk_size = fields.Int(data_key="selectChunkSize")
+    sql_cache_size = fields.Int(data_key="sqlCacheSize")
+    statement_cache_size = fields.Int(data_key="statementCacheSize")
+    write_queue_size = fields.Int(data_key="writeQueueSize")
+    row_types = fields.List(fields.String(), data_key="rowTypes")
+    default_profile = fields.Str(data_key="defaultProfile")
+    profiles = fields.Dict(
+        keys=fields.Str(), values=fields.Nested(DatabaseProfileSchema)
+    )
+
+    @post_load
+    def create(self, data, **kwargs):
+        """
+        called by marshmallow package when deserialising completes in order to construct a valid instance.
+        :param data:
+        :return: None
+        """
+
+        return ConfigModel(**data)
+
+
+class DaemonSchema(Schema):
+    """
+    This class represents the schema of a configuration.daemon object. Marshmallow uses this class to serialise and
+    deserialize python objects to and from json
+    """
+
+    poll_interval = fields.Float(data_key="pollInterval")
+    settle_time = fields.Float(data_key="settleTime")
+    backup_interval = fields.Float(data_key="backupInterval")
+    use_inotify = fields.Bool(data_key="useInotify")
 
     @post_load
     def create(self, data, **kwargs):
@@ -116,7 +249,7 @@ class DatabaseSchema(Schema):
         :return: None
         """
 
-        return Model(**data)
+        return ConfigModel(**data)
 
 
 class ConfigSchema(Schema):
@@ -129,6 +262,7 @@ class ConfigSchema(Schema):
     paths = fields.Nested(ConfigPathsSchema)
     ofx_parser = fields.Nested(OFXParserSchema, data_key="ofxParser")
     database = fields.Nested(DatabaseSchema)
+    daemon = fields.Nested(DaemonSchema)
 
     @post_load
     def create(self, data, **kwargs):
@@ -138,4 +272,4 @@ class ConfigSchema(Schema):
         :return: None
         """
 
-        return Model(**data)
+        return ConfigModel(**data)
@@ -1,3 +1,6 @@
+from types import MappingProxyType
+
+
 class Model(object):
     """
     this class represents the base model object and encapsulates data found in any and all model objects using
@@ -12,3 +15,163 @@ class Model(object):
 
         for key, value in kwargs.items():
             setattr(self, key, value)
+
+
+def _freeze(value):
+    """
+    returns a read only copy of a configuration value, with lists turned into tuples and dictionaries into read only
+    mappings, all the way down
+
+    :param value: the configuration value to freeze
+    :return: the frozen value
+    """
+
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (dict, MappingProxyType)):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+def _thaw(value):
+    """
+    returns a plain copy of a frozen configuration value, with tuples turned back into lists and read only mappings
+    into dictionaries, so that it can be pickled
+
+    :param value: the configuration value to thaw
+    :return: the thawed value
+    """
+
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    if isinstance(value, MappingProxyType):
+        return {key: _thaw(item) for key, item in value.items()}
+    return value
+
+
+class ConfigModel(Model):
+    """
+    this class represents a read only configuration object. Its attributes are set when it is constructed and cannot
+    be changed afterwards, so a single configuration can be shared safely throughout the process. Changed copies are
+    made with replace.
+
+    Lists and dictionaries are frozen when the object is constructed, into tuples and types.MappingProxyType
+    mappings, so the values inside them cannot be changed either.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        constructs a new ConfigModel object, generally only called by marshmallow
+        :param kwargs:
+        """
+
+        self.__dict__.update((key, _freeze(value)) for key, value in kwargs.items())
+
+    def __getstate__(self):
+        return {key: _thaw(value) for key, value in self.__dict__.items()}
+
+    def __setstate__(self, state):
+        self.__dict__.update((key, _freeze(value)) for key, value in state.items())
+
+    def __setattr__(self, key, value):
+        raise AttributeError(
+            "Configuration value '{}' is read only, use Configuration.override to change it".format(
+                key
+            )
+        )
+
+    def __delattr__(self, key):
+        self.__setattr__(key, None)
+
+    def replace(self, **kwargs):
+        """
+        returns a copy of this configuration object with the attributes provided replaced
+
+        :param kwargs: the attribute values to replace
+        :return: ConfigModel
+        """
+
+        return ConfigModel(**dict(self.__dict__, **kwargs))
+
+
+class BankingTransaction(object):
+    """
+    this class represents a single banking transaction loaded from an ofx file.
+
+    Unlike the generic Model object, the attributes of a banking transaction are fixed and stored in __slots__ rather
+    than a per-instance dictionary, keeping the memory footprint of each transaction small when millions are loaded.
+    The optional attributes date_user, name and memo are always present and default to None. When the amount is an
+    integer number of minor units of its currency, amount_exponent holds the number of decimal places of the currency,
+    otherwise it is None and the amount is a Decimal.
+    """
+
+    __slots__ = (
+        "trn_type",
+        "date_posted",
+        "date_user",
+        "amount",
+        "fitid",
+        "name",
+        "memo",
+        "amount_exponent",
+    )
+
+    def __init__(
+        self,
+        trn_type,
+        date_posted,
+        amount,
+        fitid,
+        date_user=None,
+        name=None,
+        memo=None,
+        amount_exponent=None,
+    ):
+        """
+        constructs a new BankingTransaction object, generally only called by marshmallow
+        """
+
+        self.trn_type = trn_type
+        self.date_posted = date_posted
+        self.date_user = date_user
+        self.amount = amount
+        self.fitid = fitid
+        self.name = name
+        self.memo = memo
+        self.amount_exponent = amount_exponent
+
+    @classmethod
+    def from_tuple(cls, values):
+        """
+        constructs a new BankingTransaction object from the attribute values returned by to_tuple
+
+        :param values: Tuple of attribute values in slot order
+        :return: BankingTransaction
+        """
+
+        transaction = cls.__new__(cls)
+        for slot, value in zip(cls.__slots__, values):
+            setattr(transaction, slot, value)
+        return transaction
+
+    def __eq__(self, other):
+        if not isinstance(other, BankingTransaction):
+            return NotImplemented
+        return self.to_tuple() == other.to_tuple()
+
+    def __repr__(self):
+        return "BankingTransaction({})".format(
+            ", ".join(
+                "{}={!r}".format(slot, getattr(self, slot)) for slot in self.__slots__
+            )
+        )
+
+    def to_tuple(self):
+        """
+        returns the attribute values of this transaction in slot order. The tuple is much cheaper to pickle than the
+        transaction itself, and is turned back into a transaction with from_tuple.
+
+        :return: Tuple of attribute values
+        """
+
+        return tuple(getattr(self, slot) for slot in self.__slots__)
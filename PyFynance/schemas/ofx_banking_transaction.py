@@ -1,5 +1,31 @@
+from datetime import datetime
+
 from marshmallow import Schema, fields, post_load
-from schemas.model import Model
+from schemas.model import BankingTransaction
+
+
+class OFXDateTime(fields.DateTime):
+    """
+    This class represents a marshmallow DateTime field that also accepts datetime objects. The OFXParser casts ofx
+    dates straight to datetimes, so they are validated as is rather than being formatted to strings and parsed again.
+    """
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, datetime):
+            return value
+        return super(OFXDateTime, self)._deserialize(value, attr, data, **kwargs)
+
+
+class OFXAmount(fields.Decimal):
+    """
+    This class represents a marshmallow Decimal field that also accepts integers. When the OFXParser is configured to
+    cast amounts to integer minor units (e.g. cents) they are kept as integers rather than being converted to Decimal.
+    """
+
+    def _deserialize(self, value, attr, data, **kwargs):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        return super(OFXAmount, self)._deserialize(value, attr, data, **kwargs)
 
 
 class OFXBankingTransactionSchema(Schema):
@@ -9,19 +35,20 @@ class OFXBankingTransactionSchema(Schema):
     """
 
     trn_type = fields.Str(data_key="trntype")
-    date_posted = fields.DateTime(data_key="dtposted")
-    date_user = fields.DateTime(data_key="dtuser", allow_none=True)
-    amount = fields.Decimal(data_key="trnamt")
+    date_posted = OFXDateTime(data_key="dtposted")
+    date_user = OFXDateTime(data_key="dtuser", allow_none=True)
+    amount = OFXAmount(data_key="trnamt")
     fitid = fields.Str()
     name = fields.Str(allow_none=True)
     memo = fields.Str(allow_none=True)
+    amount_exponent = fields.Int(allow_none=True)
 
     @post_load
     def create(self, data, **kwargs):
         """
         called by marshmallow package when deserialising completes in order to construct a valid instance.
         :param data:
-        :return: None
+        :return: BankingTransaction
         """
 
-        return Model(**data)
+        return BankingTransaction(**data)
@@ -6,6 +6,7 @@ so that they may be easily extened and reused in other projects as standard code
 modules should be devoid of business logic for PyFynance and should aim to only interact with the external service
 in a generic but structured way.
 
-Current services being maintained within this package are the database module (API interface for sqlite3) and the
-ofx_parser module (logical parser for files meeting the ofx specification)
+Current services being maintained within this package are the database module (API interface for sqlite3), the
+ofx_parser module (logical parser for files meeting the ofx specification) and the ofx_tokenizer module (streaming
+tokenizer for SGML based ofx files used by the ofx_parser)
 """
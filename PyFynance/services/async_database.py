@@ -0,0 +1,359 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+
+from core.config import Configuration
+from core.exceptions import DatabaseError
+from services.database import Database
+
+
+class AsyncDatabase:
+    """
+    The Async Database class is an asyncio facade over the Database service, for callers running inside an event loop.
+
+    Every call is run on one dedicated executor thread, which opens, uses and closes the sqlite3 connections of the
+    wrapped Database, so the event loop is never blocked on sqlite and the connections are only ever used by the
+    thread that created them.
+
+    .. code-block:: python
+
+        async with AsyncDatabase() as db:
+            await db.start_db("transactions")
+            await db.insert_many("transactions", "transactions", rows, on_conflict="ignore")
+            async for row in db.iter_select("transactions", "transactions", where=Eq("account", account)):
+                print(row)
+
+    Calls are run in the order they are made. Cancelling a call that has not started yet removes it from the queue,
+    while a call that has started is stopped at the next batch boundary where it has one:
+        * insert_many stops before its next batch and rolls back every row it has inserted
+        * iter_select stops before fetching its next chunk of rows and closes its cursor
+    Other calls run as a single sqlite statement, which completes once started.
+    """
+
+    def __init__(self, database=None):
+        """
+        initialises a new instance of the AsyncDatabase class and its executor thread
+
+        :param database: Optional. The Database service to wrap. Default value is None, which creates a new Database
+        :type database: Database
+        """
+
+        self._logger = logging.getLogger(__name__)
+        self._config = Configuration()
+        self._database = Database() if database is None else database
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="PyFynance-db-async"
+        )
+        self._started = []
+        self._closed = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close(commit=exc_type is None)
+
+    async def start_db(self, db_name, current=True, profile=None):
+        """
+        This public method will start the database on the executor thread. See Database.start_db.
+
+        :param db_name: The name of the database to start
+        :type db_name: String
+        :param current: Optional. True to start the current database or False to start its latest backup. Default
+            value is True
+        :type current: Boolean
+        :param profile: Optional. The name of the pragma profile to apply, one of config.database.profiles. Default
+            value is None
+        :type profile: String
+        :return: None
+        """
+
+        await self._run(self._database.start_db, db_name, current, profile)
+        self._started.append(db_name)
+
+    async def stop_db(self, db_name, commit=True):
+        """
+        This public method will stop the database on the executor thread. See Database.stop_db.
+
+        :param db_name: The name of the database to stop
+        :type db_name: String
+        :param commit: Optional. True to commit and back up the database before closing it. Default value is True
+        :type commit: Boolean
+        :return: None
+        """
+
+        await self._run(self._database.stop_db, db_name, commit)
+        self._started.remove(db_name)
+
+    async def insert(self, db_name, table, data):
+        """
+        This public method will insert a row of data into the table. See Database.insert.
+
+        :param db_name: The name of the database to insert into
+        :type db_name: String
+        :param table: The name of the table to insert into
+        :type table: String
+        :param data: The row to insert, keyed by column name
+        :type data: Dictionary
+        :return: None
+        """
+
+        return await self._run(self._database.insert, db_name, table, data)
+
+    async def insert_many(
+        self, db_name, table, rows, columns=None, batch_size=None, on_conflict=None
+    ):
+        """
+        This public method will insert many rows of data into the table. See Database.insert_many.
+
+        If the call is cancelled, the insert stops before its next batch and every row it inserted is rolled back
+        before the cancellation is raised to the caller.
+
+        :param db_name: The name of the database to insert into
+        :type db_name: String
+        :param table: The name of the table to insert into
+        :type table: String
+        :param rows: Iterable of dictionary or tuple rows to insert
+        :type rows: Iterable
+        :param columns: Optional. List of the column names to insert. Default value is None
+        :type columns: List
+        :param batch_size: Optional. The number of rows inserted per batch. Default value is None, which uses
+            config.database.insert_batch_size
+        :type batch_size: Integer
+        :param on_conflict: Optional. The conflict policy, one of config.database.conflict_policies. Default value is
+            None
+        :type on_conflict: String
+        :return: InsertResult: named tuple of the number of rows inserted and skipped
+        """
+
+        batch_size = batch_size or self._config.database.insert_batch_size
+        cancelled = threading.Event()
+        rows = self._iter_until_cancelled(rows, batch_size, cancelled)
+        self._check_open()
+        executor_future = self._executor.submit(
+            self._database.insert_many,
+            db_name,
+            table,
+            rows,
+            columns,
+            batch_size,
+            on_conflict,
+        )
+        future = asyncio.wrap_future(executor_future)
+
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not executor_future.cancel():
+                cancelled.set()
+                await asyncio.wait([future])
+                if not future.exception():
+                    self._logger.warning(
+                        "Insert into '{}.{}' was cancelled after its last batch was inserted".format(
+                            db_name, table
+                        )
+                    )
+            raise
+
+    async def select(
+        self,
+        db_name,
+        table,
+        columns=None,
+        where=None,
+        parameters=None,
+        order_by=None,
+        limit=None,
+    ):
+        """
+        This public method will select rows from the table. See Database.select.
+
+        :param db_name: The name of the database to query
+        :type db_name: String
+        :param table: The name of the table to query
+        :type table: String
+        :param columns: Optional. List of columns to select. Default value is None, which selects all columns
+        :type columns: List
+        :param where: Optional. Predicate or where command to filter the rows with. Default value is None
+        :type where: Predicate or String
+        :param parameters: Optional. Values to bind to the "?" placeholders of a where command. Default value is None
+        :type parameters: Tuple
+        :param order_by: Optional. List of the column names to order the rows by. Default value is None
+        :type order_by: List
+        :param limit: Optional. The maximum number of rows to return. Default value is None
+        :type limit: Integer
+        :return: List of rows returned from the database
+        """
+
+        return await self._run(
+            self._database.select,
+            db_name,
+            table,
+            columns,
+            where,
+            parameters,
+            order_by,
+            limit,
+        )
+
+    async def iter_select(
+        self,
+        db_name,
+        table,
+        columns=None,
+        where=None,
+        parameters=None,
+        order_by=None,
+        limit=None,
+        chunk_size=None,
+        row_type=None,
+    ):
+        """
+        This public method will stream the rows selected from the table. See Database.iter_select.
+
+        Rows are fetched on the executor thread a chunk at a time and yielded to the event loop one at a time, so
+        other calls can run between chunks. Cancelling the iterating task, or closing the iterator, stops the select
+        before its next chunk and closes its cursor.
+
+        .. code-block:: python
+
+            async for row in db.iter_select("transactions", "transactions", chunk_size=500):
+                print(row)
+
+        :param db_name: The name of the database to query
+        :type db_name: String
+        :param table: The name of the table to query
+        :type table: String
+        :param columns: Optional. List of columns to select. Default value is None, which selects all columns
+        :type columns: List
+        :param where: Optional. Predicate or where command to filter the rows with. Default value is None
+        :type where: Predicate or String
+        :param parameters: Optional. Values to bind to the "?" placeholders of a where command. Default value is None
+        :type parameters: Tuple
+        :param order_by: Optional. List of the column names to order the rows by. Default value is None
+        :type order_by: List
+        :param limit: Optional. The maximum number of rows to return. Default value is None
+        :type limit: Integer
+        :param chunk_size: Optional. The number of rows fetched per call to the executor thread. Default value is
+            None, which uses config.database.select_chunk_size
+        :type chunk_size: Integer
+        :param row_type: Optional. The type of the rows yielded, one of config.database.row_types. Default value is
+            None, which yields plain tuples
+        :type row_type: String
+        :return: Asynchronous generator of rows returned from the database
+        """
+
+        chunk_size = chunk_size or self._config.database.select_chunk_size
+        rows = await self._run(
+            self._database.iter_select,
+            db_name,
+            table,
+            columns,
+            where,
+            parameters,
+            order_by,
+            limit,
+            chunk_size,
+            row_type,
+        )
+
+        try:
+            while True:
+                chunk = await self._run(self._fetch_chunk, rows, chunk_size)
+                if not chunk:
+                    break
+                for row in chunk:
+                    yield row
+        finally:
+            await asyncio.shield(self._run(rows.close))
+
+    async def analyze(self, db_name):
+        """
+        This public method will refresh the index statistics of the database. See Database.analyze.
+
+        :param db_name: The name of the database to analyze
+        :type db_name: String
+        :return: None
+        """
+
+        return await self._run(self._database.analyze, db_name)
+
+    async def close(self, commit=True):
+        """
+        This public method will stop every database started through this instance and then shut down the executor
+        thread. No further calls can be made once it is closed.
+
+        :param commit: Optional. True to commit and back up the databases before closing them. Default value is True
+        :type commit: Boolean
+        :return: None
+        """
+
+        try:
+            for db_name in list(self._started):
+                await self.stop_db(db_name, commit)
+        finally:
+            self._closed = True
+            self._executor.shutdown(wait=False)
+            self._logger.info("Closed async database executor")
+
+    async def _run(self, function, *args):
+        """
+        This private method will run function(*args) on the executor thread and return its result, without blocking
+        the event loop. Cancelling the call before the function starts removes it from the executor queue.
+
+        :param function: The function to run
+        :type function: Function
+        :return: the result of the function
+        """
+
+        self._check_open()
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(function, *args)
+        )
+
+    def _check_open(self):
+        """
+        This private method will check that the instance has not been closed
+
+        :return: None
+        """
+
+        if self._closed:
+            raise DatabaseError("The async database has been closed")
+
+    @staticmethod
+    def _fetch_chunk(rows, chunk_size):
+        """
+        This private method will read the next chunk of rows from a row generator
+
+        :param rows: The generator of rows to read from
+        :type rows: Generator
+        :param chunk_size: The maximum number of rows to read
+        :type chunk_size: Integer
+        :return: List of rows, empty once the generator is exhausted
+        """
+
+        return list(islice(rows, chunk_size))
+
+    @staticmethod
+    def _iter_until_cancelled(rows, batch_size, cancelled):
+        """
+        This private method will yield every row provided, checking before each batch of batch_size rows that the
+        insert has not been cancelled. Raising inside the rows makes the insert roll back the rows it has inserted.
+
+        :param rows: Iterable of rows to yield
+        :type rows: Iterable
+        :param batch_size: The number of rows per batch
+        :type batch_size: Integer
+        :param cancelled: Event set when the insert is cancelled
+        :type cancelled: threading.Event
+        :return: Generator of rows
+        """
+
+        for index, row in enumerate(rows):
+            if index % batch_size == 0 and cancelled.is_set():
+                raise DatabaseError("The insert was cancelled")
+            yield row
@@ -0,0 +1,148 @@
+import json
+import os
+
+
+class BackupCatalog:
+    """
+    The Backup Catalog class is a small json index of the backups held for each PyFynance database.
+
+    The catalog records the name and creation timestamp of every backup taken, along with the name of the latest
+    backup of each database, so the latest backup is found without listing or sorting the backup folder.
+
+    .. code-block:: python
+
+        catalog = BackupCatalog(os.sep.join([config.paths.db_path, "backup", "catalog.json"]))
+        catalog.add("transactions", "transactions_20191027101112.db", "20191027101112")
+        catalog.save()
+        catalog.get_latest("transactions")  # "transactions_20191027101112.db"
+
+    Changes are only written to disk when save is called.
+    """
+
+    def __init__(self, catalog_path):
+        """
+        initialises a new instance of the BackupCatalog class, loading the catalog file if it exists
+
+        :param catalog_path: The full path to the catalog json file
+        :type catalog_path: String
+        """
+
+        self._catalog_path = catalog_path
+        self._catalog = {}
+
+        if os.path.isfile(catalog_path):
+            with open(catalog_path) as catalog_file:
+                self._catalog = json.load(catalog_file)
+
+    def get_latest(self, db_name):
+        """
+        This public method will return the name of the latest backup of the database, or None if the catalog holds
+        no backups of it
+
+        :param db_name: The name of the database
+        :type db_name: String
+        :return: String backup name or None
+        """
+
+        return self._catalog.get(db_name, {}).get("latest")
+
+    def get_backups(self, db_name):
+        """
+        This public method will return every backup of the database held in the catalog, newest first
+
+        :param db_name: The name of the database
+        :type db_name: String
+        :return: List of Dictionaries with the keys "name" and "created"
+        """
+
+        return list(self._catalog.get(db_name, {}).get("backups", []))
+
+    def add(self, db_name, name, created):
+        """
+        This public method will add a backup to the catalog and make it the latest backup of the database. Any entry
+        already held for a backup of the same name is replaced.
+
+        :param db_name: The name of the database the backup was taken of
+        :type db_name: String
+        :param name: The file name of the backup
+        :type name: String
+        :param created: The timestamp the backup was created at, in the format YYYYmmddHHMMSS
+        :type created: String
+        :return: None
+        """
+
+        entry = self._catalog.setdefault(db_name, {"latest": None, "backups": []})
+        entry["backups"] = [
+            backup for backup in entry["backups"] if backup["name"] != name
+        ]
+        entry["backups"].insert(0, {"name": name, "created": created})
+        entry["latest"] = name
+
+    def remove(self, db_name, names):
+        """
+        This public method will remove backups from the catalog. If the latest backup is removed, the newest of the
+        remaining backups becomes the latest.
+
+        :param db_name: The name of the database
+        :type db_name: String
+        :param names: The file names of the backups to remove
+        :type names: List
+        :return: None
+        """
+
+        entry = self._catalog.get(db_name)
+        if entry is None:
+            return
+
+        entry["backups"] = [
+            backup for backup in entry["backups"] if backup["name"] not in names
+        ]
+        entry["latest"] = entry["backups"][0]["name"] if entry["backups"] else None
+
+    def save(self):
+        """
+        This public method will write the catalog to disk. The file is replaced atomically, so a failed save leaves
+        the previous catalog in place.
+
+        :return: None
+        """
+
+        temp_path = "{}.{}.tmp".format(self._catalog_path, os.getpid())
+        with open(temp_path, "w") as catalog_file:
+            json.dump(self._catalog, catalog_file, indent=4)
+        os.replace(temp_path, self._catalog_path)
+
+
+def find_expired_backups(backups, keep_recent, keep_daily, keep_monthly):
+    """
+    This public function will apply a retention policy to a list of backups and return the names of the backups it
+    does not keep. A backup is kept if it is one of:
+        * the keep_recent newest backups
+        * the newest backup of each of the keep_daily newest days that have a backup
+        * the newest backup of each of the keep_monthly newest months that have a backup
+
+    :param backups: List of backup Dictionaries with the keys "name" and "created", newest first
+    :type backups: List
+    :param keep_recent: The number of most recent backups to keep
+    :type keep_recent: Integer
+    :param keep_daily: The number of days to keep a backup for
+    :type keep_daily: Integer
+    :param keep_monthly: The number of months to keep a backup for
+    :type keep_monthly: Integer
+    :return: List of the names of expired backups
+    """
+
+    kept = {backup["name"] for backup in backups[:keep_recent]}
+
+    for period_length, keep_count in ((8, keep_daily), (6, keep_monthly)):
+        periods = set()
+        for backup in backups:
+            period = backup["created"][:period_length]
+            if period in periods:
+                continue
+            if len(periods) == keep_count:
+                break
+            periods.add(period)
+            kept.add(backup["name"])
+
+    return [backup["name"] for backup in backups if backup["name"] not in kept]
@@ -0,0 +1,158 @@
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+from core.exceptions import DatabaseError
+
+
+class ConnectionPool:
+    """
+    The Connection Pool class shares one sqlite3 database between threads, with a read connection per thread and a
+    single writer.
+
+    Every thread that reads from the database is given its own connection, opened the first time the thread asks for
+    one. All writes are queued to one dedicated writer thread which owns the only write connection, so writes never
+    contend with each other for the database lock. With the database in WAL mode, the readers see each committed write
+    without ever blocking, or being blocked by, the writer.
+
+    .. code-block:: python
+
+        pool = ConnectionPool(writer_connection, open_reader, 64)
+        reader_cursor = pool.get_reader_cursor()  # this thread's read connection
+        pool.write(insert_rows, rows)  # runs insert_rows(rows) on the writer thread and commits
+        pool.close()
+
+    Each write is committed as its own transaction once it completes, and rolled back if it raises.
+    """
+
+    def __init__(self, writer_connection, open_reader, queue_size):
+        """
+        initialises a new instance of the ConnectionPool class and starts its writer thread
+
+        :param writer_connection: The connection to write with. It must be opened with check_same_thread=False, as it
+            is used by the writer thread
+        :type writer_connection: sqlite3.Connection
+        :param open_reader: Function taking no arguments that opens a new read connection. Read connections must be
+            opened with check_same_thread=False, so that close can close them from any thread
+        :type open_reader: Function
+        :param queue_size: The maximum number of writes waiting on the writer thread. Further writes block until
+            there is room
+        :type queue_size: Integer
+        """
+
+        self._logger = logging.getLogger(__name__)
+        self._writer_connection = writer_connection
+        self._open_reader = open_reader
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._closed = False
+        self._closed_lock = threading.Lock()
+        self._writer_thread = threading.Thread(
+            target=self._run_writer, name="PyFynance-db-writer", daemon=True
+        )
+        self._writer_thread.start()
+
+    def is_writer_thread(self):
+        """
+        This public method will return True if it is called from the writer thread of the pool
+
+        :return: Boolean
+        """
+
+        return threading.current_thread() is self._writer_thread
+
+    def is_running(self):
+        """
+        This public method will return True until the pool is closed
+
+        :return: Boolean
+        """
+
+        return self._writer_thread.is_alive()
+
+    def get_reader_cursor(self):
+        """
+        This public method will return the cursor of the read connection of the calling thread, opening the connection
+        if the thread does not have one yet
+
+        :return: sqlite3.Cursor
+        """
+
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            connection = self._open_reader()
+            with self._readers_lock:
+                self._readers.append(connection)
+            cursor = self._local.cursor = connection.cursor()
+        return cursor
+
+    def write(self, function, *args, **kwargs):
+        """
+        This public method will run function(*args, **kwargs) on the writer thread, commit it, and return its result.
+        Exceptions raised by the function are raised to the caller. Writes are refused once the pool is closed, as
+        there is no longer a writer thread to run them.
+
+        :param function: The function performing the write with the writer connection
+        :type function: Function
+        :return: the result of the function
+        """
+
+        future = Future()
+        with self._closed_lock:
+            if self._closed:
+                raise DatabaseError(
+                    "Cannot write to the connection pool after it has been closed"
+                )
+            self._queue.put((future, function, args, kwargs))
+        return future.result()
+
+    def close(self):
+        """
+        This public method will wait for every queued write to complete, stop the writer thread and close all of the
+        read connections. The writer connection is left open for the caller to commit, back up and close.
+
+        :return: None
+        """
+
+        with self._closed_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._writer_thread.join()
+
+        with self._readers_lock:
+            for connection in self._readers:
+                connection.close()
+            self._logger.info(
+                "Closed connection pool with {} read connections".format(
+                    len(self._readers)
+                )
+            )
+            self._readers = []
+
+    def _run_writer(self):
+        """
+        This private method is the body of the writer thread. It runs each queued write in turn until close is called.
+
+        :return: None
+        """
+
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+
+            future, function, args, kwargs = job
+            try:
+                result = function(*args, **kwargs)
+                self._writer_connection.commit()
+            except BaseException as e:
+                if self._writer_connection.in_transaction:
+                    self._writer_connection.rollback()
+                future.set_exception(e)
+            else:
+                future.set_result(result)
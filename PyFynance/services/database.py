@@ -3,10 +3,23 @@ import glob
 import logging
 import os
 import sqlite3
-import shutil
+import threading
+from collections import namedtuple, OrderedDict
+from decimal import Decimal
+from itertools import chain, islice
+from operator import itemgetter
 
 from core.config import Configuration
 from core.exceptions import DatabaseError
+from services.backup_catalog import BackupCatalog, find_expired_backups
+from services.connection_pool import ConnectionPool
+from services.predicates import Predicate, check_identifier
+
+# bind Decimal values as their exact string form, which sqlite converts using the column affinity
+sqlite3.register_adapter(Decimal, str)
+
+InsertResult = namedtuple("InsertResult", ["inserted", "skipped"])
+SQLCacheInfo = namedtuple("SQLCacheInfo", ["hits", "misses", "size", "max_size"])
 
 
 class Database:
@@ -23,20 +36,42 @@ class Database:
         self._config = Configuration()
         self._connections = {}
         self._cursors = {}
+        self._pools = {}
         self._sql = self._set_db_statements()
+        self._sql_cache = OrderedDict()
+        self._sql_cache_lock = threading.Lock()
+        self._sql_cache_hits = 0
+        self._sql_cache_misses = 0
 
-    def start_db(self, db_name, current=True):
+    def start_db(self, db_name, current=True, profile=None, pooled=False):
         """
         This method will start the sqllite3 database specified. This method will create the connection and cursor
         object to allow interaction with the database, as well as trigger the table create commands for that database.
 
         The database must be within the config.database.db_name list or the service will thrown an error.
 
+        The connection is tuned with the pragmas of the performance profile named, from config.database.profiles:
+            * safe          write ahead log with full syncs. The default profile
+            * bulk_load     write ahead log synced at checkpoints and a large page cache, for loading many rows
+            * analytics     write ahead log with a large page cache and memory mapped reads, for large queries
+
+        In pooled mode the database can be shared between threads. Each thread reading from the database is given its
+        own read connection, while every write (insert, insert_many and analyze) is queued to a single writer thread
+        and committed as soon as it completes, so readers see it. The database must use the WAL journal mode for
+        readers and the writer to run at the same time. As writes are committed as they complete, stop_db(commit=False)
+        does not roll them back.
+
         :param db_name: The name of the database to start
         :type db_name: String
         :param current: Signifies if the database service should load the current database (True) or the backup (False).
             The default value for this value is True
         :type current: Boolean
+        :param profile: Optional. The name of the performance profile to apply. Default value is None, which applies
+            config.database.default_profile
+        :type profile: String
+        :param pooled: Optional. Signifies if the database should be started in pooled mode, to be shared between
+            threads. Default value is False
+        :type pooled: Boolean
         :return: None
         """
 
@@ -47,11 +82,21 @@ class Database:
                 )
             )
             self._check_db_name(db_name)
+            profile = profile or self._config.database.default_profile
+            self._check_profile(profile)
             db_path = self._get_db_path(db_name, current)
-            self._connections[db_name] = sqlite3.connect(db_path)
+            self._connections[db_name] = self._connect(db_path, pooled)
             self._cursors[db_name] = self._connections[db_name].cursor()
+            self._apply_profile(db_name, profile, current)
             if current:
                 self._build_tables(db_name)
+            if pooled:
+                self._connections[db_name].commit()
+                self._pools[db_name] = ConnectionPool(
+                    self._connections[db_name],
+                    lambda: self._open_reader(db_path, profile),
+                    self._config.database.write_queue_size,
+                )
             self._logger.info(
                 "Successfully started the database service for database '{}'".format(
                     db_name
@@ -67,7 +112,8 @@ class Database:
     def stop_db(self, db_name, commit=True):
         """
         This method will stop the sqlite3 database specified. This method will also optionally commit changes to the
-        database and create a backup of the database if commit value is True
+        database and create a backup of the database if commit value is True. The backup is taken before the
+        connection is closed and is skipped if the connection made no changes to the database.
 
         :param db_name: The name of the database connection to stop and commit/backup
         :type db_name: String
@@ -83,11 +129,15 @@ class Database:
                 "set to {}".format(db_name, commit)
             )
             self._check_db_name(db_name)
-            if commit:
-                self._commit_db(db_name)
-            self._connections[db_name].close()
-            if commit:
-                self._backup_db(db_name)
+            pool = self._pools.pop(db_name, None)
+            if pool is not None:
+                pool.close()
+            try:
+                if commit:
+                    self._commit_db(db_name)
+                    self._backup_db(db_name)
+            finally:
+                self._connections[db_name].close()
             self._logger.info(
                 "Successfully stopped the database service for database '{}' with commit "
                 "set to {}".format(db_name, commit)
@@ -101,7 +151,8 @@ class Database:
 
     def insert(self, db_name, table, data):
         """
-        This public method allows users to submit insert queries to the specified database and table to add data.
+        This public method allows users to submit insert queries to the specified database and table to add data. The
+        values are bound to the statement as parameters rather than formatted into the sql text.
 
         Example Calls:
 
@@ -122,27 +173,124 @@ class Database:
         :return: None
         """
 
+        pool = self._get_write_pool(db_name)
+        if pool is not None:
+            return pool.write(self.insert, db_name, table, data)
+
         try:
             self._logger.info(
                 "Attempting insert of data into '{}.{}'".format(db_name, table)
             )
             self._check_db_name(db_name)
             self._check_table_name(db_name, table)
-            column_names = []
-            data_vals = []
+            columns = tuple(data.keys())
+            sql = self._get_cached_sql(
+                ("insert", table, columns), self._build_insert_sql, table, columns
+            )
+            self._execute(db_name, sql, tuple(data.values()))
+            self._logger.info(
+                "Successful insert of data into '{}.{}'".format(db_name, table)
+            )
+        except Exception as e:
+            raise DatabaseError(
+                "Exception occurred while inserting data into '{}.{}'.  {}".format(
+                    db_name, table, e
+                )
+            )
 
-            for col_name, data_val in data.items():
-                column_names.append(col_name)
-                data_vals.append(self._cast_data_for_insert(data_val))
+    def insert_many(
+        self, db_name, table, rows, columns=None, batch_size=None, on_conflict=None
+    ):
+        """
+        This public method allows users to insert many rows of data into the specified database and table at once.
 
-            columns = ", ".join(column_names)
-            data = ", ".join(data_vals)
+        Values are bound as sql parameters through executemany rather than being formatted into the sql string, and
+        rows are sent to sqlite in batches of batch_size. All of the rows are inserted within a single savepoint, so
+        either every row is inserted or, if any row fails, none of them are. As with insert, the changes are committed
+        when the database is stopped.
 
-            sql = self._sql["insert"].format(table=table, columns=columns, data=data)
-            self._execute(db_name, sql)
+        Rows that clash with the primary key of the table are handled by sqlite based on the on_conflict policy:
+            * None          the insert fails (default)
+            * "ignore"      the clashing row is skipped
+            * "replace"     the existing row is deleted and the new row inserted
+            * "upsert"      the non primary key columns of the existing row are updated from the new row
+
+        Example Calls:
+
+        .. code-block:: python
+
+            db.insert_many("database", "table", [{"ID": 1, "Name": "Billy"}, {"ID": 2, "Name": "Jimmy"}])
+            db.insert_many("database", "table", [(1, "Billy"), (2, "Jimmy")], columns=["ID", "Name"])
+            db.insert_many("database", "table", rows, on_conflict="ignore")  # skips rows already in the table
+
+        :param db_name: the name of the database to query. This database must have already been started using
+            the start_db method
+        :type db_name: String
+        :param table: the name of the table to insert data into from the database specified
+        :type table: String
+        :param rows: Iterable of rows to insert. Rows are either dictionaries keyed by column name, or tuples of
+            values in the same order as the columns parameter
+        :type rows: Iterable
+        :param columns: Optional. List of the column names to insert. Required when rows are tuples. Default value is
+            None, which uses the keys of the first dictionary row
+        :type columns: List
+        :param batch_size: Optional. The number of rows sent to sqlite per executemany call. Default value is None,
+            which uses config.database.insert_batch_size
+        :type batch_size: Integer
+        :param on_conflict: Optional. The conflict policy, one of config.database.conflict_policies. Default value is
+            None
+        :type on_conflict: String
+        :return: InsertResult: named tuple of the number of rows inserted (including rows replaced or updated) and
+            the number of rows skipped
+        """
+
+        pool = self._get_write_pool(db_name)
+        if pool is not None:
+            return pool.write(
+                self.insert_many, db_name, table, rows, columns, batch_size, on_conflict
+            )
+
+        try:
             self._logger.info(
-                "Successful insert of data into '{}.{}'".format(db_name, table)
+                "Attempting insert of many rows into '{}.{}'".format(db_name, table)
+            )
+            self._check_db_name(db_name)
+            self._check_table_name(db_name, table)
+            self._check_conflict_policy(on_conflict)
+            batch_size = batch_size or self._config.database.insert_batch_size
+
+            rows = iter(rows)
+            first_row = next(rows, None)
+            if first_row is None:
+                self._logger.info(
+                    "No rows to insert into '{}.{}'".format(db_name, table)
+                )
+                return InsertResult(0, 0)
+
+            rows = chain([first_row], rows)
+            if isinstance(first_row, dict):
+                columns = list(first_row.keys()) if columns is None else columns
+                rows = map(self._get_row_values_getter(columns), rows)
+            elif columns is None:
+                raise DatabaseError(
+                    "Column names must be provided when inserting rows that are not dictionaries"
+                )
+
+            sql = self._get_cached_sql(
+                ("insert_many", table, tuple(columns), on_conflict),
+                self._build_insert_many_sql,
+                table,
+                columns,
+                on_conflict,
             )
+            inserted, total = self._execute_many(db_name, sql, rows, batch_size)
+            result = InsertResult(inserted, total - inserted)
+            self._logger.info(
+                "Successful insert of {} rows into '{}.{}', skipped {} rows".format(
+                    result.inserted, db_name, table, result.skipped
+                )
+            )
+            return result
         except Exception as e:
             raise DatabaseError(
                 "Exception occurred while inserting data into '{}.{}'.  {}".format(
@@ -150,7 +298,16 @@ class Database:
                 )
             )
 
-    def select(self, db_name, table, columns=None, where=None):
+    def select(
+        self,
+        db_name,
+        table,
+        columns=None,
+        where=None,
+        parameters=None,
+        order_by=None,
+        limit=None,
+    ):
         """
         This public method allows users to submit select statements against the specified database and table.
 
@@ -164,6 +321,12 @@ class Database:
             db.select("database", "table")  # returns all columns for database.table
             db.select("database", "table", columns=["id", "age"])  # returns the ID and age columns of database.table
             db.select("database", "table", where="age > 13")  # returns all columns from database.table where age > 13
+            db.select("database", "table", where="age > ?", parameters=(13,))  # as above, with age bound as a parameter
+            db.select("database", "table", where=Gt("age", 13), order_by=["-age"], limit=5)  # the 5 oldest over 13
+
+        Where conditions are either a Predicate from services.predicates, or a raw sql string with optional "?"
+        placeholders and parameters. Predicates and placeholders reuse the same statement for every value, so prefer
+        them to formatting values into the where condition.
 
         :param db_name: The name of the database to query. This database must have already been started using
             the start_db method
@@ -173,8 +336,15 @@ class Database:
         :param columns: Optional. List of columns to select from table. Default value is None and will select
             all columns from the table
         :type table: List
-        :param where: Optional. Where command to filter the select statement with. Default value is None.
-        :type where: String
+        :param where: Optional. Predicate or where command to filter the select statement with. Default value is None.
+        :type where: Predicate or String
+        :param parameters: Optional. Values to bind to the "?" placeholders of a where command. Default value is None
+        :type parameters: Tuple
+        :param order_by: Optional. List of the column names to order the rows by. Names prefixed with "-" are ordered
+            descending. Default value is None
+        :type order_by: List
+        :param limit: Optional. The maximum number of rows to return. Default value is None
+        :type limit: Integer
         :return: List: list of rows returned from the database
         """
 
@@ -184,21 +354,10 @@ class Database:
             )
             self._check_db_name(db_name)
             self._check_table_name(db_name, table)
-            sql_key = "{cols}_{wheres}".format(
-                cols="columns" if columns else "none",
-                wheres="where" if where else "none",
-            )
-            sql = {
-                "none_none": self._sql["select"]["select_all_from"],
-                "columns_none": self._sql["select"]["select_columns_from"],
-                "none_where": self._sql["select"]["select_all_from_where"],
-                "columns_where": self._sql["select"]["select_columns_from_where"],
-            }[sql_key]
-
-            column_names = ", ".join(columns) if columns else None
-            data = self._execute(
-                db_name, sql.format(table=table, columns=column_names, where=where)
-            ).fetchall()
+            sql, parameters = self._get_select_sql(
+                table, columns, where, parameters, order_by, limit
+            )
+            data = self._execute(db_name, sql, parameters).fetchall()
             self._logger.info(
                 "Successful select of data from '{}.{}'".format(db_name, table)
             )
@@ -210,9 +369,460 @@ class Database:
                 )
             )
 
+    def iter_select(
+        self,
+        db_name,
+        table,
+        columns=None,
+        where=None,
+        parameters=None,
+        order_by=None,
+        limit=None,
+        chunk_size=None,
+        row_type=None,
+    ):
+        """
+        This public method allows users to stream the results of a select statement against the specified database and
+        table. Rows are fetched from sqlite in chunks of chunk_size rows and yielded one at a time, so memory usage
+        does not depend on the number of rows selected and the first rows can be used before the last are read.
+
+        The query is validated and executed when this method is called, while the rows are read as the returned
+        generator is consumed. The query runs on its own cursor, so other calls to the database service can be made
+        while iterating.
+
+        Example Calls:
+
+        .. code-block:: python
+
+            for row in db.iter_select("database", "table", where="age > 13"):
+                print(row[0])
+            for row in db.iter_select("database", "table", columns=["id", "age"], row_type="namedtuple"):
+                print(row.id, row.age)
+
+        :param db_name: The name of the database to query. This database must have already been started using
+            the start_db method
+        :type db_name: String
+        :param table: The name of the table to query from the database specified
+        :type table: String
+        :param columns: Optional. List of columns to select from table. Default value is None and will select
+            all columns from the table
+        :type columns: List
+        :param where: Optional. Predicate or where command to filter the select statement with. Default value is None.
+        :type where: Predicate or String
+        :param parameters: Optional. Values to bind to the "?" placeholders of a where command. Default value is None
+        :type parameters: Tuple
+        :param order_by: Optional. List of the column names to order the rows by. Names prefixed with "-" are ordered
+            descending. Default value is None
+        :type order_by: List
+        :param limit: Optional. The maximum number of rows to return. Default value is None
+        :type limit: Integer
+        :param chunk_size: Optional. The number of rows fetched from sqlite at a time. Default value is None, which
+            uses config.database.select_chunk_size
+        :type chunk_size: Integer
+        :param row_type: Optional. The type of the rows yielded, one of config.database.row_types. "tuple" yields
+            plain tuples, "namedtuple" yields tuples with a field per column name and "row" yields sqlite3.Row
+            objects. Default value is None, which yields plain tuples
+        :type row_type: String
+        :return: Generator of rows returned from the database
+        """
+
+        try:
+            self._logger.info(
+                "Attempting streaming select of data from '{}.{}'".format(
+                    db_name, table
+                )
+            )
+            self._check_db_name(db_name)
+            self._check_table_name(db_name, table)
+            self._check_row_type(row_type)
+            chunk_size = chunk_size or self._config.database.select_chunk_size
+            sql, parameters = self._get_select_sql(
+                table, columns, where, parameters, order_by, limit
+            )
+
+            cursor = self._get_connection(db_name).cursor()
+            if row_type == "row":
+                cursor.row_factory = sqlite3.Row
+            self._logger.debug("Attempting to execute sql command '{}'".format(sql))
+            cursor.execute(sql, parameters or ())
+            self._logger.debug("Successful execution of sql command '{}'".format(sql))
+        except Exception as e:
+            raise DatabaseError(
+                "Exception occurred while selecting data from '{}.{}'.  {}".format(
+                    db_name, table, e
+                )
+            )
+
+        return self._iter_cursor_rows(
+            cursor, "{}.{}".format(db_name, table), chunk_size, row_type
+        )
+
+    def _iter_cursor_rows(self, cursor, source, chunk_size, row_type):
+        """
+        This private method will yield every row of an executed cursor, fetching them in chunks of chunk_size rows.
+        The cursor is closed once all of the rows are read or the generator is closed.
+
+        :param cursor: The cursor the select statement was executed on
+        :type cursor: sqlite3.Cursor
+        :param source: The "database.table" name being selected from, used in log and error messages
+        :type source: String
+        :param chunk_size: The number of rows to fetch at a time
+        :type chunk_size: Integer
+        :param row_type: The type of rows to yield, one of config.database.row_types or None
+        :type row_type: String
+        :return: Generator of rows
+        """
+
+        make_row = None
+        if row_type == "namedtuple":
+            column_names = [description[0] for description in cursor.description]
+            make_row = namedtuple("Row", column_names, rename=True)._make
+
+        row_count = 0
+        try:
+            while True:
+                try:
+                    rows = cursor.fetchmany(chunk_size)
+                except Exception as e:
+                    raise DatabaseError(
+                        "Exception occurred while selecting data from '{}'.  {}".format(
+                            source, e
+                        )
+                    )
+                if not rows:
+                    break
+                row_count += len(rows)
+                if make_row is not None:
+                    rows = map(make_row, rows)
+                yield from rows
+        finally:
+            cursor.close()
+
+        self._logger.info(
+            "Successful streaming select of {} rows from '{}'".format(row_count, source)
+        )
+
+    def analyze(self, db_name):
+        """
+        This public method will refresh the statistics sqlite uses to choose between the indexes of a database. It
+        should be called after large loads, so that queries are planned against the current shape of the data.
+
+        :param db_name: The name of the database to analyze. This database must have already been started using
+            the start_db method
+        :type db_name: String
+        :return: None
+        """
+
+        pool = self._get_write_pool(db_name)
+        if pool is not None:
+            return pool.write(self.analyze, db_name)
+
+        try:
+            self._logger.info("Attempting analyze of database '{}'".format(db_name))
+            self._check_db_name(db_name)
+            self._execute(db_name, self._sql["analyze"])
+            self._logger.info("Successful analyze of database '{}'".format(db_name))
+        except Exception as e:
+            raise DatabaseError(
+                "Exception occurred while analyzing database '{}'.  {}".format(
+                    db_name, e
+                )
+            )
+
+    def savepoint(self, db_name, name):
+        """
+        This public method will open a named savepoint on the database. The changes made after it can then be kept
+        with release_savepoint or undone with rollback_savepoint, without ending the surrounding transaction, which is
+        still only committed when the database is stopped. Savepoints can be nested.
+
+        .. code-block:: python
+
+            db.savepoint("transactions", "categorise")
+            db.insert_many("transactions", "transactions", rows)
+            db.rollback_savepoint("transactions", "categorise")  # removes the rows again
+
+        Savepoints are not supported on pooled databases, whose writes are committed as they complete.
+
+        :param db_name: The name of the database. This database must have already been started using the start_db
+            method
+        :type db_name: String
+        :param name: The name of the savepoint. Must be a plain sql identifier
+        :type name: String
+        :return: None
+        """
+
+        self._execute_savepoint(db_name, name, ["create"], "creating")
+
+    def release_savepoint(self, db_name, name):
+        """
+        This public method will release a named savepoint, keeping the changes made since it was opened as part of
+        the surrounding transaction
+
+        :param db_name: The name of the database the savepoint was opened on
+        :type db_name: String
+        :param name: The name of the savepoint
+        :type name: String
+        :return: None
+        """
+
+        self._execute_savepoint(db_name, name, ["release"], "releasing")
+
+    def rollback_savepoint(self, db_name, name):
+        """
+        This public method will undo the changes made since a named savepoint was opened and then release it
+
+        :param db_name: The name of the database the savepoint was opened on
+        :type db_name: String
+        :param name: The name of the savepoint
+        :type name: String
+        :return: None
+        """
+
+        self._execute_savepoint(db_name, name, ["rollback", "release"], "rolling back")
+
+    def commit(self, db_name):
+        """
+        This public method will commit the changes made to the database, without stopping it or backing it up. It
+        lets a long running caller keep a database started while making each unit of work durable as it completes.
+
+        Pooled databases commit their writes as they complete, so are not supported.
+
+        :param db_name: The name of the database to commit. This database must have already been started using the
+            start_db method
+        :type db_name: String
+        :return: None
+        """
+
+        try:
+            self._logger.info("Attempting commit of database '{}'".format(db_name))
+            self._check_db_name(db_name)
+            self._check_not_pooled(db_name, "Commits")
+            self._commit_db(db_name)
+            self._logger.info("Successful commit of database '{}'".format(db_name))
+        except Exception as e:
+            raise DatabaseError(
+                "Exception occurred while committing database '{}'.  {}".format(
+                    db_name, e
+                )
+            )
+
+    def rollback(self, db_name):
+        """
+        This public method will undo the changes made to the database since it was last committed, without stopping
+        it. Pooled databases commit their writes as they complete, so are not supported.
+
+        :param db_name: The name of the database to roll back. This database must have already been started using
+            the start_db method
+        :type db_name: String
+        :return: None
+        """
+
+        try:
+            self._logger.info("Attempting rollback of database '{}'".format(db_name))
+            self._check_db_name(db_name)
+            self._check_not_pooled(db_name, "Rollbacks")
+            self._connections[db_name].rollback()
+            self._logger.info("Successful rollback of database '{}'".format(db_name))
+        except Exception as e:
+            raise DatabaseError(
+                "Exception occurred while rolling back database '{}'.  {}".format(
+                    db_name, e
+                )
+            )
+
+    def backup(self, db_name):
+        """
+        This public method will back up the committed state of the database without stopping it, as stop_db does
+        when committing. The database must have no uncommitted changes, as they would block the backup.
+
+        :param db_name: The name of the database to back up. This database must have already been started using the
+            start_db method
+        :type db_name: String
+        :return: None
+        """
+
+        try:
+            self._logger.info("Attempting backup of database '{}'".format(db_name))
+            self._check_db_name(db_name)
+            if self._connections[db_name].in_transaction:
+                raise DatabaseError(
+                    "The database has uncommitted changes, commit or roll them back first"
+                )
+            self._backup_db(db_name)
+            self._logger.info("Successful backup of database '{}'".format(db_name))
+        except Exception as e:
+            raise DatabaseError(
+                "Exception occurred while backing up database '{}'.  {}".format(
+                    db_name, e
+                )
+            )
+
+    def total_changes(self, db_name):
+        """
+        This public method will return the number of rows inserted, updated or deleted through the database
+        connection since it was started. Comparing two values shows whether a unit of work changed the database.
+
+        :param db_name: The name of the database. This database must have already been started using the start_db
+            method
+        :type db_name: String
+        :return: Integer number of rows changed
+        """
+
+        self._check_db_name(db_name)
+        self._check_not_pooled(db_name, "Change counts")
+        return self._connections[db_name].total_changes
+
+    def sql_cache_info(self):
+        """
+        This public method will return the hit and miss counters of the sql statement cache, for tuning
+        config.database.sql_cache_size
+
+        :return: SQLCacheInfo: named tuple of the cache hits, misses, current size and maximum size
+        """
+
+        return SQLCacheInfo(
+            self._sql_cache_hits,
+            self._sql_cache_misses,
+            len(self._sql_cache),
+            self._config.database.sql_cache_size,
+        )
+
+    def _apply_profile(self, db_name, profile, current=True):
+        """
+        This private method will set the pragmas of the performance profile on the database connection. The journal
+        mode is stored in the database file itself, so it is only set on the current database and never on backups.
+
+        :param db_name: The name of the database to apply the profile to
+        :type db_name: String
+        :param profile: The name of the profile to apply
+        :type profile: String
+        :param current: Signifies if the connection is to the current database (True) or a backup (False)
+        :type current: Boolean
+        :return: None
+        """
+
+        for sql in self._get_profile_pragmas(profile, current):
+            self._execute(db_name, sql)
+
+        self._logger.info(
+            "Applied database profile '{}' to database '{}'".format(profile, db_name)
+        )
+
+    def _get_profile_pragmas(self, profile, journal_mode=True):
+        """
+        This private method will return the pragma statements that apply the performance profile to a connection
+
+        :param profile: The name of the profile
+        :type profile: String
+        :param journal_mode: Optional. Signifies if the journal mode pragma should be included. Default value is True
+        :type journal_mode: Boolean
+        :return: List of String sql statements
+        """
+
+        profile_config = self._config.database.profiles[profile]
+        pragmas = {
+            "synchronous": profile_config.synchronous,
+            "cache_size": profile_config.cache_size,
+            "mmap_size": profile_config.mmap_size,
+            "temp_store": profile_config.temp_store,
+            "busy_timeout": profile_config.busy_timeout,
+        }
+        if journal_mode:
+            pragmas["journal_mode"] = profile_config.journal_mode
+
+        return [
+            self._sql["pragma"].format(name=name, value=value)
+            for name, value in pragmas.items()
+        ]
+
+    def _connect(self, db_path, pooled=False):
+        """
+        This private method will open a connection to the database file. Pooled connections can be used from threads
+        other than the one that opened them.
+
+        :param db_path: The full path to the database file
+        :type db_path: String
+        :param pooled: Optional. Signifies if the connection belongs to a connection pool. Default value is False
+        :type pooled: Boolean
+        :return: sqlite3.Connection
+        """
+
+        connect_kwargs = {
+            "cached_statements": self._config.database.statement_cache_size
+        }
+        if pooled:
+            connect_kwargs["check_same_thread"] = False
+        return sqlite3.connect(db_path, **connect_kwargs)
+
+    def _open_reader(self, db_path, profile):
+        """
+        This private method will open a read only connection to the database file for a connection pool, tuned with
+        the performance profile provided
+
+        :param db_path: The full path to the database file
+        :type db_path: String
+        :param profile: The name of the performance profile to apply
+        :type profile: String
+        :return: sqlite3.Connection
+        """
+
+        connection = self._connect(db_path, pooled=True)
+        for sql in self._get_profile_pragmas(profile, journal_mode=False):
+            connection.execute(sql)
+        connection.execute(self._sql["pragma"].format(name="query_only", value="ON"))
+        return connection
+
+    def _get_connection(self, db_name):
+        """
+        This private method will return the connection to use for the database on the calling thread, as described
+        in _get_cursor
+
+        :param db_name: The name of the database
+        :type db_name: String
+        :return: sqlite3.Connection
+        """
+
+        pool = self._pools.get(db_name)
+        if pool is None or pool.is_writer_thread():
+            return self._connections[db_name]
+        return pool.get_reader_cursor().connection
+
+    def _get_cursor(self, db_name):
+        """
+        This private method will return the cursor to use for the database on the calling thread. Without a pool, or
+        on the writer thread of a pool, this is the cursor of the database connection. Other threads of a pooled
+        database use their own read connection.
+
+        :param db_name: The name of the database
+        :type db_name: String
+        :return: sqlite3.Cursor
+        """
+
+        pool = self._pools.get(db_name)
+        if pool is None or pool.is_writer_thread():
+            return self._cursors[db_name]
+        return pool.get_reader_cursor()
+
+    def _get_write_pool(self, db_name):
+        """
+        This private method will return the connection pool that writes to the database must be queued to, or None if
+        the write can run on the calling thread. Writes run on the calling thread when the database is not pooled, or
+        when called from the writer thread of the pool.
+
+        :param db_name: The name of the database
+        :type db_name: String
+        :return: ConnectionPool or None
+        """
+
+        pool = self._pools.get(db_name)
+        if pool is None or pool.is_writer_thread():
+            return None
+        return pool
+
     def _build_tables(self, db_name):
         """
-        This private method will build all of the table create statements for the database specified
+        This private method will build all of the tables of the database specified, along with the secondary indexes
+        declared for each table in config.database.indexes. Both are only created if they do not already exist.
 
         :param db_name: The name of the database to build the tables for.
         :type db_name: String
@@ -225,6 +835,7 @@ class Database:
                     "table_name": "transactions",
                     "col_spec": self._config.database.column_specs["transactions"],
                     "primary_keys": self._config.database.primary_keys.transactions,
+                    "indexes": self._config.database.indexes.transactions,
                 }
             ]
         }[db_name]
@@ -237,6 +848,52 @@ class Database:
             )
 
             self._execute(db_name, sql)
+            self._add_missing_columns(
+                db_name, table_info["table_name"], table_info["col_spec"]
+            )
+
+            for index in table_info["indexes"]:
+                sql = self._sql["create_index"].format(
+                    name=index.name,
+                    table=table_info["table_name"],
+                    columns=", ".join(index.columns),
+                )
+                self._execute(db_name, sql)
+
+    def _add_missing_columns(self, db_name, table, col_spec):
+        """
+        This private method will add the columns of the column specification that an existing table does not have
+        yet, so that databases created by earlier versions of PyFynance pick up new columns. Rows already in the
+        table are given NULL values for the new columns.
+
+        :param db_name: The name of the database the table is in
+        :type db_name: String
+        :param table: The name of the table
+        :type table: String
+        :param col_spec: Contains the column names and data types for the database table
+        :type col_spec: Dictionary
+        :return: None
+        """
+
+        existing_columns = {
+            row[1]
+            for row in self._execute(
+                db_name, self._sql["table_info"].format(table=table)
+            ).fetchall()
+        }
+        for col_name, col_type in col_spec.items():
+            if col_name not in existing_columns:
+                self._logger.info(
+                    "Adding column '{}' to table '{}.{}'".format(
+                        col_name, db_name, table
+                    )
+                )
+                self._execute(
+                    db_name,
+                    self._sql["add_column"].format(
+                        table=table, column="{} {}".format(col_name, col_type)
+                    ),
+                )
 
     def _commit_db(self, db_name):
         """
@@ -251,27 +908,114 @@ class Database:
 
     def _backup_db(self, db_name):
         """
-        This private method will backup the database instance that has just been stopped.
+        This private method will backup the committed state of the database using the sqlite3 online backup API.
+        Pages are copied config.database.backup.pages_per_step at a time, so the database remains usable by other
+        connections while the backup runs.
+
+        The backup is skipped if the connection made no changes to the database and a backup of it already exists.
+        Each backup taken is added to the backup catalog, and backups outside of the retention policy in
+        config.database.backup are removed.
 
         :param db_name: The name of the database to backup
         :type db_name: String
         :return: None
         """
 
+        connection = self._connections[db_name]
+        catalog = self._get_backup_catalog()
+        if connection.total_changes == 0 and catalog.get_latest(db_name) is not None:
+            self._logger.info(
+                "No changes made to database '{}', skipping backup".format(db_name)
+            )
+            return
+
         timestamp = datetime.datetime.now().strftime("%Y%m%d%H%M%S")
-        source_path = os.sep.join(
-            [self._config.paths.db_path, "current", "{}.db".format(db_name)]
+        backup_name, backup_path = self._get_new_backup_path(
+            db_name, timestamp, catalog
         )
-        backup_path = os.sep.join(
-            [
-                self._config.paths.db_path,
-                "backup",
-                "{}_{}.db".format(db_name, timestamp),
-            ]
+        temp_path = "{}.tmp".format(backup_path)
+
+        target = sqlite3.connect(temp_path)
+        try:
+            connection.backup(target, pages=self._config.database.backup.pages_per_step)
+            target.execute(
+                self._sql["pragma"].format(name="journal_mode", value="delete")
+            )
+        finally:
+            target.close()
+        os.replace(temp_path, backup_path)
+
+        catalog.add(db_name, backup_name, timestamp)
+        self._expire_backups(db_name, catalog)
+        catalog.save()
+        self._logger.info(
+            "Backed up database '{}' to '{}'".format(db_name, backup_path)
+        )
+
+    def _get_new_backup_path(self, db_name, timestamp, catalog):
+        """
+        This private method will return an unused name and path for a new backup of the database. Backups are named
+        after the second they were taken at, and a counter is added to the name of any further backups taken within
+        the same second, so that no backup replaces another.
+
+        :param db_name: The name of the database being backed up
+        :type db_name: String
+        :param timestamp: The timestamp the backup is taken at, in the format YYYYmmddHHMMSS
+        :type timestamp: String
+        :param catalog: The backup catalog
+        :type catalog: BackupCatalog
+        :return: Tuple of the backup file name and its full path
+        """
+
+        backup_names = {backup["name"] for backup in catalog.get_backups(db_name)}
+        backup_name = "{}_{}.db".format(db_name, timestamp)
+        count = 0
+        while True:
+            backup_path = os.sep.join(
+                [self._config.paths.db_path, "backup", backup_name]
+            )
+            if backup_name not in backup_names and not os.path.exists(backup_path):
+                return backup_name, backup_path
+            count += 1
+            backup_name = "{}_{}_{}.db".format(db_name, timestamp, count)
+
+    def _expire_backups(self, db_name, catalog):
+        """
+        This private method will remove the backups of the database that fall outside of the retention policy in
+        config.database.backup, from both the backup folder and the catalog
+
+        :param db_name: The name of the database to expire backups of
+        :type db_name: String
+        :param catalog: The backup catalog
+        :type catalog: BackupCatalog
+        :return: None
+        """
+
+        backup_config = self._config.database.backup
+        expired = find_expired_backups(
+            catalog.get_backups(db_name),
+            backup_config.keep_recent,
+            backup_config.keep_daily,
+            backup_config.keep_monthly,
         )
-        shutil.copyfile(source_path, backup_path)
 
-    def _execute(self, db_name, sql):
+        for backup_name in expired:
+            try:
+                os.remove(
+                    os.sep.join([self._config.paths.db_path, "backup", backup_name])
+                )
+            except FileNotFoundError:
+                pass
+        catalog.remove(db_name, expired)
+
+        if expired:
+            self._logger.info(
+                "Removed {} expired backups of database '{}'".format(
+                    len(expired), db_name
+                )
+            )
+
+    def _execute(self, db_name, sql, parameters=None):
         """
         This private method will execute a database command on the specified database.
 
@@ -279,14 +1023,161 @@ class Database:
         :type db_name: String
         :param sql: The sql command that should be executed
         :type sql: String
+        :param parameters: Optional. Values to bind to the "?" placeholders of the sql command. Default value is None
+        :type parameters: Tuple
         :return: None
         """
 
         self._logger.debug("Attempting to execute sql command '{}'".format(sql))
-        execute_output = self._cursors[db_name].execute(sql)
+        cursor = self._get_cursor(db_name)
+        if parameters is None:
+            execute_output = cursor.execute(sql)
+        else:
+            execute_output = cursor.execute(sql, parameters)
         self._logger.debug("Successful execution of sql command '{}'".format(sql))
         return execute_output
 
+    def _execute_savepoint(self, db_name, name, commands, action):
+        """
+        This private method will run the savepoint commands provided for the named savepoint
+
+        :param db_name: The name of the database the savepoint is on
+        :type db_name: String
+        :param name: The name of the savepoint
+        :type name: String
+        :param commands: The names of the savepoint sql commands to run, in order
+        :type commands: List
+        :param action: Description of the action, used in log and error messages
+        :type action: String
+        :return: None
+        """
+
+        try:
+            self._logger.info(
+                "Attempting {} savepoint '{}' of database '{}'".format(
+                    action, name, db_name
+                )
+            )
+            self._check_db_name(db_name)
+            check_identifier(name)
+            self._check_not_pooled(db_name, "Savepoints")
+            for command in commands:
+                cursor = self._get_cursor(db_name)
+                if command == "create" and not cursor.connection.in_transaction:
+                    # releasing the savepoint that began a transaction would commit it, so begin one first
+                    self._execute(db_name, self._sql["begin"])
+                self._execute(
+                    db_name, self._sql["savepoint"][command].format(name=name)
+                )
+            self._logger.info(
+                "Successful {} savepoint '{}' of database '{}'".format(
+                    action, name, db_name
+                )
+            )
+        except Exception as e:
+            raise DatabaseError(
+                "Exception occurred while {} savepoint '{}' of database '{}'.  {}".format(
+                    action, name, db_name, e
+                )
+            )
+
+    def _execute_many(self, db_name, sql, rows, batch_size):
+        """
+        This private method will execute a parameterised database command once for every row provided, in batches of
+        batch_size rows. The rows are executed within a savepoint that is rolled back if any batch fails, leaving the
+        surrounding transaction as it was.
+
+        :param db_name: The name of the database that the command should be run against
+        :type db_name: String
+        :param sql: The parameterised sql command that should be executed
+        :type sql: String
+        :param rows: Iterable of parameter tuples, one per row
+        :type rows: Iterable
+        :param batch_size: The number of rows to send to sqlite per executemany call
+        :type batch_size: Integer
+        :return: Tuple (Integer number of rows changed, Integer number of rows executed)
+        """
+
+        cursor = self._get_cursor(db_name)
+        if not cursor.connection.in_transaction:
+            cursor.execute(self._sql["begin"])
+        cursor.execute(self._sql["savepoint"]["create"].format(name="insert_many"))
+
+        changed = 0
+        total = 0
+        try:
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                self._logger.debug(
+                    "Attempting to execute sql command '{}' for {} rows".format(
+                        sql, len(batch)
+                    )
+                )
+                cursor.executemany(sql, batch)
+                changed += cursor.rowcount
+                total += len(batch)
+        except Exception:
+            cursor.execute(
+                self._sql["savepoint"]["rollback"].format(name="insert_many")
+            )
+            cursor.execute(self._sql["savepoint"]["release"].format(name="insert_many"))
+            raise
+
+        cursor.execute(self._sql["savepoint"]["release"].format(name="insert_many"))
+        return changed, total
+
+    def _build_insert_many_sql(self, table, columns, on_conflict):
+        """
+        This private method will build the parameterised insert statement for the table, columns and conflict policy
+        provided. The upsert conflict target is the primary key of the table from config.database.primary_keys.
+
+        :param table: The name of the table to insert into
+        :type table: String
+        :param columns: The names of the columns to insert
+        :type columns: List
+        :param on_conflict: The conflict policy, or None
+        :type on_conflict: String
+        :return: String: sql statement
+        """
+
+        sql_formats = {"columns": ", ".join(columns), "table": table}
+        sql_formats["placeholders"] = ", ".join(["?"] * len(columns))
+
+        if on_conflict == "upsert":
+            primary_keys = getattr(self._config.database.primary_keys, table)
+            sql_formats["keys"] = ", ".join(primary_keys)
+            sql_formats["updates"] = ", ".join(
+                "{column} = excluded.{column}".format(column=column)
+                for column in columns
+                if column not in primary_keys
+            )
+            if not sql_formats["updates"]:
+                on_conflict = "ignore"
+
+        return self._sql["insert_many"][on_conflict or "none"].format(**sql_formats)
+
+    def _check_conflict_policy(self, on_conflict):
+        """
+        This private method checks that the conflict policy provided is None or one of the acceptable policies from the
+        config object
+
+        :param on_conflict: The conflict policy to check
+        :type on_conflict: String
+        :return: None
+        """
+
+        if (
+            on_conflict is not None
+            and on_conflict not in self._config.database.conflict_policies
+        ):
+            raise DatabaseError(
+                "Conflict policy '{}' is unknown. Acceptable conflict policies are '{}'".format(
+                    on_conflict, list(self._config.database.conflict_policies)
+                )
+            )
+
     def _check_db_name(self, db_name):
         """
         This private method will check that the given db name exists within the names list from the config service.
@@ -299,7 +1190,59 @@ class Database:
         if db_name not in self._config.database.db_names:
             raise DatabaseError(
                 "Database name specified is not an acceptable PyFynance database. Acceptable "
-                "PyFynance databases include {}".format(self._config.database.db_names)
+                "PyFynance databases include {}".format(
+                    list(self._config.database.db_names)
+                )
+            )
+
+    def _check_not_pooled(self, db_name, feature):
+        """
+        This private method will check that the database was not started in pooled mode, for features that need the
+        transaction of its single connection
+
+        :param db_name: The name of the database to check
+        :type db_name: String
+        :param feature: Description of the feature, used in the error message
+        :type feature: String
+        :return: None
+        """
+
+        if self._pools.get(db_name) is not None:
+            raise DatabaseError(
+                "{} are not supported on pooled databases".format(feature)
+            )
+
+    def _check_profile(self, profile):
+        """
+        This private method checks that the profile name provided is one of the profiles from the config object
+
+        :param profile: The profile name to check
+        :type profile: String
+        :return: None
+        """
+
+        if profile not in self._config.database.profiles:
+            raise DatabaseError(
+                "Profile '{}' is unknown. Acceptable profiles are '{}'".format(
+                    profile, sorted(self._config.database.profiles)
+                )
+            )
+
+    def _check_row_type(self, row_type):
+        """
+        This private method checks that the row type provided is None or one of the acceptable row types from the
+        config object
+
+        :param row_type: The row type to check
+        :type row_type: String
+        :return: None
+        """
+
+        if row_type is not None and row_type not in self._config.database.row_types:
+            raise DatabaseError(
+                "Row type '{}' is unknown. Acceptable row types are '{}'".format(
+                    row_type, list(self._config.database.row_types)
+                )
             )
 
     def _check_table_name(self, db_name, table):
@@ -321,7 +1264,7 @@ class Database:
         if table not in tables:
             raise DatabaseError(
                 "Table name '{}' is not a known table for database '{}'. Known tables are '{}' ".format(
-                    table, db_name, tables
+                    table, db_name, list(tables)
                 )
             )
 
@@ -344,15 +1287,32 @@ class Database:
         )
         return os.sep.join([self._config.paths.db_path, state, db_name])
 
+    def _get_backup_catalog(self):
+        """
+        This private method will load the backup catalog from the backup folder
+
+        :return: BackupCatalog
+        """
+
+        return BackupCatalog(
+            os.sep.join([self._config.paths.db_path, "backup", "catalog.json"])
+        )
+
     def _get_backup_db_name(self, db_name):
         """
-        This private method will determine the latest backup version of the db_name that is provided
+        This private method will determine the latest backup version of the db_name that is provided. The latest
+        backup is read from the backup catalog, falling back to searching the backup folder for databases backed up
+        before the catalog existed.
 
         :param db_name: The name of the database to find
         :type db_name: String
         :return: the name of the latest backup for that database
         """
 
+        latest = self._get_backup_catalog().get_latest(db_name)
+        if latest is not None:
+            return latest
+
         search_path = os.sep.join(
             [self._config.paths.db_path, "backup", "{}*.db".format(db_name)]
         )
@@ -375,6 +1335,153 @@ class Database:
             column_specs.append("{} {}".format(col_name, col_type))
         return ", ".join(column_specs)
 
+    def _build_insert_sql(self, table, columns):
+        """
+        This private method will build the parameterised insert statement for the table and columns provided
+
+        :param table: The name of the table to insert into
+        :type table: String
+        :param columns: The names of the columns to insert
+        :type columns: Tuple
+        :return: String sql statement
+        """
+
+        return self._sql["insert"].format(
+            table=table,
+            columns=", ".join(columns),
+            placeholders=", ".join(["?"] * len(columns)),
+        )
+
+    def _build_select_sql(self, table, columns, where, order_by, limit):
+        """
+        This private method will build the select statement for the table, columns, where condition, ordering and
+        limit provided
+
+        :param table: The name of the table to select from
+        :type table: String
+        :param columns: Tuple of columns to select, or None to select all columns
+        :type columns: Tuple
+        :param where: Where command to filter the select statement with, or None
+        :type where: String
+        :param order_by: Tuple of column names to order by, prefixed with "-" for descending order, or None
+        :type order_by: Tuple
+        :param limit: Signifies if the statement should end with a limit placeholder
+        :type limit: Boolean
+        :return: String sql statement
+        """
+
+        sql_key = "select_{cols}from{wheres}".format(
+            cols="columns_" if columns else "all_", wheres="_where" if where else ""
+        )
+        column_names = ", ".join(columns) if columns else None
+
+        clauses = ""
+        if order_by:
+            order = ", ".join(
+                "{} DESC".format(check_identifier(column[1:]))
+                if column.startswith("-")
+                else check_identifier(column)
+                for column in order_by
+            )
+            clauses += self._sql["select"]["order_by"].format(order=order)
+        if limit:
+            clauses += self._sql["select"]["limit"]
+
+        return self._sql["select"][sql_key].format(
+            table=table, columns=column_names, where=where, clauses=clauses
+        )
+
+    def _get_select_sql(self, table, columns, where, parameters, order_by, limit):
+        """
+        This private method will return the select statement for the table, columns, where condition, ordering and
+        limit provided from the sql cache, along with the parameters to execute it with. Predicate where conditions
+        are compiled to their sql template and parameters.
+
+        :param table: The name of the table to select from
+        :type table: String
+        :param columns: List of columns to select, or None to select all columns
+        :type columns: List
+        :param where: Predicate or where command to filter the select statement with, or None
+        :type where: Predicate or String
+        :param parameters: Values to bind to the "?" placeholders of a where command, or None
+        :type parameters: Tuple
+        :param order_by: List of column names to order by, prefixed with "-" for descending order, or None
+        :type order_by: List
+        :param limit: The maximum number of rows to return, or None
+        :type limit: Integer
+        :return: Tuple (String sql statement, Tuple parameters or None)
+        """
+
+        if isinstance(where, Predicate):
+            if parameters is not None:
+                raise DatabaseError(
+                    "Parameters can only be provided with a where command, not a predicate"
+                )
+            where, parameters = where.compile()
+
+        columns = tuple(columns) if columns else None
+        order_by = tuple(order_by) if order_by else None
+        sql = self._get_cached_sql(
+            ("select", table, columns, where, order_by, limit is not None),
+            self._build_select_sql,
+            table,
+            columns,
+            where,
+            order_by,
+            limit is not None,
+        )
+
+        if limit is not None:
+            parameters = tuple(parameters or ()) + (limit,)
+        return sql, parameters
+
+    def _get_cached_sql(self, key, build_sql, *args):
+        """
+        This private method will return the sql statement cached under the key provided, building and caching it with
+        build_sql(*args) on a miss. The cache holds at most config.database.sql_cache_size statements, discarding the
+        least recently used statement when full.
+
+        Because the cached statements use "?" placeholders rather than inlined values, the same statement text is
+        passed to sqlite for every call and sqlite3's own compiled statement cache is hit as well.
+
+        :param key: The cache key, a tuple of (operation, table, columns, where template or conflict policy, ...)
+        :type key: Tuple
+        :param build_sql: The function that builds the statement on a cache miss
+        :type build_sql: Function
+        :param args: The arguments to call build_sql with
+        :return: String sql statement
+        """
+
+        with self._sql_cache_lock:
+            sql = self._sql_cache.get(key)
+            if sql is not None:
+                self._sql_cache_hits += 1
+                self._sql_cache.move_to_end(key)
+                return sql
+
+            self._sql_cache_misses += 1
+            sql = build_sql(*args)
+            self._sql_cache[key] = sql
+            if len(self._sql_cache) > self._config.database.sql_cache_size:
+                self._sql_cache.popitem(last=False)
+            return sql
+
+    @staticmethod
+    def _get_row_values_getter(columns):
+        """
+        This private static method will return a function that gets the values of the columns provided from a
+        dictionary row, as a tuple in column order
+
+        :param columns: The names of the columns to get
+        :type columns: List
+        :return: function taking a Dictionary and returning a Tuple
+        """
+
+        if len(columns) == 1:
+            column = columns[0]
+            return lambda row: (row[column],)
+        return itemgetter(*columns)
+
     @staticmethod
     def _set_db_statements():
         """
@@ -385,26 +1492,31 @@ class Database:
 
         return {
             "create": "CREATE TABLE IF NOT EXISTS {table} ({col_spec}, PRIMARY KEY ({keys}));",
-            "insert": "INSERT INTO {table}({columns}) VALUES({data});",
+            "create_index": "CREATE INDEX IF NOT EXISTS {name} ON {table}({columns});",
+            "table_info": "PRAGMA table_info({table});",
+            "add_column": "ALTER TABLE {table} ADD COLUMN {column};",
+            "analyze": "ANALYZE;",
+            "insert": "INSERT INTO {table}({columns}) VALUES({placeholders});",
+            "insert_many": {
+                "none": "INSERT INTO {table}({columns}) VALUES({placeholders});",
+                "ignore": "INSERT OR IGNORE INTO {table}({columns}) VALUES({placeholders});",
+                "replace": "INSERT OR REPLACE INTO {table}({columns}) VALUES({placeholders});",
+                "upsert": "INSERT INTO {table}({columns}) VALUES({placeholders}) "
+                "ON CONFLICT({keys}) DO UPDATE SET {updates};",
+            },
+            "begin": "BEGIN;",
+            "pragma": "PRAGMA {name} = {value};",
+            "savepoint": {
+                "create": "SAVEPOINT {name};",
+                "rollback": "ROLLBACK TO {name};",
+                "release": "RELEASE {name};",
+            },
             "select": {
-                "select_all_from": "SELECT * FROM {table};",
-                "select_columns_from": "SELECT {columns} FROM {table};",
-                "select_all_from_where": "SELECT * FROM {table} WHERE {where};",
-                "select_columns_from_where": "SELECT {columns} FROM {table} WHERE {where};",
+                "select_all_from": "SELECT * FROM {table}{clauses};",
+                "select_columns_from": "SELECT {columns} FROM {table}{clauses};",
+                "select_all_from_where": "SELECT * FROM {table} WHERE {where}{clauses};",
+                "select_columns_from_where": "SELECT {columns} FROM {table} WHERE {where}{clauses};",
+                "order_by": " ORDER BY {order}",
+                "limit": " LIMIT ?",
             },
         }
-
-    @staticmethod
-    def _cast_data_for_insert(data):
-        """
-        This private static method will correctly cast data based on its data type for insertion into a table
-        using sqlite3
-
-        :param data: ANY: the data that needs to be cast
-        :return: ANY: returns the correctly cast data for insertion
-        """
-
-        if type(data) is str:
-            return '"{}"'.format(data)
-        else:
-            return str(data)
@@ -0,0 +1,175 @@
+import logging
+import os
+import select
+import sys
+import time
+
+from core import helpers
+from core.config import Configuration
+
+# inotify_add_watch event masks, from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+
+
+class FolderWatcher:
+    """
+    The Folder Watcher service watches a folder for new files matching a set of patterns, for long running callers
+    that process files as they arrive rather than once per run.
+
+    .. code-block:: python
+
+        watcher = FolderWatcher(landing_path, ["*.ofx", "*.qfx"])
+        while True:
+            for file_path in watcher.get_ready_files():
+                process(file_path)
+            watcher.wait(watcher.get_wait_time())
+
+    New files are only returned once they have settled, meaning their size and modification time have not changed
+    for config.daemon.settle_time seconds, so files that are still being written are not picked up part way through.
+    Each file is returned once, and is returned again only if it is removed from the folder and then added back.
+
+    Where inotify is available, and config.daemon.use_inotify is set, wait returns as soon as a file in the folder
+    changes. Otherwise the folder is polled every config.daemon.poll_interval seconds.
+    """
+
+    def __init__(self, path, patterns):
+        """
+        initialises a new instance of the FolderWatcher class, and an inotify watch on the folder where available
+
+        :param path: The full path to the folder to watch
+        :type path: String
+        :param patterns: List of the file name patterns to watch for, such as "*.ofx"
+        :type patterns: List
+        """
+
+        self._logger = logging.getLogger(__name__)
+        self._config = Configuration()
+        self._path = path
+        self._patterns = patterns
+        self._settling = {}
+        self._returned = set()
+        self._inotify_fd = None
+        if self._config.daemon.use_inotify:
+            self._inotify_fd = self._open_inotify(path)
+        self._logger.info(
+            "Watching folder '{}' {}".format(
+                path, "with inotify" if self._inotify_fd is not None else "by polling"
+            )
+        )
+
+    def get_ready_files(self):
+        """
+        This public method will scan the folder and return the files that have settled since they were last scanned,
+        in the order they settled
+
+        :return: List of the full paths of the settled files
+        """
+
+        now = time.monotonic()
+        file_paths = set(helpers.find_all_files(self._path, self._patterns))
+        self._returned &= file_paths
+        for file_path in set(self._settling) - file_paths:
+            del self._settling[file_path]
+
+        ready_files = []
+        for file_path in sorted(file_paths - self._returned):
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_size, stat.st_mtime_ns)
+            if self._settling.get(file_path, (None,))[0] != signature:
+                self._settling[file_path] = (signature, now)
+            if now - self._settling[file_path][1] >= self._config.daemon.settle_time:
+                del self._settling[file_path]
+                self._returned.add(file_path)
+                ready_files.append(file_path)
+        return ready_files
+
+    def get_wait_time(self):
+        """
+        This public method will return how long to wait before the folder should next be scanned, which is shorter
+        while files are settling
+
+        :return: Float, the number of seconds to wait
+        """
+
+        if self._settling:
+            return min(
+                self._config.daemon.poll_interval, self._config.daemon.settle_time
+            )
+        return self._config.daemon.poll_interval
+
+    def wait(self, timeout):
+        """
+        This public method will wait until a file in the folder changes, where inotify is available, or until the
+        timeout has passed
+
+        :param timeout: The maximum number of seconds to wait
+        :type timeout: Float
+        :return: Boolean, True if a change in the folder ended the wait
+        """
+
+        if self._inotify_fd is None:
+            time.sleep(timeout)
+            return False
+
+        readable, _, _ = select.select([self._inotify_fd], [], [], timeout)
+        if not readable:
+            return False
+        # the events are only used to end the wait early, the folder is scanned for the files that changed
+        try:
+            while os.read(self._inotify_fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        """
+        This public method will remove the inotify watch on the folder, if one was opened
+
+        :return: None
+        """
+
+        if self._inotify_fd is not None:
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+    def _open_inotify(self, path):
+        """
+        This private method will open an inotify watch on the folder for files being written, created or moved into
+        it, returning None where inotify is not available
+
+        :param path: The full path to the folder to watch
+        :type path: String
+        :return: Integer, the inotify file descriptor, or None
+        """
+
+        if not sys.platform.startswith("linux"):
+            return None
+
+        # delayed import, ctypes is only required to call inotify on linux
+        import ctypes
+        import ctypes.util
+
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+            mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+            if libc.inotify_add_watch(fd, os.fsencode(path), mask) < 0:
+                os.close(fd)
+                raise OSError(ctypes.get_errno(), "inotify_add_watch failed")
+        except (AttributeError, OSError) as e:
+            self._logger.warning(
+                "inotify is not available, polling folder '{}' instead.  {}".format(
+                    path, e
+                )
+            )
+            return None
+        return fd
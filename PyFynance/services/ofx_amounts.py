@@ -0,0 +1,97 @@
+"""
+The ofx_amounts module is the money casting layer used by the OFXParser service.
+
+Alongside the default Decimal representation, amounts can be parsed straight into integer minor units of their
+currency (e.g. cents for AUD, yen for JPY). Integer amounts are exact, cheap to store as sqlite INTEGER values and can
+be summed directly in SQL. Decimals are only produced at the edge, using minor_units_to_decimal.
+"""
+
+from decimal import Decimal
+
+from core.exceptions import OFXParserError
+
+
+def cast_ofx_amount_to_minor_units(value, exponent=2):
+    """
+    This public function will cast an ofx amount string to an integer number of minor units. Values with more
+    decimal places than the currency exponent allows are rejected rather than rounded.
+
+    .. code-block:: python
+
+        cast_ofx_amount_to_minor_units("-19.66")  # -1966
+        cast_ofx_amount_to_minor_units("1500", exponent=0)  # 1500
+
+    :param value: The ofx amount string to cast
+    :type value: String
+    :param exponent: Optional. The number of decimal places of the currency. Default value is 2
+    :type exponent: Integer
+    :return: Integer amount in minor units
+    """
+
+    negative = value.startswith("-")
+    whole, _, fraction = value.lstrip("+-").partition(".")
+
+    if not (whole or fraction) or not (whole + fraction).isdigit():
+        raise OFXParserError("Amount '{}' is not a valid OFX amount".format(value))
+
+    if len(fraction.rstrip("0")) > exponent:
+        raise OFXParserError(
+            "Amount '{}' has more than {} decimal places".format(value, exponent)
+        )
+
+    units = int(whole or "0") * 10 ** exponent
+    if exponent:
+        units += int(fraction[:exponent].ljust(exponent, "0"))
+    return -units if negative else units
+
+
+def minor_units_to_decimal(units, exponent=2):
+    """
+    This public function will convert an integer number of minor units back to an exact Decimal amount
+
+    :param units: The amount in minor units
+    :type units: Integer
+    :param exponent: Optional. The number of decimal places of the currency. Default value is 2
+    :type exponent: Integer
+    :return: Decimal amount
+    """
+
+    return Decimal(units).scaleb(-exponent)
+
+
+def stored_amount_to_decimal(amount, exponent=None):
+    """
+    This public function will convert an amount read from the transactions table to an exact Decimal. Amounts loaded
+    as minor units are stored with the exponent of their currency, while amounts loaded as decimals are stored with
+    no exponent.
+
+    .. code-block:: python
+
+        stored_amount_to_decimal(-1966, 2)  # Decimal("-19.66")
+        stored_amount_to_decimal(-19.66)  # Decimal("-19.66")
+
+    :param amount: The amount column value
+    :type amount: Integer, Float or String
+    :param exponent: Optional. The amount_exponent column value. Default value is None, for decimal amounts
+    :type exponent: Integer
+    :return: Decimal amount
+    """
+
+    if exponent is None:
+        return Decimal(str(amount))
+    return minor_units_to_decimal(amount, exponent)
+
+
+def get_currency_exponent(currency, currency_exponents):
+    """
+    This public function will return the number of decimal places used by a currency
+
+    :param currency: The ISO 4217 currency code e.g. "AUD". None returns the default exponent
+    :type currency: String
+    :param currency_exponents: Dictionary of currency code to exponent, with a "default" entry for all currencies
+        not listed
+    :type currency_exponents: Dictionary
+    :return: Integer exponent
+    """
+
+    return currency_exponents.get(currency, currency_exponents["default"])
@@ -0,0 +1,254 @@
+from array import array
+
+import numpy as np
+
+from core.exceptions import OFXParserError
+from services.ofx_amounts import cast_ofx_amount_to_minor_units, get_currency_exponent
+from services.ofx_dates import cast_ofx_datetime_column
+
+# pandas Categoricals hold their codes as int8 while there are fewer than 127 categories and as int16 while there are
+# fewer than 32767, so the trn_type codes are built the same way for to_dataframe to use them without a copy
+_INT8_CATEGORY_LIMIT = np.iinfo(np.int8).max
+_INT16_CATEGORY_LIMIT = np.iinfo(np.int16).max
+
+
+class BankingTransactionColumns:
+    """
+    The Banking Transaction Columns class holds a set of parsed banking transactions in columnar form, with one numpy
+    array per transaction attribute rather than one python object per transaction.
+
+    The amount column is scaled by amount_exponent, the number of decimal places of the statement currency, so
+    amount / 10 ** amount_exponent gives the amount in major units.
+
+    The columns held are:
+        * amount        int64 amount in minor units of the statement currency (cents for AUD)
+        * date_posted   datetime64[s]
+        * date_user     datetime64[s], NaT where the transaction has no user date
+        * trn_type      int8 codes into the trn_type_categories list, or int16 codes when there are 127 or more
+                        categories
+        * fitid         object array of strings
+        * name          object array of strings, None where the transaction has no name
+        * memo          object array of strings, None where the transaction has no memo
+
+    .. code-block:: python
+
+        columns = ofx_parser.parse("banking_transactions", path, output="columnar")
+        total_minor_units = columns.amount.sum()
+        data_frame = columns.to_dataframe()
+    """
+
+    def __init__(
+        self,
+        amount,
+        date_posted,
+        date_user,
+        trn_type,
+        trn_type_categories,
+        fitid,
+        name,
+        memo,
+        currency=None,
+        amount_exponent=2,
+    ):
+        self.amount = amount
+        self.date_posted = date_posted
+        self.date_user = date_user
+        self.trn_type = trn_type
+        self.trn_type_categories = trn_type_categories
+        self.fitid = fitid
+        self.name = name
+        self.memo = memo
+        self.currency = currency
+        self.amount_exponent = amount_exponent
+
+    def __len__(self):
+        return len(self.fitid)
+
+    def to_dataframe(self):
+        """
+        This public method will convert the columns to a pandas DataFrame without copying the underlying arrays. The
+        trn_type column is returned as a pandas Categorical built over the existing codes array.
+
+        :return: pandas DataFrame
+        """
+
+        # delayed import, pandas is only required when a DataFrame is requested
+        import pandas as pd
+
+        return pd.DataFrame(
+            {
+                "trn_type": pd.Categorical.from_codes(
+                    self.trn_type, self.trn_type_categories
+                ),
+                "date_posted": self.date_posted,
+                "date_user": self.date_user,
+                "amount": self.amount,
+                "fitid": self.fitid,
+                "name": self.name,
+                "memo": self.memo,
+            },
+            copy=False,
+        )
+
+
+class BankingTransactionColumnBuilder:
+    """
+    The Banking Transaction Column Builder fills BankingTransactionColumns directly from the element stream of the
+    OFXTokenizer. Values are appended straight onto their column buffers as each element is read, so no per
+    transaction dictionaries or objects are created.
+
+    The numpy columns returned by build share memory with the builder buffers, so a builder instance should only be
+    used to build a single set of columns.
+    """
+
+    _COLUMN_INDEXES = {
+        "trntype": 0,
+        "dtposted": 1,
+        "dtuser": 2,
+        "trnamt": 3,
+        "fitid": 4,
+        "name": 5,
+        "memo": 6,
+    }
+    _REQUIRED_COLUMNS = ("trntype", "dtposted", "trnamt", "fitid")
+
+    def __init__(self, trn_types, currency_exponents=None):
+        """
+        initialises a new instance of the BankingTransactionColumnBuilder class
+
+        :param trn_types: the known ofx transaction types, in category code order. Unknown transaction types found in
+            a file are appended to the categories as they are found
+        :type trn_types: List
+        :param currency_exponents: Optional. Dictionary of currency code to number of decimal places, with a "default"
+            entry for all currencies not listed. Default value is None, which uses 2 decimal places for all currencies
+        :type currency_exponents: Dictionary
+        """
+
+        self._trn_type_categories = list(trn_types)
+        self._trn_type_codes = {
+            trn_type: code for code, trn_type in enumerate(self._trn_type_categories)
+        }
+        self._amounts = array("q")
+        self._trn_types = array(
+            "b" if len(self._trn_type_categories) < _INT8_CATEGORY_LIMIT else "h"
+        )
+        self._dates_posted = []
+        self._dates_user = []
+        self._fitids = []
+        self._names = []
+        self._memos = []
+        self._currency_exponents = currency_exponents or {"default": 2}
+        self._currency = None
+        self._amount_exponent = get_currency_exponent(None, self._currency_exponents)
+
+    def build(self, elements, aggregate="stmttrn"):
+        """
+        This public method will consume the element stream provided and return the columns for every aggregate of
+        the type specified
+
+        :param elements: generator of (is_closing_tag, tag_name, tag_value) tuples from OFXTokenizer.iter_elements
+        :type elements: Generator
+        :param aggregate: the name of the aggregate holding each transaction. Default value is "stmttrn"
+        :type aggregate: String
+        :return: BankingTransactionColumns
+        """
+
+        column_indexes = self._COLUMN_INDEXES
+        empty_row = [None] * len(column_indexes)
+        row = list(empty_row)
+        in_row = False
+
+        for closing, name, value in elements:
+            if name == aggregate:
+                if in_row:
+                    self._append_row(row)
+                    row[:] = empty_row
+                in_row = not closing
+            elif in_row and not closing:
+                index = column_indexes.get(name)
+                if index is not None:
+                    row[index] = value
+            elif name == "curdef" and not closing:
+                self._set_currency(value)
+
+        if in_row:
+            self._append_row(row)
+
+        return BankingTransactionColumns(
+            amount=np.frombuffer(self._amounts, dtype=np.int64),
+            date_posted=cast_ofx_datetime_column(self._dates_posted),
+            date_user=cast_ofx_datetime_column(self._dates_user),
+            trn_type=np.frombuffer(self._trn_types, dtype=self._trn_types.typecode),
+            trn_type_categories=self._trn_type_categories,
+            fitid=np.array(self._fitids, dtype=object),
+            name=np.array(self._names, dtype=object),
+            memo=np.array(self._memos, dtype=object),
+            currency=self._currency,
+            amount_exponent=self._amount_exponent,
+        )
+
+    def _set_currency(self, currency):
+        """
+        This private method will set the currency of the columns being built. All transactions within a single set of
+        columns share one amount exponent, so statements of different currencies cannot be mixed.
+
+        :param currency: the ISO 4217 currency code from the statement curdef tag
+        :type currency: String
+        :return: None
+        """
+
+        if self._currency is not None and currency != self._currency:
+            raise OFXParserError(
+                "Statements of mixed currencies '{}' and '{}' cannot be built into one set of columns".format(
+                    self._currency, currency
+                )
+            )
+
+        self._currency = currency
+        self._amount_exponent = get_currency_exponent(
+            currency, self._currency_exponents
+        )
+
+    def _append_row(self, row):
+        """
+        This private method will append the values of a single transaction row onto the column buffers
+
+        :param row: list of raw string values, ordered by _COLUMN_INDEXES
+        :type row: List
+        :return: None
+        """
+
+        trn_type, date_posted, date_user, amount, fitid, name, memo = row
+
+        if None in (trn_type, date_posted, amount, fitid):
+            missing = [
+                column
+                for column in self._REQUIRED_COLUMNS
+                if row[self._COLUMN_INDEXES[column]] is None
+            ]
+            raise OFXParserError(
+                "Transaction '{}' is missing required tags '{}'".format(fitid, missing)
+            )
+
+        code = self._trn_type_codes.get(trn_type)
+        if code is None:
+            code = len(self._trn_type_categories)
+            if code + 1 >= _INT16_CATEGORY_LIMIT:
+                raise OFXParserError(
+                    "Transaction '{}' has trn_type '{}', but no more than {} trn_types can be built into one set of "
+                    "columns".format(fitid, trn_type, _INT16_CATEGORY_LIMIT - 1)
+                )
+            self._trn_type_categories.append(trn_type)
+            self._trn_type_codes[trn_type] = code
+            if len(self._trn_type_categories) == _INT8_CATEGORY_LIMIT:
+                self._trn_types = array("h", self._trn_types)
+
+        self._trn_types.append(code)
+        self._amounts.append(
+            cast_ofx_amount_to_minor_units(amount, self._amount_exponent)
+        )
+        self._dates_posted.append(date_posted)
+        self._dates_user.append(date_user or None)
+        self._fitids.append(fitid)
+        self._names.append(name)
+        self._memos.append(memo)
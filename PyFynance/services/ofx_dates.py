@@ -0,0 +1,100 @@
+"""
+The ofx_dates module is the date casting layer used by the OFXParser service.
+
+OFX dates are fixed width strings of the form YYYYMMDD[HHMMSS[.XXX][[gmt offset[:tz name]]]], and a statement repeats
+the same few hundred dates many times over. Rather than running datetime.strptime for every value, dates are parsed by
+slicing the string into integers directly and the results are memoized in a bounded LRU cache.
+
+Any trailing timezone bracket is validated but not applied, so the datetime returned is the naive local time written
+in the file.
+"""
+
+from datetime import datetime
+from functools import lru_cache
+
+from core.exceptions import OFXParserError
+
+DATE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def cast_ofx_datetime(value):
+    """
+    This public function will cast an ofx date string to a datetime. Results are memoized in a bounded LRU cache.
+
+    .. code-block:: python
+
+        cast_ofx_datetime("20190913")  # datetime(2019, 9, 13, 0, 0)
+        cast_ofx_datetime("20190913101112.500[-5:EST]")  # datetime(2019, 9, 13, 10, 11, 12, 500000)
+
+    :param value: The ofx date string to cast
+    :type value: String
+    :return: Datetime representation of the string
+    """
+
+    date_part, bracket, timezone = value.partition("[")
+    main, _, fraction = date_part.partition(".")
+    length = len(main)
+
+    if (
+        length not in (8, 12, 14)
+        or not main.isdigit()
+        or (fraction and not (length == 14 and fraction.isdigit()))
+        or (bracket and not timezone.endswith("]"))
+    ):
+        raise OFXParserError("Value '{}' is not a valid OFX date".format(value))
+
+    try:
+        return datetime(
+            int(main[0:4]),
+            int(main[4:6]),
+            int(main[6:8]),
+            int(main[8:10] or 0),
+            int(main[10:12] or 0),
+            int(main[12:14] or 0),
+            int(fraction[:6].ljust(6, "0")) if fraction else 0,
+        )
+    except ValueError as e:
+        raise OFXParserError("Value '{}' is not a valid OFX date. {}".format(value, e))
+
+
+def cast_ofx_datetime_column(values):
+    """
+    This public function will cast a whole column of ofx date strings to a numpy datetime64[s] array in one call.
+    Each distinct date string is only parsed once, and None or empty values are cast to NaT.
+
+    :param values: Iterable of ofx date strings
+    :type values: Iterable
+    :return: numpy datetime64[s] array
+    """
+
+    # delayed import, numpy is only required for columnar output
+    import numpy as np
+
+    nat = np.datetime64("NaT", "s")
+    epoch = datetime(1970, 1, 1)
+    seconds_lookup = {}
+    seconds = []
+
+    for value in values:
+        if not value:
+            seconds.append(nat)
+            continue
+        value_seconds = seconds_lookup.get(value)
+        if value_seconds is None:
+            delta = cast_ofx_datetime(value) - epoch
+            value_seconds = delta.days * 86400 + delta.seconds
+            seconds_lookup[value] = value_seconds
+        seconds.append(value_seconds)
+
+    return np.array(seconds, dtype="datetime64[s]")
+
+
+def date_cache_info():
+    """
+    This public function will return the hit/miss statistics of the ofx date cache
+
+    :return: functools CacheInfo named tuple
+    """
+
+    return cast_ofx_datetime.cache_info()
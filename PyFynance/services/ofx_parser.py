@@ -1,11 +1,58 @@
+import io
+import mmap
 import os
-from datetime import datetime
+from importlib import import_module
 from decimal import Decimal
 
-from bs4 import BeautifulSoup
-
 from core.exceptions import OFXParserError
-from schemas.ofx_banking_transaction import OFXBankingTransactionSchema
+from schemas.model import BankingTransaction
+from services.ofx_amounts import cast_ofx_amount_to_minor_units, get_currency_exponent
+from services.ofx_dates import cast_ofx_datetime
+from services.ofx_ranges import (
+    MappedRange,
+    find_aggregate_ranges,
+    find_last_element_value,
+)
+from services.ofx_tokenizer import OFXTokenizer
+
+_range_worker_ofx_parser = None
+
+
+def _init_range_worker(config):
+    """
+    This private function initialises a range worker process with its own OFXParser instance
+
+    :param config: the configuration of the parent OFXParser
+    :type config: Configuration
+    :return: None
+    """
+
+    global _range_worker_ofx_parser
+    _range_worker_ofx_parser = OFXParser(config)
+
+
+def _parse_range_in_worker(path, byte_range, context, trusted):
+    """
+    This private function parses the banking transactions within a single byte range of an ofx file within a range
+    worker process
+
+    :param path: the validated input path of the ofx file
+    :type path: String
+    :param byte_range: the (start, end) byte offsets of the range to parse
+    :type byte_range: Tuple
+    :param context: the statement level values in effect at the start of the range
+    :type context: Dictionary
+    :param trusted: indicates if the trusted loader should be used to build the objects
+    :type trusted: Boolean
+    :return: List of BankingTransaction attribute value tuples, see BankingTransaction.to_tuple
+    """
+
+    return [
+        transaction.to_tuple()
+        for transaction in _range_worker_ofx_parser._parse_banking_transactions(
+            path, trusted, byte_range, context
+        )
+    ]
 
 
 class OFXParser:
@@ -23,28 +70,112 @@ class OFXParser:
     This class can be used to parse the ofx file inputs into python objects utilising marshmallow schemas.
     this class is intended as a reusable API class that can be extended to support other OFX specification types and
     versions
+
+    When a services.parse_cache.ParseCache is provided, the objects parsed from each file are cached on disk keyed by
+    the file contents, so byte-identical files are not parsed again. PARSER_VERSION must be incremented whenever a
+    change to this class changes the objects produced, so that stale cache entries are no longer used.
     """
 
-    def __init__(self, config):
+    PARSER_VERSION = 2
+
+    # the module and class name of the marshmallow schema for each object type, imported on first use
+    SCHEMAS = {
+        "banking_transactions": (
+            "schemas.ofx_banking_transaction",
+            "OFXBankingTransactionSchema",
+        )
+    }
+
+    def __init__(self, config, parse_cache=None):
         """
         initialises a new instance of the ofxParser class
+
+        :param config: the PyFynance configuration object
+        :type config: Configuration
+        :param parse_cache: Optional. The cache of previously parsed files to use. Default value is None, which
+            disables caching
+        :type parse_cache: ParseCache
         """
 
         self._config = config
+        self._parse_cache = parse_cache
+        self._tokenizer = OFXTokenizer(
+            chunk_size=config.ofx_parser.chunk_size,
+            ignore_tags=config.ofx_parser.html_tags,
+        )
+        self._loaders = {}
+        self._cast_methods = {
+            "dtposted": cast_ofx_datetime,
+            "dtuser": cast_ofx_datetime,
+        }
 
-    def parse(self, ofx_object_type, path):
+    def parse(self, ofx_object_type, path, trusted=False, output="objects", workers=1):
         """
         This public method will parse a ofx file from the provided path with the methods and schemas matching the
-        OFX object type value provided
+        OFX object type value provided.
+
+        By default a list of python objects is returned. When output is "columnar" the values are instead read
+        straight from the tokenizer into numpy arrays, returning a single columnar object (e.g.
+        services.ofx_columnar.BankingTransactionColumns for banking transactions).
 
         :param ofx_object_type: the type of objects to parse from the ofx file. Currently supported values are
                ["banking_transactions"]
         :type ofx_object_type: String
         :param path: The path to the input file
         :type path: String
+        :param trusted: Optional. If True, values already cast by the parser are not re-validated by the marshmallow
+            schema. Default value is False. Not used for columnar output
+        :type trusted: Boolean
+        :param output: Optional. The form of the parsed output, either "objects" or "columnar". Default value is
+            "objects"
+        :type output: String
+        :param workers: Optional. The number of worker processes used to parse files of at least
+            config.ofx_parser.parallel_min_size bytes. The file is memory mapped and split into one byte range per
+            worker, and the objects are returned in the same order as a serial parse. Default value is 1. Not used for
+            columnar output
+        :type workers: Integer
         :return: a python object containing all of the parsed ofx data
         """
 
+        self._check_output_type(output)
+        if output == "objects" and self._parse_cache is not None:
+            return self._parse_with_cache(ofx_object_type, path, trusted, workers)
+        if output == "objects":
+            return self._parse_objects(ofx_object_type, path, trusted, workers)
+
+        self._check_object_type(ofx_object_type)
+        self._check_input_file(path)
+
+        parse_method = {
+            "banking_transactions": self._parse_banking_transactions_columnar
+        }[ofx_object_type]
+
+        return parse_method(path)
+
+    def iter_parse(self, ofx_object_type, path, trusted=False):
+        """
+        This public method will lazily parse a ofx file from the provided path, yielding each object as soon as it has
+        been loaded. Objects are read and cast one at a time and loaded in batches of config.ofx_parser.load_batch_size,
+        so memory usage does not depend on the size of the file.
+
+        The object type and input file are validated when this method is called, not when iteration begins.
+
+        .. code-block:: python
+
+            for transaction in ofx_parser.iter_parse("banking_transactions", path):
+                print(transaction.amount)
+
+        :param ofx_object_type: the type of objects to parse from the ofx file. Currently supported values are
+               ["banking_transactions"]
+        :type ofx_object_type: String
+        :param path: The path to the input file
+        :type path: String
+        :param trusted: Optional. If True, the marshmallow schema validation is skipped for values already cast by the
+            parser and objects are built directly from the cast values. Default value is False
+        :type trusted: Boolean
+        :return: a generator of python objects containing the parsed ofx data
+        """
+
         self._check_object_type(ofx_object_type)
         self._check_input_file(path)
 
@@ -52,7 +183,91 @@ class OFXParser:
             ofx_object_type
         ]
 
-        return parse_method(path)
+        return parse_method(path, trusted)
+
+    def _parse_objects(self, ofx_object_type, path, trusted, workers):
+        """
+        This private method will parse the objects from the file, in parallel byte ranges when more than one worker is
+        requested and the file is at least config.ofx_parser.parallel_min_size bytes. No more workers are used than
+        there are cpus, so the file is parsed serially on a single cpu machine.
+
+        :param ofx_object_type: the type of objects to parse from the ofx file
+        :type ofx_object_type: String
+        :param path: The path to the input file
+        :type path: String
+        :param trusted: indicates if the trusted loader should be used to build the objects
+        :type trusted: Boolean
+        :param workers: The maximum number of worker processes to parse the file with
+        :type workers: Integer
+        :return: List of python objects containing the parsed ofx data
+        """
+
+        self._check_object_type(ofx_object_type)
+        self._check_input_file(path)
+
+        workers = min(workers, os.cpu_count() or 1)
+        if (
+            workers > 1
+            and os.path.getsize(path) >= self._config.ofx_parser.parallel_min_size
+        ):
+            parse_method = {
+                "banking_transactions": self._parse_banking_transactions_parallel
+            }[ofx_object_type]
+            return parse_method(path, trusted, workers)
+
+        return list(self.iter_parse(ofx_object_type, path, trusted))
+
+    def _parse_with_cache(self, ofx_object_type, path, trusted, workers):
+        """
+        This private method will return the objects for the file from the parse cache, parsing the file and storing
+        the result in the cache if it has not been parsed before
+
+        :param ofx_object_type: the type of objects to parse from the ofx file
+        :type ofx_object_type: String
+        :param path: The path to the input file
+        :type path: String
+        :param trusted: If True, the marshmallow schema validation is skipped when the file has to be parsed
+        :type trusted: Boolean
+        :param workers: The maximum number of worker processes to parse the file with when it is not cached
+        :type workers: Integer
+        :return: List of python objects containing the parsed ofx data
+        """
+
+        self._check_object_type(ofx_object_type)
+        self._check_input_file(path)
+
+        key = self._parse_cache.get_file_key(
+            path, self._get_cache_version(ofx_object_type, trusted)
+        )
+        objects = self._parse_cache.get(key)
+        if objects is None:
+            objects = self._parse_objects(ofx_object_type, path, trusted, workers)
+            self._parse_cache.put(key, objects)
+        return objects
+
+    def _get_cache_version(self, ofx_object_type, trusted=False):
+        """
+        This private method will return the parse cache version string for the object type provided. It covers the
+        parser version, whether the objects were validated, and every configuration value that changes the objects
+        produced, so objects built by the trusted loader are never returned to a caller asking for validated objects.
+
+        :param ofx_object_type: the type of objects being parsed
+        :type ofx_object_type: String
+        :param trusted: Optional. indicates if the objects are built by the trusted loader. Default value is False
+        :type trusted: Boolean
+        :return: String version
+        """
+
+        ofx_config = self._config.ofx_parser
+        return "{}|{}|{}|{}|{}|{}|{}".format(
+            ofx_object_type,
+            self.PARSER_VERSION,
+            "trusted" if trusted else "validated",
+            sorted(ofx_config.cast_fields),
+            sorted(ofx_config.html_tags),
+            ofx_config.amount_format,
+            sorted(ofx_config.currency_exponents.items()),
+        )
 
     def _check_object_type(self, object_type):
         """
@@ -68,75 +283,212 @@ class OFXParser:
             raise OFXParserError(
                 "Object_type value '{}' is unknown. "
                 "Acceptable object type values are '{}'".format(
-                    object_type, self._config.ofx_parser.object_types
+                    object_type, list(self._config.ofx_parser.object_types)
+                )
+            )
+
+    def _check_output_type(self, output):
+        """
+        This private method checks that the output value provided is part of the acceptable range from the config
+        object
+
+        :param output: The output value to check
+        :type output: String
+        :return: None
+        """
+
+        if output not in self._config.ofx_parser.output_types:
+            raise OFXParserError(
+                "Output value '{}' is unknown. "
+                "Acceptable output values are '{}'".format(
+                    output, list(self._config.ofx_parser.output_types)
                 )
             )
 
-    def _parse_banking_transactions(self, path):
+    def _parse_banking_transactions(
+        self, path, trusted=False, byte_range=None, context=None
+    ):
         """
         This private method is responsible for the parsing of transaction type objects from ofx files into python
         objects
 
         :param path: the validated input path of the ofx file
         :type path: String
-        :return: a set of python objects containing transaction information
+        :param trusted: indicates if the trusted loader should be used to build the objects
+        :type trusted: Boolean
+        :param byte_range: Optional. The (start, end) byte offsets of the part of the file to parse. Default value is
+            None, which parses the whole file
+        :type byte_range: Tuple
+        :param context: Optional. The statement level values in effect at the start of the byte range. Default value
+            is None
+        :type context: Dictionary
+        :return: a generator of python objects containing transaction information
         """
 
-        raw_trans = self._read_ofx_file(path)
-        tran_dictionaries = self._parse_ofx_transactions(raw_trans)
-        tran_dictionaries = self._cast_ofx_values(tran_dictionaries)
-        transactions = self._load_dictionaries_to_objects(
-            "banking_transactions", tran_dictionaries
-        )
-        return transactions
+        loader = self._get_loader("banking_transactions", trusted)
+        batch_size = self._config.ofx_parser.load_batch_size
+        batch = []
+        context = context or {"curdef": None}
+
+        for tran_dictionary in self._read_ofx_file(
+            path, "stmttrn", context, byte_range
+        ):
+            batch.append(self._cast_ofx_values(tran_dictionary, context["curdef"]))
+            if len(batch) >= batch_size:
+                yield from loader(batch)
+                batch = []
 
-    def _parse_ofx_transactions(self, ofx_trans):
+        if batch:
+            yield from loader(batch)
+
+    def _parse_banking_transactions_parallel(self, path, trusted, workers):
         """
-        This private method will parse ofx "stmttrn" tags into python dictionary obejcts.
+        This private method is responsible for the parsing of transaction type objects from a large ofx file using a
+        pool of worker processes.
 
-        As ofx files are essentially "poorly formatted" xml, many of the tags do not have closing tags, meaning that
-        the tag structure is interpreted as very nested and requires more cleaning than normal xml structures
+        The file is memory mapped and split into one byte range per worker on <STMTTRN> boundaries, along with the
+        statement currency in effect at the start of each range. Workers map the file themselves, so only the range
+        offsets are sent to them. Workers return each transaction as a plain tuple of its values, which pickles far
+        smaller and faster than the objects, and the transactions from each range are rebuilt in file order.
 
-        :param ofx_trans: Beatuiful soup parser output generated from an ofx file using the "html.parser"
-        :type ofx_trans: Beautiful Soup Tag Object
-        :return: a list of python dictionaries representing the transactions from the ofx file parsed
+        :param path: the validated input path of the ofx file
+        :type path: String
+        :param trusted: indicates if the trusted loader should be used to build the objects
+        :type trusted: Boolean
+        :param workers: the maximum number of worker processes to parse the file with
+        :type workers: Integer
+        :return: List of python objects containing transaction information
         """
 
-        transactions = []
-        for tran in ofx_trans:
-            tran_data = {}
-            for tag in tran.find_all():
-                tag_name = tag.name
-                if tag_name not in self._config.ofx_parser.html_tags:
-                    tag_value = self._get_tag_value(tag)
-                    tran_data[tag_name] = tag_value
-            transactions.append(tran_data)
+        with open(path, "rb") as ofx_file:
+            with mmap.mmap(
+                ofx_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped_file:
+                byte_ranges = find_aggregate_ranges(mapped_file, "stmttrn", workers)
+                contexts = [
+                    {"curdef": find_last_element_value(mapped_file, "curdef", start)}
+                    for start, _ in byte_ranges
+                ]
+
+        # delayed import, the process pool is only required for parallel parsing
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=len(byte_ranges),
+            initializer=_init_range_worker,
+            initargs=(self._config,),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _parse_range_in_worker, path, byte_range, context, trusted
+                )
+                for byte_range, context in zip(byte_ranges, contexts)
+            ]
 
+        transactions = []
+        for future in futures:
+            transactions.extend(map(BankingTransaction.from_tuple, future.result()))
         return transactions
 
-    def _cast_ofx_values(self, obj_dictionaries):
+    def _parse_banking_transactions_columnar(self, path):
         """
-        This private method will cast the ofx file values to appropriate datatypes
+        This private method is responsible for the parsing of transaction type objects from ofx files into numpy
+        columns
 
-        :param obj_dictionaries: List containing dictionaries of ofx data
-        :type obj_dictionaries: List
-        :return: obj_dictionaries containing data cast to the correct format
+        :param path: the validated input path of the ofx file
+        :type path: String
+        :return: BankingTransactionColumns containing the transaction information
         """
 
-        cast_dictionaries = []
-        for obj_dict in obj_dictionaries:
-            for key, value in obj_dict.items():
-                if key in self._config.ofx_parser.cast_fields:
-                    cast_method = {
-                        "dtposted": self._cast_str_to_datetime_string,
-                        "dtuser": self._cast_str_to_datetime_string,
-                        "trnamt": self._cast_str_to_decimal,
-                    }[key]
+        # delayed import, numpy is only required for columnar output
+        from services.ofx_columnar import BankingTransactionColumnBuilder
 
-                    obj_dict[key] = cast_method(value)
-            cast_dictionaries.append(obj_dict)
+        builder = BankingTransactionColumnBuilder(
+            self._config.ofx_parser.trn_types,
+            self._config.ofx_parser.currency_exponents,
+        )
+        with open(path) as ofx_file:
+            return builder.build(self._tokenizer.iter_elements(ofx_file), "stmttrn")
+
+    def _cast_ofx_values(self, obj_dictionary, currency=None):
+        """
+        This private method will cast the ofx file values to appropriate datatypes. Dates are cast straight to
+        datetime objects through the memoized services.ofx_dates casting layer and amounts are cast based on the
+        config.ofx_parser.amount_format value. Amounts cast to minor units are returned with the exponent of their
+        currency as "amount_exponent", so they can be converted back to Decimals with
+        services.ofx_amounts.minor_units_to_decimal.
+
+        :param obj_dictionary: Dictionary of ofx data
+        :type obj_dictionary: Dictionary
+        :param currency: Optional. The ISO 4217 currency code of the statement the values are from. Default value is
+            None, which uses the default currency exponent
+        :type currency: String
+        :return: obj_dictionary containing data cast to the correct format
+        """
 
-        return cast_dictionaries
+        for key, value in obj_dictionary.items():
+            if key in self._config.ofx_parser.cast_fields:
+                if key == "trnamt":
+                    obj_dictionary[key] = self._cast_amount(value, currency)
+                else:
+                    obj_dictionary[key] = self._cast_methods[key](value)
+
+        if (
+            "trnamt" in obj_dictionary
+            and "trnamt" in self._config.ofx_parser.cast_fields
+            and self._config.ofx_parser.amount_format == "minor_units"
+        ):
+            obj_dictionary["amount_exponent"] = get_currency_exponent(
+                currency, self._config.ofx_parser.currency_exponents
+            )
+
+        return obj_dictionary
+
+    def _cast_amount(self, value, currency=None):
+        """
+        This private method will cast an ofx amount string to either a Decimal or an integer number of minor units of
+        its currency, depending on the config.ofx_parser.amount_format value ["decimal" | "minor_units"]
+
+        :param value: String value to cast
+        :type value: String
+        :param currency: The ISO 4217 currency code of the amount
+        :type currency: String
+        :return: Decimal or Integer representation of the amount
+        """
+
+        if self._config.ofx_parser.amount_format == "minor_units":
+            exponent = get_currency_exponent(
+                currency, self._config.ofx_parser.currency_exponents
+            )
+            return cast_ofx_amount_to_minor_units(value, exponent)
+
+        return self._cast_str_to_decimal(value)
+
+    def _get_loader(self, object_type, trusted=False):
+        """
+        This private method will return the cached loader function for the object type specified, compiling it on
+        first use. Loaders take a list of cast dictionaries and return a list of loaded python objects.
+
+        The standard loader is a single cached marshmallow schema instance loading with many=True, while the trusted
+        loader maps the ofx keys straight onto the schema attribute names and calls the schema post_load method
+        without any field validation.
+
+        :param object_type: String indicating the type of objects being loaded
+        :type object_type: String
+        :param trusted: indicates if the trusted loader should be returned
+        :type trusted: Boolean
+        :return: loader function
+        """
+
+        loader_key = (object_type, trusted)
+        if loader_key not in self._loaders:
+            module_name, class_name = self.SCHEMAS[object_type]
+            schema = getattr(import_module(module_name), class_name)(many=True)
+            self._loaders[loader_key] = (
+                self._compile_trusted_loader(schema) if trusted else schema.load
+            )
+
+        return self._loaders[loader_key]
 
     @staticmethod
     def _check_input_file(path):
@@ -164,59 +516,69 @@ class OFXParser:
                 "Path provided '{path}' is not an OFX/QFX file.".format(path=path)
             )
 
-    @staticmethod
-    def _read_ofx_file(path):
+    def _read_ofx_file(self, path, aggregate, context=None, byte_range=None):
         """
-        This private static method will read in the ofx file from the path specified and break it into individual
-        "stmttrn" entries.
+        This private method will stream the ofx file from the path specified and yield each of its aggregates of the
+        requested type (e.g. "stmttrn") as a python dictionary, one at a time.
 
         :param path: the system path to the ofx file
         :type path: String
-        :return: a list of Beautiful Soup Tag elements
-        """
-
-        with open(path) as ofx_file:
-            ofx_data = BeautifulSoup(ofx_file, features="html.parser")
-
-        return ofx_data.find_all("stmttrn")
-
-    @staticmethod
-    def _get_tag_value(tag):
+        :param aggregate: the name of the ofx aggregate to read from the file
+        :type aggregate: String
+        :param context: Optional. Dictionary of tag names found outside the aggregates to capture (e.g. "curdef"),
+            updated in place as the file is read
+        :type context: Dictionary
+        :param byte_range: Optional. The (start, end) byte offsets of the part of the file to read. The range is read
+            through a memory map of the file. Default value is None, which reads the whole file
+        :type byte_range: Tuple
+        :return: a generator of python dictionaries representing the aggregates within the ofx file
         """
-        This private static method will extract the value from a tag object. As OFX is essentially "poorly formed" XML
-        and has many missing end tags, most of the xml parsers avaliable for python either misinterpret the tag values
-        or flat out cannot parse it.
 
-        BeautifulSoup is a step ahead of most and will at least parse the values but misinterprets the missing end tags
-        for nesting of tags. This means we must write additional tag value parsing logic to deal with this.
-
-        :param tag: BeautifulSoup tag object to parse the value out of
-        :type tag: Beautiful Soup Tag Element
-        :return: string value for the tag
-        """
-
-        return tag.text.split("\n")[0]
+        if byte_range is None:
+            with open(path) as ofx_file:
+                yield from self._tokenizer.iter_aggregates(ofx_file, aggregate, context)
+            return
+
+        with open(path, "rb") as raw_file:
+            with mmap.mmap(
+                raw_file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped_file:
+                with io.TextIOWrapper(
+                    io.BufferedReader(MappedRange(mapped_file, *byte_range))
+                ) as ofx_file:
+                    yield from self._tokenizer.iter_aggregates(
+                        ofx_file, aggregate, context
+                    )
 
     @staticmethod
-    def _load_dictionaries_to_objects(object_type, object_dictionaries):
+    def _compile_trusted_loader(schema):
         """
-        This private static method will serialise python dictionaries into objects for easier usage/management
+        This private static method will compile a loader function that builds objects straight from already cast
+        dictionaries using the field names of the marshmallow schema provided and its "create" post_load method.
 
-        :param object_type: String indicating the type of objects being loaded
-        :type object_type: String
-        :param object_dictionaries: List of dictionaries containing the object data
-        :type object_dictionaries: List[Dictionary]
-        :return: List of python objects loaded to using Marshmallow schemas
+        :param schema: The marshmallow schema instance to compile the loader from
+        :type schema: Marshmallow Schema
+        :return: loader function taking a list of dictionaries and returning a list of python objects
         """
 
-        schema = {"banking_transactions": OFXBankingTransactionSchema}[object_type]
+        field_keys = [
+            (field.data_key or field_name, field_name)
+            for field_name, field in schema.fields.items()
+        ]
 
-        serialised_objects = []
-        for obj_dict in object_dictionaries:
-            serialised_obj = schema().load(obj_dict)
-            serialised_objects.append(serialised_obj)
+        def trusted_loader(object_dictionaries):
+            return [
+                schema.create(
+                    {
+                        field_name: obj_dict[data_key]
+                        for data_key, field_name in field_keys
+                        if data_key in obj_dict
+                    }
+                )
+                for obj_dict in object_dictionaries
+            ]
 
-        return serialised_objects
+        return trusted_loader
 
     @staticmethod
     def _cast_str_to_decimal(value):
@@ -229,15 +591,3 @@ class OFXParser:
         """
 
         return Decimal(value)
-
-    @staticmethod
-    def _cast_str_to_datetime_string(value):
-        """
-        This private static method will cast a string in ofx format to a datetime
-
-        :param value: String value to cast
-        :return: Datetime representation of the string
-        """
-
-        format_str = "%Y%m%d" if len(value) == 8 else "%Y%m%d%H%M%S"
-        return str(datetime.strptime(value, format_str))
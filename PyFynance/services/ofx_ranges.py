@@ -0,0 +1,123 @@
+"""
+The ofx_ranges module splits a memory mapped ofx file into byte ranges that can be tokenized independently.
+
+Every range after the first starts exactly on an aggregate opening tag such as <STMTTRN>, so tokenizing the ranges one
+after another produces the same aggregates, in the same order, as tokenizing the whole file. Statement level values
+read from outside the aggregates (e.g. the <CURDEF> currency) are found with a backwards byte scan, so each range can
+start with the same context a serial read would have at that point.
+"""
+
+import io
+import re
+
+# the number of bytes searched at a time by the backwards element scan
+SCAN_CHUNK_SIZE = 65536
+
+
+def find_aggregate_ranges(mapped_file, aggregate, parts):
+    """
+    This public function will split the mapped file into at most the number of parts requested. Each part is roughly
+    the same number of bytes, and every part after the first starts on an opening tag of the aggregate.
+
+    :param mapped_file: The memory mapped ofx file
+    :type mapped_file: mmap.mmap
+    :param aggregate: The name of the aggregate to split on e.g. "stmttrn"
+    :type aggregate: String
+    :param parts: The number of parts to split the file into
+    :type parts: Integer
+    :return: List of Tuples (start offset, end offset)
+    """
+
+    pattern = re.compile(rb"<" + re.escape(aggregate.encode("ascii")) + rb"[\s>]", re.I)
+    size = len(mapped_file)
+    starts = [0]
+
+    for part in range(1, parts):
+        target = max(size * part // parts, starts[-1] + 1)
+        match = pattern.search(mapped_file, target)
+        if match is None:
+            break
+        if match.start() > starts[-1]:
+            starts.append(match.start())
+
+    ends = starts[1:] + [size]
+    return list(zip(starts, ends))
+
+
+def find_last_element_value(mapped_file, element, end):
+    """
+    This public function will return the value of the last element of the name provided found before the end offset,
+    or None if the element is not found. Element names are matched in any case, and the value is read the same way
+    the OFXTokenizer reads it.
+
+    :param mapped_file: The memory mapped ofx file
+    :type mapped_file: mmap.mmap
+    :param element: The name of the element e.g. "curdef"
+    :type element: String
+    :param end: The offset to search backwards from
+    :type end: Integer
+    :return: String value or None
+    """
+
+    tag = "<{}>".format(element).encode("ascii")
+    pattern = re.compile(re.escape(tag), re.I)
+    start = None
+    chunk_end = end
+    while start is None and chunk_end > 0:
+        chunk_start = max(0, chunk_end - SCAN_CHUNK_SIZE)
+        # the chunks overlap by the tag length, so tags spanning two chunks are still found
+        for match in pattern.finditer(
+            mapped_file, chunk_start, min(end, chunk_end + len(tag) - 1)
+        ):
+            start = match.start()
+        chunk_end = chunk_start
+    if start is None:
+        return None
+
+    start += len(element) + 2
+    value_end = mapped_file.find(b"<", start, end)
+    if value_end == -1:
+        value_end = end
+    return mapped_file[start:value_end].decode("ascii").strip()
+
+
+class MappedRange(io.RawIOBase):
+    """
+    The Mapped Range class is a read only raw file object over a byte range of a memory mapped file. Wrapping it in
+    io.TextIOWrapper gives a text file object over just that range, which reads from the shared mapping rather than
+    from a copy of the file.
+    """
+
+    def __init__(self, mapped_file, start, end):
+        """
+        initialises a new instance of the MappedRange class
+
+        :param mapped_file: The memory mapped file
+        :type mapped_file: mmap.mmap
+        :param start: The offset of the first byte of the range
+        :type start: Integer
+        :param end: The offset after the last byte of the range
+        :type end: Integer
+        """
+
+        super(MappedRange, self).__init__()
+        self._mapped_file = mapped_file
+        self._position = start
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        """
+        This public method will read the next bytes of the range into the buffer provided
+
+        :param buffer: The writable buffer to read into
+        :type buffer: Buffer
+        :return: Integer number of bytes read, 0 at the end of the range
+        """
+
+        size = min(len(buffer), self._end - self._position)
+        buffer[:size] = self._mapped_file[self._position : self._position + size]
+        self._position += size
+        return size
@@ -0,0 +1,124 @@
+import html
+import re
+
+
+class OFXTokenizer:
+    """
+    The OFX Tokenizer class is an incremental tokenizer for files meeting the SGML based OFX 1.0.2 specification.
+
+    OFX 1.0.2 files are SGML rather than XML, meaning that "element" tags (tags holding a value such as <TRNAMT>) are
+    never closed, while "aggregate" tags (tags holding other tags such as <STMTTRN>) are. Rather than building a full
+    document tree, this tokenizer reads the file in fixed size chunks and emits one element at a time, so memory usage
+    does not depend on the size of the file being read.
+
+    .. code-block:: python
+
+        tokenizer = OFXTokenizer()
+        with open("statement.ofx") as ofx_file:
+            for transaction in tokenizer.iter_aggregates(ofx_file, "stmttrn"):
+                print(transaction["trnamt"])
+
+    All tag names are returned in lower case and all element values are returned as stripped strings.
+    """
+
+    _ELEMENT_PATTERN = re.compile(r"<(/?)([^<>\s/]+)[^<>]*>([^<]*)")
+
+    def __init__(self, chunk_size=65536, ignore_tags=None):
+        """
+        initialises a new instance of the OFXTokenizer class
+
+        :param chunk_size: Optional. The number of characters to read from the file per chunk. Default is 65536
+        :type chunk_size: Integer
+        :param ignore_tags: Optional. List of tag names that should be skipped entirely (e.g. stray html tags such as
+            "br"). Default value is None
+        :type ignore_tags: List
+        """
+
+        self._chunk_size = chunk_size
+        self._ignore_tags = {tag.lower() for tag in ignore_tags or []}
+
+    def iter_aggregates(self, ofx_file, aggregate, context=None):
+        """
+        This public method will yield one dictionary for each aggregate of the type specified found within the ofx
+        file. The dictionary keys are the tag names of every element within the aggregate and the values are the
+        element values.
+
+        Aggregates missing their closing tag are ended by the next opening tag of the same aggregate type or by the
+        end of the file.
+
+        Elements outside of the aggregates can be captured through the context dictionary. Any element whose tag name
+        is a key of the context has its value written to the context as it is read, so statement level values such
+        as the currency ("curdef") are available to the caller while it iterates.
+
+        :param ofx_file: An open file object for the ofx file
+        :type ofx_file: File Object
+        :param aggregate: The name of the aggregate to extract e.g. "stmttrn"
+        :type aggregate: String
+        :param context: Optional. Dictionary keyed by the lower case names of the tags to capture from outside the
+            aggregates. Default value is None
+        :type context: Dictionary
+        :return: Generator of Dictionaries, one per aggregate found
+        """
+
+        aggregate = aggregate.lower()
+        ignore_tags = self._ignore_tags
+        current = None
+
+        for closing, name, value in self.iter_elements(ofx_file):
+            if name == aggregate:
+                if current is not None:
+                    yield current
+                current = None if closing else {}
+            elif current is not None and not closing and name not in ignore_tags:
+                current[name] = value
+            elif context is not None and name in context and not closing:
+                context[name] = value
+
+        if current:
+            yield current
+
+    def iter_elements(self, ofx_file):
+        """
+        This public method will yield every tag found within the ofx file as a tuple of
+        (is_closing_tag, tag_name, tag_value). Any file header content found before the first tag is ignored.
+
+        :param ofx_file: An open file object for the ofx file
+        :type ofx_file: File Object
+        :return: Generator of Tuples (Boolean, String, String)
+        """
+
+        pending = ""
+        while True:
+            chunk = ofx_file.read(self._chunk_size)
+            if not chunk:
+                break
+
+            buffer = pending + chunk
+            split = buffer.rfind("<")
+            if split == -1:
+                pending = ""
+                continue
+
+            yield from self._tokenize(buffer, split)
+            pending = buffer[split:]
+
+        yield from self._tokenize(pending, len(pending))
+
+    def _tokenize(self, buffer, end):
+        """
+        This private method will tokenize all of the complete tags found within buffer[:end]. The end position must
+        either be the start of a tag or the end of the file so that no element value is split in two.
+
+        :param buffer: The text to tokenize
+        :type buffer: String
+        :param end: The position within the buffer to stop tokenizing at
+        :type end: Integer
+        :return: Generator of Tuples (Boolean, String, String)
+        """
+
+        for match in self._ELEMENT_PATTERN.finditer(buffer, 0, end):
+            closing, name, value = match.groups()
+            value = value.strip()
+            if "&" in value:
+                value = html.unescape(value)
+            yield closing == "/", name.lower(), value
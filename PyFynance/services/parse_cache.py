@@ -0,0 +1,204 @@
+import hashlib
+import logging
+import os
+import pickle
+import zlib
+
+
+class ParseCache:
+    """
+    The Parse Cache class is a size capped, least recently used on-disk cache for parsed input files.
+
+    Entries are keyed by the SHA-256 digest of the input file contents, salted with a version string that the caller
+    changes whenever the parsed output would change (e.g. a new parser version or different casting configuration).
+    Byte-identical files dropped again are therefore served from the cache without being read by the parser.
+
+    Each entry is stored as a single zlib compressed pickle file within the cache directory. Reading an entry refreshes
+    its modification time, and whenever a new entry is written the least recently used entries are removed until the
+    cache is back under its size cap.
+
+    .. code-block:: python
+
+        cache = ParseCache(config.paths.parse_cache_path, 64 * 1024 * 1024)
+        key = cache.get_file_key(path, "banking_transactions-1")
+        transactions = cache.get(key)
+        if transactions is None:
+            transactions = ofx_parser.parse("banking_transactions", path)
+            cache.put(key, transactions)
+
+    The cache directory is private to PyFynance. As entries are pickles, it must not be shared with untrusted users.
+    """
+
+    _ENTRY_SUFFIX = ".cache"
+    _READ_SIZE = 1024 * 1024
+
+    def __init__(self, cache_path, max_size):
+        """
+        initialises a new instance of the ParseCache class. The cache directory is only created when the first entry
+        is written.
+
+        :param cache_path: The full path to the directory holding the cache entries
+        :type cache_path: String
+        :param max_size: The maximum total size of all cache entries in bytes
+        :type max_size: Integer
+        """
+
+        self._logger = logging.getLogger(__name__)
+        self._cache_path = cache_path
+        self._max_size = max_size
+
+    def get_file_key(self, path, version):
+        """
+        This public method will return the cache key for the file at the path provided
+
+        :param path: The full path to the file
+        :type path: String
+        :param version: The version string to salt the key with. Any change to it invalidates existing entries
+        :type version: String
+        :return: String hex digest key
+        """
+
+        digest = hashlib.sha256(version.encode("utf-8"))
+        with open(path, "rb") as input_file:
+            for block in iter(lambda: input_file.read(self._READ_SIZE), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        This public method will return the value cached for the key provided, or None if the key is not cached.
+        Unreadable entries are removed and treated as a miss.
+
+        :param key: The cache key
+        :type key: String
+        :return: the cached value or None
+        """
+
+        entry_path = self._get_entry_path(key)
+
+        try:
+            with open(entry_path, "rb") as entry_file:
+                value = pickle.loads(zlib.decompress(entry_file.read()))
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self._logger.warning(
+                "Removing unreadable parse cache entry '{}'.  {}".format(entry_path, e)
+            )
+            self._remove_entry(entry_path)
+            return None
+
+        self._logger.info("Parse cache hit for key '{}'".format(key))
+        return value
+
+    def put(self, key, value):
+        """
+        This public method will store the value provided under the key, then evict the least recently used entries
+        until the cache is under its size cap. Values larger than the cap are not stored. Failures to write are logged
+        and ignored, as the cache is only an optimisation.
+
+        :param key: The cache key
+        :type key: String
+        :param value: The picklable value to store
+        :type value: Any
+        :return: None
+        """
+
+        data = zlib.compress(pickle.dumps(value, pickle.HIGHEST_PROTOCOL), 1)
+        if len(data) > self._max_size:
+            self._logger.info(
+                "Parse cache entry for key '{}' is larger than the cache size cap. Skipping".format(
+                    key
+                )
+            )
+            return
+
+        entry_path = self._get_entry_path(key)
+        temp_path = "{}.{}.tmp".format(entry_path, os.getpid())
+
+        try:
+            os.makedirs(self._cache_path, exist_ok=True)
+            with open(temp_path, "wb") as entry_file:
+                entry_file.write(data)
+            os.replace(temp_path, entry_path)
+            self._evict()
+        except OSError as e:
+            self._logger.warning(
+                "Could not write parse cache entry '{}'.  {}".format(entry_path, e)
+            )
+            self._remove_entry(temp_path)
+
+    def clear(self):
+        """
+        This public method will remove every entry from the cache
+
+        :return: None
+        """
+
+        for entry_path, _, _ in self._list_entries():
+            self._remove_entry(entry_path)
+
+    def _evict(self):
+        """
+        This private method will remove the least recently used entries until the total size of the cache is no more
+        than its size cap
+
+        :return: None
+        """
+
+        entries = sorted(self._list_entries(), key=lambda entry: entry[1])
+        total_size = sum(entry[2] for entry in entries)
+
+        for entry_path, _, size in entries:
+            if total_size <= self._max_size:
+                break
+            self._remove_entry(entry_path)
+            total_size -= size
+
+    def _list_entries(self):
+        """
+        This private method will list every entry in the cache directory
+
+        :return: List of Tuples (entry path, modification time, size in bytes)
+        """
+
+        entries = []
+        if not os.path.isdir(self._cache_path):
+            return entries
+
+        for dir_entry in os.scandir(self._cache_path):
+            if dir_entry.name.endswith(self._ENTRY_SUFFIX):
+                try:
+                    stat = dir_entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((dir_entry.path, stat.st_mtime_ns, stat.st_size))
+        return entries
+
+    def _get_entry_path(self, key):
+        """
+        This private method will return the full path of the cache entry file for the key provided
+
+        :param key: The cache key
+        :type key: String
+        :return: String path
+        """
+
+        return os.sep.join([self._cache_path, key + self._ENTRY_SUFFIX])
+
+    @staticmethod
+    def _remove_entry(entry_path):
+        """
+        This private static method will remove a cache entry file, ignoring entries already removed by another
+        process
+
+        :param entry_path: The full path to the entry file
+        :type entry_path: String
+        :return: None
+        """
+
+        try:
+            os.remove(entry_path)
+        except FileNotFoundError:
+            pass
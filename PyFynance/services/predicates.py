@@ -0,0 +1,236 @@
+"""
+The predicates module is a small typed where-clause builder for the Database service.
+
+Predicates compile to a sql template with "?" placeholders and a tuple of the values to bind to them. Values never
+become part of the sql text, so they need no quoting, and every call with the same shape of predicate reuses the
+same cached statement and query plan.
+
+.. code-block:: python
+
+    where = And(
+        Eq("institution", institution),
+        Eq("account", account),
+        Between("date_posted", "20190101", "20191231235959"),
+    )
+    db.select("transactions", "transactions", where=where, order_by=["-date_posted"], limit=10)
+
+Column names are checked to be plain sql identifiers, as they are the only part of a predicate written into the sql
+text.
+"""
+
+import abc
+import re
+
+from core.exceptions import DatabaseError
+
+_IDENTIFIER_PATTERN = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def check_identifier(name):
+    """
+    This public function will check that the name provided is a plain sql identifier, such as a column name
+
+    :param name: The identifier to check
+    :type name: String
+    :return: String: the identifier
+    """
+
+    if not isinstance(name, str) or not _IDENTIFIER_PATTERN.match(name):
+        raise DatabaseError("'{}' is not a valid column name".format(name))
+    return name
+
+
+class Predicate(abc.ABC):
+    """
+    The Predicate class is the abstract base class of all where-clause predicates
+    """
+
+    @abc.abstractmethod
+    def compile(self):
+        """
+        This public method will compile the predicate to a parameterised sql where template
+
+        :return: Tuple (String sql template, Tuple of parameters)
+        """
+
+    def __eq__(self, other):
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __repr__(self):
+        return "{}({})".format(
+            type(self).__name__,
+            ", ".join(
+                "{}={!r}".format(key, value) for key, value in vars(self).items()
+            ),
+        )
+
+
+class Comparison(Predicate):
+    """
+    The Comparison class is the base class of predicates comparing a column against a single value
+    """
+
+    OPERATOR = None
+
+    def __init__(self, column, value):
+        """
+        initialises a new comparison predicate
+
+        :param column: The name of the column to compare
+        :type column: String
+        :param value: The value to compare the column to
+        :type value: Any
+        """
+
+        self.column = check_identifier(column)
+        self.value = value
+
+    def compile(self):
+        return "{} {} ?".format(self.column, self.OPERATOR), (self.value,)
+
+
+class Eq(Comparison):
+    """
+    Predicate matching rows where the column equals the value
+    """
+
+    OPERATOR = "="
+
+
+class Ne(Comparison):
+    """
+    Predicate matching rows where the column does not equal the value
+    """
+
+    OPERATOR = "!="
+
+
+class Gt(Comparison):
+    """
+    Predicate matching rows where the column is greater than the value
+    """
+
+    OPERATOR = ">"
+
+
+class Ge(Comparison):
+    """
+    Predicate matching rows where the column is greater than or equal to the value
+    """
+
+    OPERATOR = ">="
+
+
+class Lt(Comparison):
+    """
+    Predicate matching rows where the column is less than the value
+    """
+
+    OPERATOR = "<"
+
+
+class Le(Comparison):
+    """
+    Predicate matching rows where the column is less than or equal to the value
+    """
+
+    OPERATOR = "<="
+
+
+class In(Predicate):
+    """
+    Predicate matching rows where the column equals any of the values. An empty list of values matches no rows.
+    """
+
+    def __init__(self, column, values):
+        """
+        initialises a new In predicate
+
+        :param column: The name of the column to compare
+        :type column: String
+        :param values: The values to compare the column to
+        :type values: Iterable
+        """
+
+        self.column = check_identifier(column)
+        self.values = tuple(values)
+
+    def compile(self):
+        if not self.values:
+            return "0 = 1", ()
+        placeholders = ", ".join(["?"] * len(self.values))
+        return "{} IN ({})".format(self.column, placeholders), self.values
+
+
+class Between(Predicate):
+    """
+    Predicate matching rows where the column is between the low and high values, inclusive of both
+    """
+
+    def __init__(self, column, low, high):
+        """
+        initialises a new Between predicate
+
+        :param column: The name of the column to compare
+        :type column: String
+        :param low: The lowest matching value
+        :type low: Any
+        :param high: The highest matching value
+        :type high: Any
+        """
+
+        self.column = check_identifier(column)
+        self.low = low
+        self.high = high
+
+    def compile(self):
+        return "{} BETWEEN ? AND ?".format(self.column), (self.low, self.high)
+
+
+class Compound(Predicate):
+    """
+    The Compound class is the base class of predicates combining other predicates with a single sql operator
+    """
+
+    OPERATOR = None
+
+    def __init__(self, *predicates):
+        """
+        initialises a new compound predicate
+
+        :param predicates: The predicates to combine
+        :type predicates: Predicate
+        """
+
+        if not predicates:
+            raise DatabaseError(
+                "{} requires at least one predicate".format(type(self).__name__)
+            )
+        self.predicates = predicates
+
+    def compile(self):
+        templates = []
+        parameters = ()
+        for predicate in self.predicates:
+            template, predicate_parameters = predicate.compile()
+            if isinstance(predicate, Compound):
+                template = "({})".format(template)
+            templates.append(template)
+            parameters += predicate_parameters
+        return " {} ".format(self.OPERATOR).join(templates), parameters
+
+
+class And(Compound):
+    """
+    Predicate matching rows that match all of its predicates
+    """
+
+    OPERATOR = "AND"
+
+
+class Or(Compound):
+    """
+    Predicate matching rows that match any of its predicates
+    """
+
+    OPERATOR = "OR"
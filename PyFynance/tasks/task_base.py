@@ -3,22 +3,125 @@ from abc import ABCMeta, abstractmethod
 
 from core.config import Configuration
 from core.exceptions import TaskError
-from services.database import Database
-from services.file_system import FileSystem
-from services.ofx_parser import OFXParser
 
 
 class BaseTask:
+    """
+    The Base Task class is the parent of every PyFynance task. It orchestrates the before, do and after steps of a task
+    and provides the services tasks use.
+
+    Services are created the first time a task uses them, and their modules are only imported then, so tasks do not
+    pay the import and setup cost of services they never use. Tasks created with the same services dictionary share
+    the services any of them create.
+
+    Tasks declare the databases they read and write in READS and WRITES, which core.scheduler.TaskScheduler locks
+    while the task runs so that tasks run concurrently never write a database another of them is using.
+    """
 
     __metaclass__ = ABCMeta  # Abstract Base Class
+    READS = []
+    WRITES = []
+
+    def __init__(self, args, services=None):
+        """
+        initialises a new instance of the task
+
+        :param args: the arguments of the task
+        :param services: Optional. Dictionary of service instances to use and share, keyed by service name, such as
+            those shared by the tasks of a pipeline. Default value is None, which gives the task its own services
+        :type services: Dictionary
+        """
 
-    def __init__(self, args):
         self._args = args
         self._logger = logging.getLogger(__name__)
         self._config = Configuration()
-        self._ofx_parser = OFXParser(self._config)
-        self._db = Database()
-        self._fs = FileSystem()
+        self._services = {} if services is None else services
+
+    @property
+    def _db(self):
+        """
+        The Database service of the task
+
+        :return: Database
+        """
+
+        if "db" not in self._services:
+            from services.database import Database
+
+            self._services["db"] = Database()
+        return self._services["db"]
+
+    @_db.setter
+    def _db(self, db):
+        self._services["db"] = db
+
+    @_db.deleter
+    def _db(self):
+        self._services.pop("db", None)
+
+    @property
+    def _fs(self):
+        """
+        The FileSystem service of the task
+
+        :return: FileSystem
+        """
+
+        if "fs" not in self._services:
+            from services.file_system import FileSystem
+
+            self._services["fs"] = FileSystem()
+        return self._services["fs"]
+
+    @_fs.setter
+    def _fs(self, fs):
+        self._services["fs"] = fs
+
+    @_fs.deleter
+    def _fs(self):
+        self._services.pop("fs", None)
+
+    @property
+    def _parse_cache(self):
+        """
+        The parse cache of the task's OFXParser, or None when the cache is disabled in the configuration
+
+        :return: ParseCache or None
+        """
+
+        if "parse_cache" not in self._services:
+            self._services["parse_cache"] = self._create_parse_cache()
+        return self._services["parse_cache"]
+
+    @_parse_cache.setter
+    def _parse_cache(self, parse_cache):
+        self._services["parse_cache"] = parse_cache
+
+    @_parse_cache.deleter
+    def _parse_cache(self):
+        self._services.pop("parse_cache", None)
+
+    @property
+    def _ofx_parser(self):
+        """
+        The OFXParser service of the task
+
+        :return: OFXParser
+        """
+
+        if "ofx_parser" not in self._services:
+            from services.ofx_parser import OFXParser
+
+            self._services["ofx_parser"] = OFXParser(self._config, self._parse_cache)
+        return self._services["ofx_parser"]
+
+    @_ofx_parser.setter
+    def _ofx_parser(self, ofx_parser):
+        self._services["ofx_parser"] = ofx_parser
+
+    @_ofx_parser.deleter
+    def _ofx_parser(self):
+        self._services.pop("ofx_parser", None)
 
     @abstractmethod
     def before_task(self):  # pragma: no cover
@@ -82,6 +185,24 @@ class BaseTask:
             )
         return passed
 
+    def _create_parse_cache(self):
+        """
+        This private method will create the parse cache used by the task's OFXParser, or return None when the cache
+        is disabled in the configuration
+
+        :return: ParseCache or None
+        """
+
+        if not self._config.ofx_parser.parse_cache_enabled:
+            return None
+
+        from services.parse_cache import ParseCache
+
+        return ParseCache(
+            self._config.paths.parse_cache_path,
+            self._config.ofx_parser.parse_cache_max_size,
+        )
+
     def get_args_repr(self):
         """
         This public method will return a string representation of the self._args variable
@@ -4,6 +4,51 @@ from core import helpers
 from core.exceptions import TaskLoadTransactionsError
 from tasks.task_base import BaseTask
 
+_worker_ofx_parser = None
+
+
+def get_input_patterns(args):
+    """
+    This public function returns the file name patterns of the input files a load transactions task loads, which is
+    the input_glob argument when it is set and otherwise every ofx and qfx file
+
+    :param args: the arguments of the task
+    :return: List of file name patterns
+    """
+
+    input_glob = getattr(args, "input_glob", None)
+    return ["*.ofx", "*.qfx"] if input_glob is None else [input_glob]
+
+
+def _init_parse_worker(config, parse_cache):
+    """
+    This private function initialises a parse worker process with its own OFXParser instance, so the cached loaders
+    are built once per process rather than once per file
+
+    :param config: the configuration of the task
+    :type config: Configuration
+    :param parse_cache: the parse cache of the task, or None if caching is disabled
+    :type parse_cache: ParseCache
+    :return: None
+    """
+
+    from services.ofx_parser import OFXParser
+
+    global _worker_ofx_parser
+    _worker_ofx_parser = OFXParser(config, parse_cache)
+
+
+def _parse_file_in_worker(file_path):
+    """
+    This private function parses a single ofx file within a parse worker process
+
+    :param file_path: the full path to the ofx file to parse
+    :type file_path: String
+    :return: List of BankingTransaction objects
+    """
+
+    return _worker_ofx_parser.parse("banking_transactions", file_path)
+
 
 class LoadTransactionsTask(BaseTask):
     """
@@ -20,15 +65,26 @@ class LoadTransactionsTask(BaseTask):
         * --task_type       load_transactions
         * --institution     The name of the financial institution the transactions are from
         * --account         The name of the account to associate the transactions with
-
-    The load transactions task will load all ofx files it find in the input/banking_transactions folder of this repo.
+        * --workers         Optional. The number of processes used to parse the input files. Default is 1
+        * --input_glob      Optional. The file name pattern of the input files to load, e.g. "cc_*.ofx". Default is
+                            all ofx and qfx files
+
+    The load transactions task will load all ofx files it find in the input/banking_transactions folder of this repo
+    that match the input_glob argument, or only the files listed in the input_files argument when it is set, as it is
+    by the daemon mode of PyFynance. Pipelines loading several accounts give each of their load tasks its own
+    input_glob, so each task only loads the files of its account.
     Once a file has been loaded using the load_transaction task it will be moved to either:
         * /input/banking_transactions/processed      if the task was successful
         * /input/banking_transactions/error         if the task failed
+
+    As every load transactions task reads the same input folder and writes the transactions database, the task
+    scheduler never runs two of them at once.
     """
 
-    def __init__(self, args):
-        super(LoadTransactionsTask, self).__init__(args)
+    WRITES = ["transactions"]
+
+    def __init__(self, args, services=None):
+        super(LoadTransactionsTask, self).__init__(args, services)
         self._transactions = []
         self._input_files = []
         self._task_state = "OK"
@@ -44,7 +100,7 @@ class LoadTransactionsTask(BaseTask):
         """
 
         self._logger.info("Beginning before_task method of task '{}'.".format(self))
-        self._db.start_db("transactions")
+        self._db.start_db("transactions", profile="bulk_load")
         self._logger.info("Finished before_task method of task '{}'.".format(self))
 
     def do_task(self):
@@ -57,7 +113,6 @@ class LoadTransactionsTask(BaseTask):
         try:
             self._logger.info("Beginning do_task method of task '{}'.".format(self))
             self._load_transactions_from_file()
-            self._filter_transactions()
             self._write_transactions_to_db()
             self._logger.info("Finished do_task method of task '{}'.".format(self))
         except Exception as e:
@@ -112,20 +167,98 @@ class LoadTransactionsTask(BaseTask):
 
     def _load_transactions_from_file(self):
         """
-        This private method controls the flow of loading transactions from files into python objects
+        This private method controls the flow of loading transactions from files into python objects.
+
+        When more than one worker is requested several files are parsed concurrently in a process pool, while a
+        single file is split into byte ranges parsed concurrently by the OFXParser. Either way the transactions are
+        merged in input file order, and every file that fails to parse is reported in the one error raised so that the
+        task fails and all input files are routed to the error folder by _move_input_files.
 
         :return: None
         """
 
         self._get_files_to_parse()
+        workers = getattr(self._args, "workers", 1)
+
+        if workers > 1 and len(self._input_files) > 1:
+            results = self._parse_files_in_parallel(
+                min(workers, len(self._input_files))
+            )
+        else:
+            results = self._parse_files_in_serial(workers)
+
+        errors = []
+        for file_path, result in zip(self._input_files, results):
+            if isinstance(result, Exception):
+                errors.append("'{}': {}".format(file_path, result))
+            else:
+                self._transactions.extend(result)
+
+        if errors:
+            raise TaskLoadTransactionsError(
+                "Failed to parse {} input file(s).  {}".format(
+                    len(errors), "  ".join(errors)
+                )
+            )
+
+    def _parse_files_in_serial(self, workers=1):
+        """
+        This private method will parse each of the input files one after another in the current process
+
+        :param workers: Optional. The number of worker processes the OFXParser may split each file between. Default
+            value is 1
+        :type workers: Integer
+        :return: List holding either the List of transactions or the Exception raised for each input file, in input
+            file order
+        """
+
+        results = []
         for file_path in self._input_files:
-            self._transactions.extend(
-                self._ofx_parser.parse("banking_transactions", file_path)
+            try:
+                results.append(
+                    self._ofx_parser.parse(
+                        "banking_transactions", file_path, workers=workers
+                    )
+                )
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _parse_files_in_parallel(self, workers):
+        """
+        This private method will parse the input files concurrently in a pool of worker processes
+
+        :param workers: the number of worker processes to parse the files with
+        :type workers: Integer
+        :return: List holding either the List of transactions or the Exception raised for each input file, in input
+            file order
+        """
+
+        self._logger.info(
+            "Parsing {} input files with {} worker processes".format(
+                len(self._input_files), workers
             )
+        )
+
+        # delayed import, the process pool is only required when parsing with workers
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_parse_worker,
+            initargs=(self._config, self._parse_cache),
+        ) as executor:
+            futures = [
+                executor.submit(_parse_file_in_worker, file_path)
+                for file_path in self._input_files
+            ]
+
+        return [future.exception() or future.result() for future in futures]
 
     def _get_files_to_parse(self):
         """
-        This private method will determine the full file paths to all transaction files that need to be processed.
+        This private method will determine the full file paths to all transaction files that need to be processed,
+        which are those matching the input_glob argument, or those listed in the input_files argument when it is set.
 
         :return: A list of file paths that either end in .ofx or .qfx
         """
@@ -133,9 +266,11 @@ class LoadTransactionsTask(BaseTask):
         transactions_input_path = os.sep.join(
             [self._config.paths.input_path, "banking_transactions", "landing"]
         )
-        files_to_parse = helpers.find_all_files(
-            transactions_input_path, ["*.ofx", "*.qfx"]
-        )
+        files_to_parse = getattr(self._args, "input_files", None)
+        if files_to_parse is None:
+            files_to_parse = helpers.find_all_files(
+                transactions_input_path, get_input_patterns(self._args)
+            )
         for file_path in files_to_parse:
             self._input_files.append(file_path)
         if len(files_to_parse) == 0:
@@ -148,68 +283,47 @@ class LoadTransactionsTask(BaseTask):
 
     def _write_transactions_to_db(self):
         """
-        This private method will handle the writing of new transactions to the transactions database table.
+        This private method will handle the writing of new transactions to the transactions database table. All of
+        the transactions are written with a single bulk insert.
+
+        Transactions that have already been processed are skipped by sqlite, as their INSTITUTION-ACCOUNT-TRANID
+        composite key clashes with the primary key of the transactions table.
+
+        Amounts parsed as integer minor units are written as they are, with the exponent of their currency, so they
+        are stored as exact sqlite INTEGER values that can be summed in SQL. They are only converted to Decimals when
+        read, see services.ofx_amounts.stored_amount_to_decimal. Decimal amounts are written with no exponent.
+
+        Loads of at least config.database.analyze_min_rows new transactions are followed by an analyze of the
+        database, so that the query planner statistics for its indexes stay current.
 
         :return: None
         """
 
-        for transaction in self._transactions:
-            data = {
+        date_processed = self._args.runtime.strftime("%Y%m%d%H%M%S")
+        rows = [
+            {
                 "institution": self._args.institution,
                 "account": self._args.account,
                 "tran_id": transaction.fitid,
                 "tran_type": transaction.trn_type,
                 "amount": transaction.amount,
+                "amount_exponent": transaction.amount_exponent,
                 "narrative": self._get_narrative_from_transaction(transaction),
                 "date_posted": transaction.date_posted.strftime("%Y%m%d%H%M%S"),
-                "date_processed": self._args.runtime.strftime("%Y%m%d%H%M%S"),
+                "date_processed": date_processed,
             }
-            self._db.insert("transactions", "transactions", data)
-
-    def _filter_transactions(self):
-        """
-        This private method will filter down the list of transactions to only the ones that have not already been
-        processed.
-
-        This is achieved by deriving a composite key for all of the loaded transactions and checking to see if that
-        key appears already in the tranasactions database table.
-
-        The composite key is INSTITUTION-ACCOUNT-TRANID
-
-        :return: None
-        """
-
-        transaction_data = self._get_transactions_from_db()
-
-        composite_keys = []
-        for row in transaction_data:
-            composite_keys.append("{}-{}-{}".format(row[0], row[1], row[2]))
-
-        new_transactions = []
-        for transaction in self._transactions:
-            key = "{}-{}-{}".format(
-                self._args.institution, self._args.account, transaction.fitid
-            )
-            if key not in composite_keys:
-                new_transactions.append(transaction)
-
-        self._transactions = new_transactions
-
-    def _get_transactions_from_db(self):
-        """
-        This private method will select the required information from the transactions DB table so that the composite
-        keys can be produced
-
-        :return: List: all rows of the table that have the required institution and account
-        """
-
-        columns = ["institution", "account", "tran_id"]
-        where = 'institution = "{institution}" and account = "{account}"'.format(
-            institution=self._args.institution, account=self._args.account
+            for transaction in self._transactions
+        ]
+        result = self._db.insert_many(
+            "transactions", "transactions", rows, on_conflict="ignore"
         )
-        return self._db.select(
-            "transactions", "transactions", columns=columns, where=where
+        self._logger.info(
+            "Loaded {} new transactions, skipped {} transactions already processed".format(
+                result.inserted, result.skipped
+            )
         )
+        if result.inserted >= self._config.database.analyze_min_rows:
+            self._db.analyze("transactions")
 
     @staticmethod
     def _get_narrative_from_transaction(transaction):
@@ -217,22 +331,22 @@ class LoadTransactionsTask(BaseTask):
         This private static method will build and return the correct value for the narrative field in a transaction.
         It will also throw an error if there is no suitable narrative field found.
 
-        :param transaction: a transaction object defined in PyFynance.schemas.ofx_banking_transaction.py
-        :type transaction: OFX Banking Transaction Object
+        :param transaction: a transaction object defined in PyFynance.schemas.model.py
+        :type transaction: BankingTransaction
         :return: String: the correct transaction narrative value
         """
 
-        has_name = hasattr(transaction, "name")
-        has_memo = hasattr(transaction, "memo")
+        name = transaction.name
+        memo = transaction.memo
 
-        if has_name and has_memo:
-            return "{} - {}".format(transaction.name, transaction.memo)
-        elif has_memo:
-            return transaction.memo
-        elif has_name:
-            return transaction.name
+        if name is not None and memo is not None:
+            return "{} - {}".format(name, memo)
+        elif memo is not None:
+            return memo
+        elif name is not None:
+            return name
         else:
             raise TaskLoadTransactionsError(
-                "Transaction does not have a memo or name attribute.  The transaction "
-                "has the following attributes '{}'".format(transaction.__dict__.keys())
+                "Transaction does not have a memo or name value.  The transaction "
+                "is '{}'".format(transaction)
             )
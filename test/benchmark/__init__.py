@@ -0,0 +1,10 @@
+"""
+The benchmark package holds the performance benchmarks for PyFynance.
+
+Benchmark modules are named "bench_*.py" so that they are not collected as part of the standard pytest run. To run a
+benchmark, pass the module to pytest directly with output capturing disabled, e.g.
+
+.. code-block:: bash
+
+    pipenv run pytest -s test/benchmark/bench_ofx_parser.py
+"""
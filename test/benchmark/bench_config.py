@@ -0,0 +1,38 @@
+from core.config import Configuration
+from test.benchmark.helpers import time_call, report
+
+CONFIG_COUNT = 200
+
+
+def load_config_every_time(count):
+    """
+    This public function reproduces the original loading and validating of config.json by every Configuration object
+    """
+
+    config = Configuration()
+    return [config._load_config() for _ in range(count)]
+
+
+def create_shared_configs(count):
+    """
+    This public function will create Configuration objects that share the process wide configuration
+    """
+
+    return [Configuration() for _ in range(count)]
+
+
+def test_shared_configuration_throughput():
+    load_time, _ = time_call(load_config_every_time, CONFIG_COUNT)
+    shared_time, configs = time_call(create_shared_configs, CONFIG_COUNT)
+
+    report(
+        "Configuration objects created ({} objects)".format(CONFIG_COUNT),
+        [
+            ("load per object microseconds", int(load_time / CONFIG_COUNT * 1e6)),
+            ("shared microseconds", int(shared_time / CONFIG_COUNT * 1e6)),
+            ("speedup", "{:.0f}x".format(load_time / shared_time)),
+        ],
+    )
+
+    assert all(config.paths is configs[0].paths for config in configs)
+    assert shared_time < load_time
@@ -0,0 +1,529 @@
+import asyncio
+import os
+import threading
+import tracemalloc
+from decimal import Decimal
+
+from pytest import fixture
+
+from core.config import Configuration
+from services.async_database import AsyncDatabase
+from services.database import Database
+from services.predicates import And, Between, Eq
+from test.benchmark.helpers import time_call, report
+
+ROW_COUNT = 1000000
+SINGLE_INSERT_ROW_COUNT = 50000
+
+
+@fixture
+def db(tmp_path):
+    os.makedirs(str(tmp_path / "current"))
+    db = Database()
+    with Configuration.override({"paths.db_path": str(tmp_path)}):
+        db.start_db("transactions")
+    yield db
+    db._connections["transactions"].close()
+
+
+def make_rows(row_count):
+    """
+    This public function will generate transaction table rows for the benchmarks
+    """
+
+    for index in range(row_count):
+        yield {
+            "institution": "bank",
+            "account": "account{}".format(index % 5),
+            "tran_id": str(index),
+            "tran_type": "DEBIT" if index % 3 else "CREDIT",
+            "amount": Decimal("-{}.{:02d}".format(index % 997, index % 100)),
+            "narrative": "MERCHANT {} - PURCHASE REF {}".format(index % 50, index),
+            "date_posted": "{}{:02d}{:02d}000000".format(
+                2015 + index % 10, index % 12 + 1, index % 28 + 1
+            ),
+            "date_processed": "20191027000000",
+        }
+
+
+def insert_rows_one_at_a_time(db, rows):
+    """
+    This public function reproduces the original insert of one formatted sql statement per row
+    """
+
+    for row in rows:
+        db.insert("transactions", "transactions", row)
+
+
+def test_insert_many_throughput(db):
+    single_time, _ = time_call(
+        insert_rows_one_at_a_time, db, make_rows(SINGLE_INSERT_ROW_COUNT)
+    )
+    db._connections["transactions"].rollback()
+
+    many_time, inserted = time_call(
+        db.insert_many, "transactions", "transactions", make_rows(ROW_COUNT)
+    )
+
+    report(
+        "Database inserts",
+        [
+            ("insert rows/sec", int(SINGLE_INSERT_ROW_COUNT / single_time)),
+            ("insert_many rows/sec", int(ROW_COUNT / many_time)),
+            ("insert_many seconds for {} rows".format(ROW_COUNT), round(many_time, 1)),
+        ],
+    )
+
+    assert inserted.inserted == ROW_COUNT
+
+
+DEDUPE_ROW_COUNT = 20000
+
+
+def filter_and_insert_rows(db, rows):
+    """
+    This public function reproduces the original dedupe of loading every existing composite key into python and
+    checking each new row against the key list
+    """
+
+    existing_rows = db.select(
+        "transactions",
+        "transactions",
+        columns=["institution", "account", "tran_id"],
+        where='institution = "bank"',
+    )
+    composite_keys = ["{}-{}-{}".format(*row) for row in existing_rows]
+    new_rows = [
+        row
+        for row in rows
+        if "{institution}-{account}-{tran_id}".format(**row) not in composite_keys
+    ]
+    return db.insert_many("transactions", "transactions", new_rows)
+
+
+def test_dedupe_throughput(db):
+    rows = list(make_rows(DEDUPE_ROW_COUNT * 2))
+    db.insert_many("transactions", "transactions", rows[:DEDUPE_ROW_COUNT])
+    new_rows = rows[DEDUPE_ROW_COUNT // 2 : DEDUPE_ROW_COUNT + DEDUPE_ROW_COUNT // 2]
+
+    db._connections["transactions"].execute("SAVEPOINT bench")
+    filter_time, filter_result = time_call(filter_and_insert_rows, db, new_rows)
+    db._connections["transactions"].execute("ROLLBACK TO bench")
+    ignore_time, ignore_result = time_call(
+        db.insert_many, "transactions", "transactions", new_rows, on_conflict="ignore"
+    )
+
+    report(
+        "Dedupe of {} rows against {} existing rows".format(
+            len(new_rows), DEDUPE_ROW_COUNT
+        ),
+        [
+            ("python key list filter seconds", round(filter_time, 2)),
+            ("INSERT OR IGNORE seconds", round(ignore_time, 2)),
+            ("result (inserted, skipped)", tuple(ignore_result)),
+        ],
+    )
+
+    assert filter_result.inserted == ignore_result.inserted
+
+
+PROFILE_ROW_COUNT = 200000
+PROFILE_BATCH_COUNT = 20
+
+
+def insert_and_commit_batches(db, rows, batch_count):
+    """
+    This public function will insert the rows in a number of separately committed batches, as repeated loads would
+    """
+
+    batch_size = len(rows) // batch_count
+    for start in range(0, len(rows), batch_size):
+        db.insert_many("transactions", "transactions", rows[start : start + batch_size])
+        db._connections["transactions"].commit()
+
+
+def test_profile_bulk_insert_throughput(tmp_path):
+    rows = list(make_rows(PROFILE_ROW_COUNT))
+    db = Database()
+    results = []
+
+    for profile in sorted(db._config.database.profiles):
+        db_path = tmp_path / profile
+        os.makedirs(str(db_path / "current"))
+        with Configuration.override({"paths.db_path": str(db_path)}):
+            db.start_db("transactions", profile=profile)
+
+        profile_time, _ = time_call(
+            insert_and_commit_batches, db, rows, PROFILE_BATCH_COUNT
+        )
+        db._connections["transactions"].close()
+        results.append(
+            (
+                "{} profile rows/sec".format(profile),
+                int(PROFILE_ROW_COUNT / profile_time),
+            )
+        )
+
+    report(
+        "Bulk insert by database profile ({} rows in {} commits)".format(
+            PROFILE_ROW_COUNT, PROFILE_BATCH_COUNT
+        ),
+        results,
+    )
+
+
+SELECT_ROW_COUNT = 200000
+
+
+def measure_peak_bytes(fn, *args):
+    """
+    This public function will return the peak number of bytes allocated while fn runs, and its result
+    """
+
+    tracemalloc.start()
+    result = fn(*args)
+    peak_size = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak_size, result
+
+
+def sum_selected_amounts(rows):
+    """
+    This public function will sum the amount column of the rows provided, as downstream analysis would
+    """
+
+    return sum(row[4] for row in rows)
+
+
+def test_iter_select_memory(db):
+    db.insert_many("transactions", "transactions", make_rows(SELECT_ROW_COUNT))
+
+    select_time, (select_peak, select_total) = time_call(
+        measure_peak_bytes,
+        lambda: sum_selected_amounts(db.select("transactions", "transactions")),
+    )
+    iter_time, (iter_peak, iter_total) = time_call(
+        measure_peak_bytes,
+        lambda: sum_selected_amounts(db.iter_select("transactions", "transactions")),
+    )
+
+    report(
+        "Select of {} rows".format(SELECT_ROW_COUNT),
+        [
+            ("select peak MB", round(select_peak / 1e6, 1)),
+            ("iter_select peak MB", round(iter_peak / 1e6, 1)),
+            ("select rows/sec", int(SELECT_ROW_COUNT / select_time)),
+            ("iter_select rows/sec", int(SELECT_ROW_COUNT / iter_time)),
+        ],
+    )
+
+    assert iter_total == select_total
+    assert iter_peak * 10 < select_peak
+
+
+INDEX_ROW_COUNT = int(os.environ.get("PYFYNANCE_BENCH_INDEX_ROWS", 5000000))
+DATE_RANGE = Between("date_posted", "20190301", "20190630235959")
+DATE_RANGE_QUERIES = [
+    ("date range", ["count(*)"], DATE_RANGE),
+    (
+        "account + date range",
+        ["count(*)", "min(amount)", "max(amount)"],
+        And(Eq("institution", "bank"), Eq("account", "account4"), DATE_RANGE),
+    ),
+    ("tran_type + date range", ["count(*)"], And(Eq("tran_type", "DEBIT"), DATE_RANGE)),
+]
+
+
+def run_date_range_queries(db):
+    """
+    This public function will run each of the date range queries, returning a list of (seconds, result) tuples
+    """
+
+    return [
+        time_call(db.select, "transactions", "transactions", columns, where)
+        for _, columns, where in DATE_RANGE_QUERIES
+    ]
+
+
+def test_date_range_query_indexes(tmp_path):
+    os.makedirs(str(tmp_path / "current"))
+    db = Database()
+    with Configuration.override(
+        {"paths.db_path": str(tmp_path), "database.indexes.transactions": []}
+    ):
+        db.start_db("transactions", profile="bulk_load")
+
+    db.insert_many("transactions", "transactions", make_rows(INDEX_ROW_COUNT))
+    db._connections["transactions"].commit()
+    scan_results = run_date_range_queries(db)
+
+    index_time, _ = time_call(db._build_tables, "transactions")
+    analyze_time, _ = time_call(db.analyze, "transactions")
+    db._connections["transactions"].commit()
+    index_results = run_date_range_queries(db)
+    db._connections["transactions"].close()
+
+    rows = [
+        ("create indexes seconds", round(index_time, 1)),
+        ("analyze seconds", round(analyze_time, 1)),
+    ]
+    for (name, _, _), (scan_time, _), (indexed_time, _) in zip(
+        DATE_RANGE_QUERIES, scan_results, index_results
+    ):
+        rows.append(
+            (
+                "{} ms (scan / indexed)".format(name),
+                "{:.1f} / {:.1f} ({:.0f}x)".format(
+                    scan_time * 1000, indexed_time * 1000, scan_time / indexed_time
+                ),
+            )
+        )
+    report("Date range queries on {} rows".format(INDEX_ROW_COUNT), rows)
+
+    for (_, scan_result), (_, index_result) in zip(scan_results, index_results):
+        assert scan_result[0][0]
+        assert index_result == scan_result
+
+
+LOOKUP_ROW_COUNT = 100000
+LOOKUP_COUNT = 20000
+
+
+def select_with_inlined_values(db, keys):
+    """
+    This public function reproduces selecting with values formatted into the where condition, which gives sqlite a
+    new statement to compile for every call
+    """
+
+    return [
+        db.select(
+            "transactions",
+            "transactions",
+            columns=["amount"],
+            where="institution = 'bank' AND account = '{}' AND tran_id = '{}'".format(
+                account, tran_id
+            ),
+        )
+        for account, tran_id in keys
+    ]
+
+
+def select_with_parameters(db, keys):
+    """
+    This public function selects with "?" placeholders in the where condition, reusing one cached statement
+    """
+
+    return [
+        db.select(
+            "transactions",
+            "transactions",
+            columns=["amount"],
+            where="institution = 'bank' AND account = ? AND tran_id = ?",
+            parameters=(account, tran_id),
+        )
+        for account, tran_id in keys
+    ]
+
+
+def select_with_predicates(db, keys):
+    """
+    This public function selects with a where predicate, which compiles to the same parameterised statement
+    """
+
+    return [
+        db.select(
+            "transactions",
+            "transactions",
+            columns=["amount"],
+            where=And(
+                Eq("institution", "bank"),
+                Eq("account", account),
+                Eq("tran_id", tran_id),
+            ),
+        )
+        for account, tran_id in keys
+    ]
+
+
+def test_sql_cache_lookup_throughput(db):
+    db.insert_many("transactions", "transactions", make_rows(LOOKUP_ROW_COUNT))
+    keys = [
+        ("account{}".format(index % 5), str(index))
+        for index in (index * 7 % LOOKUP_ROW_COUNT for index in range(LOOKUP_COUNT))
+    ]
+
+    inlined_time, inlined_rows = time_call(select_with_inlined_values, db, keys)
+    cache_info = db.sql_cache_info()
+    parameter_time, parameter_rows = time_call(select_with_parameters, db, keys)
+    predicate_time, predicate_rows = time_call(select_with_predicates, db, keys)
+
+    report(
+        "Point lookups ({} selects)".format(LOOKUP_COUNT),
+        [
+            ("inlined where selects/sec", int(LOOKUP_COUNT / inlined_time)),
+            ("parameterised where selects/sec", int(LOOKUP_COUNT / parameter_time)),
+            ("predicate where selects/sec", int(LOOKUP_COUNT / predicate_time)),
+            ("sql cache after inlined", tuple(cache_info)),
+            (
+                "sql cache after parameterised and predicates",
+                tuple(db.sql_cache_info()),
+            ),
+        ],
+    )
+
+    assert parameter_rows == inlined_rows
+    assert predicate_rows == inlined_rows
+    assert all(parameter_rows)
+
+
+POOL_ROW_COUNT = 200000
+POOL_BATCH_SIZE = 5000
+POOL_READER_COUNT = 4
+
+
+def read_until_set(db, stop_event, query_counts, errors):
+    """
+    This public function will run date range queries on the calling thread until the stop event is set
+    """
+
+    query_count = 0
+    try:
+        while not stop_event.is_set():
+            db.select("transactions", "transactions", ["count(*)"], DATE_RANGE)
+            query_count += 1
+    except Exception as e:
+        errors.append(e)
+    query_counts.append(query_count)
+
+
+def write_in_batches(db, rows, batch_size):
+    """
+    This public function will insert the rows in separately committed batches of batch_size rows
+    """
+
+    for start in range(0, len(rows), batch_size):
+        db.insert_many("transactions", "transactions", rows[start : start + batch_size])
+
+
+def test_pooled_concurrent_reads_and_writes(tmp_path):
+    os.makedirs(str(tmp_path / "current"))
+    db = Database()
+    with Configuration.override({"paths.db_path": str(tmp_path)}):
+        db.start_db("transactions", profile="bulk_load", pooled=True)
+    rows = list(make_rows(POOL_ROW_COUNT))
+
+    stop_event = threading.Event()
+    query_counts = []
+    errors = []
+    readers = [
+        threading.Thread(
+            target=read_until_set, args=(db, stop_event, query_counts, errors)
+        )
+        for _ in range(POOL_READER_COUNT)
+    ]
+    for reader in readers:
+        reader.start()
+    write_time, _ = time_call(write_in_batches, db, rows, POOL_BATCH_SIZE)
+    stop_event.set()
+    for reader in readers:
+        reader.join()
+    db.stop_db("transactions", commit=False)
+
+    report(
+        "Pooled writes with {} concurrent readers".format(POOL_READER_COUNT),
+        [
+            ("writer rows/sec", int(POOL_ROW_COUNT / write_time)),
+            ("reader queries/sec", int(sum(query_counts) / write_time)),
+            ("errors", len(errors)),
+        ],
+    )
+
+    assert errors == []
+    assert all(query_counts)
+
+
+ASYNC_ROW_COUNT = 200000
+
+
+async def measure_loop_latency(coroutine):
+    """
+    This public function will run the coroutine while a ticker task measures the longest time the event loop went
+    without running it
+    """
+
+    loop = asyncio.get_running_loop()
+    longest_gap = 0
+    done = False
+
+    async def tick():
+        nonlocal longest_gap
+        last_tick = loop.time()
+        while not done:
+            await asyncio.sleep(0.001)
+            longest_gap = max(longest_gap, loop.time() - last_tick)
+            last_tick = loop.time()
+
+    ticker = asyncio.create_task(tick())
+    await asyncio.sleep(0)
+    start = loop.time()
+    result = await coroutine
+    elapsed = loop.time() - start
+    done = True
+    await ticker
+    return elapsed, longest_gap, result
+
+
+async def select_blocking(db):
+    return db.select("transactions", "transactions")
+
+
+async def select_async(async_db):
+    return await async_db.select("transactions", "transactions")
+
+
+async def iter_select_async(async_db):
+    return [row async for row in async_db.iter_select("transactions", "transactions")]
+
+
+def test_async_select_event_loop_latency(tmp_path):
+    os.makedirs(str(tmp_path / "current"))
+    db = Database()
+    async_db = AsyncDatabase(db)
+
+    async def run_selects():
+        await async_db.start_db("transactions", profile="bulk_load")
+        await async_db.insert_many(
+            "transactions", "transactions", make_rows(ASYNC_ROW_COUNT)
+        )
+        results = [await measure_loop_latency(select_async(async_db))]
+        results.append(await measure_loop_latency(iter_select_async(async_db)))
+        # the blocking select has to run on the executor thread that owns the connection
+        results.append(
+            await async_db._run(asyncio.run, measure_loop_latency(select_blocking(db)))
+        )
+        await async_db.close(commit=False)
+        return results
+
+    with Configuration.override({"paths.db_path": str(tmp_path)}):
+        results = asyncio.run(run_selects())
+
+    report(
+        "Event loop latency while selecting {} rows".format(ASYNC_ROW_COUNT),
+        [
+            (
+                "{} rows/sec, longest loop stall ms".format(name),
+                "{} / {:.1f}".format(int(ASYNC_ROW_COUNT / elapsed), gap * 1000),
+            )
+            for name, (elapsed, gap, _) in zip(
+                [
+                    "AsyncDatabase.select",
+                    "AsyncDatabase.iter_select",
+                    "blocking Database.select",
+                ],
+                results,
+            )
+        ],
+    )
+
+    assert all(len(rows) == ASYNC_ROW_COUNT for _, _, rows in results)
+    assert results[0][1] < results[2][1]
@@ -0,0 +1,274 @@
+import os
+import tracemalloc
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+from pytest import fixture
+
+from core.config import Configuration
+from schemas.model import BankingTransaction, Model
+from schemas.ofx_banking_transaction import OFXBankingTransactionSchema
+from services.ofx_dates import cast_ofx_datetime, cast_ofx_datetime_column
+from services.ofx_parser import OFXParser
+from services.ofx_tokenizer import OFXTokenizer
+from services.parse_cache import ParseCache
+from test.benchmark.helpers import write_ofx_file, time_call, report
+
+TRAN_COUNT = 20000
+
+
+@fixture(scope="module")
+def config():
+    return Configuration()
+
+
+@fixture(scope="module")
+def ofx_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("ofx") / "statement.ofx")
+    return write_ofx_file(path, TRAN_COUNT)
+
+
+def read_with_beautiful_soup(path, html_tags):
+    """
+    This public function reproduces the original BeautifulSoup based reading of stmttrn aggregates so that the
+    streaming tokenizer can be compared against it
+    """
+
+    with open(path) as ofx_file:
+        ofx_data = BeautifulSoup(ofx_file, features="html.parser")
+
+    transactions = []
+    for tran in ofx_data.find_all("stmttrn"):
+        tran_data = {}
+        for tag in tran.find_all():
+            if tag.name not in html_tags:
+                tran_data[tag.name] = tag.text.split("\n")[0]
+        transactions.append(tran_data)
+    return transactions
+
+
+def read_with_tokenizer(path, html_tags):
+    """
+    This public function reads all of the stmttrn aggregates using the streaming tokenizer
+    """
+
+    tokenizer = OFXTokenizer(ignore_tags=html_tags)
+    with open(path) as ofx_file:
+        return list(tokenizer.iter_aggregates(ofx_file, "stmttrn"))
+
+
+def test_tokenizer_throughput_against_beautiful_soup(config, ofx_path):
+    html_tags = config.ofx_parser.html_tags
+    soup_time, soup_trans = time_call(read_with_beautiful_soup, ofx_path, html_tags)
+    token_time, token_trans = time_call(read_with_tokenizer, ofx_path, html_tags)
+
+    report(
+        "OFX stmttrn extraction ({} transactions)".format(TRAN_COUNT),
+        [
+            ("BeautifulSoup transactions/sec", int(TRAN_COUNT / soup_time)),
+            ("OFXTokenizer transactions/sec", int(TRAN_COUNT / token_time)),
+            ("speedup", "{:.1f}x".format(soup_time / token_time)),
+        ],
+    )
+
+    assert token_trans == soup_trans
+    assert soup_time / token_time >= 10
+
+
+def parse_with_schema_per_transaction(ofx_parser, path):
+    """
+    This public function reproduces the original loading of one new marshmallow schema instance per transaction
+    """
+
+    return [
+        OFXBankingTransactionSchema().load(ofx_parser._cast_ofx_values(tran_dict))
+        for tran_dict in ofx_parser._read_ofx_file(path, "stmttrn")
+    ]
+
+
+def test_schema_loading_throughput(config, ofx_path):
+    ofx_parser = OFXParser(config)
+    before_time, before_trans = time_call(
+        parse_with_schema_per_transaction, ofx_parser, ofx_path
+    )
+    batch_time, batch_trans = time_call(
+        ofx_parser.parse, "banking_transactions", ofx_path
+    )
+    trusted_time, trusted_trans = time_call(
+        ofx_parser.parse, "banking_transactions", ofx_path, trusted=True
+    )
+
+    report(
+        "OFX banking transaction parsing ({} transactions)".format(TRAN_COUNT),
+        [
+            ("schema per transaction transactions/sec", int(TRAN_COUNT / before_time)),
+            ("cached batch schema transactions/sec", int(TRAN_COUNT / batch_time)),
+            ("trusted loader transactions/sec", int(TRAN_COUNT / trusted_time)),
+        ],
+    )
+
+    assert batch_trans == before_trans
+    assert trusted_trans == before_trans
+
+
+def measure_bytes_per_record(record_class, tran_dicts):
+    """
+    This public function will measure the average number of bytes allocated per record when the record class is
+    built from each of the dictionaries provided
+    """
+
+    tracemalloc.start()
+    start_size = tracemalloc.get_traced_memory()[0]
+    records = [record_class(**tran_dict) for tran_dict in tran_dicts]
+    end_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    return (end_size - start_size) / len(records)
+
+
+def test_transaction_record_memory(config, ofx_path):
+    ofx_parser = OFXParser(config)
+    schema = OFXBankingTransactionSchema()
+    tran_dicts = [
+        {
+            field_name: getattr(tran, field_name)
+            for field_name in schema.fields
+            if getattr(tran, field_name) is not None
+        }
+        for tran in ofx_parser.parse("banking_transactions", ofx_path, trusted=True)
+    ]
+
+    model_bytes = measure_bytes_per_record(Model, tran_dicts)
+    slotted_bytes = measure_bytes_per_record(BankingTransaction, tran_dicts)
+
+    report(
+        "Memory per transaction record ({} transactions)".format(TRAN_COUNT),
+        [
+            ("Model (instance __dict__) bytes/record", int(model_bytes)),
+            ("BankingTransaction (__slots__) bytes/record", int(slotted_bytes)),
+        ],
+    )
+
+    assert slotted_bytes < model_bytes
+
+
+def cast_dates_with_strptime(values):
+    """
+    This public function reproduces the original strptime and string round trip casting of ofx dates
+    """
+
+    return [
+        datetime.fromisoformat(
+            str(
+                datetime.strptime(
+                    value, "%Y%m%d" if len(value) == 8 else "%Y%m%d%H%M%S"
+                )
+            )
+        )
+        for value in values
+    ]
+
+
+def test_date_casting_throughput(config, ofx_path):
+    ofx_parser = OFXParser(config)
+    values = [
+        tran_dict[key]
+        for tran_dict in ofx_parser._read_ofx_file(ofx_path, "stmttrn")
+        for key in ("dtposted", "dtuser")
+    ]
+    cast_ofx_datetime.cache_clear()
+
+    strptime_time, strptime_dates = time_call(cast_dates_with_strptime, values)
+    cached_time, cached_dates = time_call(
+        lambda: [cast_ofx_datetime(value) for value in values]
+    )
+    column_time, column = time_call(cast_ofx_datetime_column, values)
+
+    report(
+        "OFX date casting ({} values)".format(len(values)),
+        [
+            ("strptime round trip values/sec", int(len(values) / strptime_time)),
+            ("memoized slicing values/sec", int(len(values) / cached_time)),
+            ("column batch values/sec", int(len(values) / column_time)),
+            ("cache info", cast_ofx_datetime.cache_info()),
+        ],
+    )
+
+    assert cached_dates == strptime_dates
+    assert column.tolist() == strptime_dates
+
+
+def test_parse_cache_hit_throughput(config, ofx_path, tmp_path):
+    parse_cache = ParseCache(str(tmp_path / "cache"), 256 * 1024 * 1024)
+    ofx_parser = OFXParser(config, parse_cache)
+
+    miss_time, parsed_trans = time_call(
+        ofx_parser.parse, "banking_transactions", ofx_path
+    )
+    hit_time, cached_trans = time_call(
+        ofx_parser.parse, "banking_transactions", ofx_path
+    )
+    cache_bytes = sum(entry[2] for entry in parse_cache._list_entries())
+
+    report(
+        "OFX parse cache ({} transactions)".format(TRAN_COUNT),
+        [
+            (
+                "cache miss (parse and store) transactions/sec",
+                int(TRAN_COUNT / miss_time),
+            ),
+            ("cache hit transactions/sec", int(TRAN_COUNT / hit_time)),
+            ("speedup", "{:.1f}x".format(miss_time / hit_time)),
+            ("cache entry bytes/transaction", int(cache_bytes / TRAN_COUNT)),
+        ],
+    )
+
+    assert cached_trans == parsed_trans
+    assert hit_time < miss_time
+
+
+LARGE_TRAN_COUNT = 200000
+
+
+def test_parallel_range_parsing_scaling(config, tmp_path):
+    large_path = write_ofx_file(str(tmp_path / "large.ofx"), LARGE_TRAN_COUNT)
+    ofx_parser = OFXParser(config)
+    cpu_count = os.cpu_count() or 1
+
+    serial_time, serial_trans = time_call(
+        ofx_parser.parse, "banking_transactions", large_path, trusted=True
+    )
+    rows = [("file MB", round(os.path.getsize(large_path) / 1e6, 1))]
+    rows.append(("1 worker transactions/sec", int(LARGE_TRAN_COUNT / serial_time)))
+    parallel_times = {}
+
+    for workers in sorted({2, 4, cpu_count} - {1}):
+        with Configuration.override({"ofx_parser.parallel_min_size": 0}):
+            parallel_time, parallel_trans = time_call(
+                ofx_parser.parse,
+                "banking_transactions",
+                large_path,
+                trusted=True,
+                workers=workers,
+            )
+        parallel_times[workers] = parallel_time
+        rows.append(
+            (
+                "{} workers transactions/sec".format(workers),
+                "{} ({:.2f}x)".format(
+                    int(LARGE_TRAN_COUNT / parallel_time), serial_time / parallel_time
+                ),
+            )
+        )
+        assert parallel_trans == serial_trans
+
+    rows.append(("cpu count", cpu_count))
+    report(
+        "OFX parallel range parsing ({} transactions)".format(LARGE_TRAN_COUNT), rows
+    )
+
+    # workers are capped at the cpu count, so scaling is only expected with spare cpus
+    if cpu_count >= 4:
+        assert serial_time / parallel_times[4] > 1.5
+    elif cpu_count >= 2:
+        assert serial_time / parallel_times[2] > 1.1
@@ -0,0 +1,150 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from test.benchmark.helpers import report
+
+REPO_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CODE_PATH = os.path.join(REPO_PATH, "PyFynance")
+LOGS_PATH = os.path.join(REPO_PATH, "logs", "1.0")
+COMMAND = [
+    "-m",
+    "PyFynance",
+    "--task_type",
+    "load_transactions",
+    "--institution",
+    "bench",
+    "--account",
+    "bench",
+]
+RUN_COUNT = 5
+FIRST_LOG_LINE_TARGET_MS = 150
+DEFERRED_MODULES = [
+    "concurrent.futures.process",
+    "numpy",
+    "pkg_resources",
+    "services.database",
+    "services.ofx_parser",
+    "sqlite3",
+]
+
+
+def run_until_first_log_line(python_options):
+    """
+    This public function will start a load_transactions run of PyFynance and stop it as soon as it writes its first
+    log line, before the task does any work. The log file the run created is removed.
+
+    :param python_options: the options to start the python interpreter with
+    :return: tuple of (seconds until the first log line, List of the -X importtime lines written before it)
+    """
+
+    log_files = set(os.listdir(LOGS_PATH)) if os.path.isdir(LOGS_PATH) else set()
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable] + python_options + COMMAND,
+        cwd=REPO_PATH,
+        env=dict(os.environ, PYTHONPATH=CODE_PATH),
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+    )
+
+    import_lines = []
+    for line in process.stderr:
+        if not line.startswith("import time:"):
+            break
+        import_lines.append(line)
+    elapsed = time.perf_counter() - start
+
+    process.kill()
+    process.wait()
+    process.stderr.close()
+    for log_file in set(os.listdir(LOGS_PATH)) - log_files:
+        os.remove(os.path.join(LOGS_PATH, log_file))
+
+    return elapsed, import_lines
+
+
+def parse_import_times(import_lines):
+    """
+    This public function will parse -X importtime lines into the cumulative microseconds of each import, keyed by
+    module name. Top level imports are those not made by another import.
+
+    :param import_lines: the lines written by -X importtime
+    :return: tuple of (Dictionary of every import, Dictionary of the top level imports)
+    """
+
+    import_times = {}
+    top_level_times = {}
+    for line in import_lines[1:]:
+        _, cumulative, name = line.split("|")
+        import_times[name.strip()] = int(cumulative)
+        if not name[1:].startswith(" "):
+            top_level_times[name.strip()] = int(cumulative)
+    return import_times, top_level_times
+
+
+def import_task_and_list_modules():
+    """
+    This public function will create a load_transactions task in a new interpreter and return the modules imported
+    by the time it has been created
+
+    :return: Set of imported module names
+    """
+
+    script = (
+        "import datetime, sys, types\n"
+        "from tasks.task_load_transactions import LoadTransactionsTask\n"
+        "args = types.SimpleNamespace(task_type='load_transactions', institution='bench', account='bench', "
+        "workers=1, runtime=datetime.datetime.now())\n"
+        "LoadTransactionsTask(args)\n"
+        "print('\\n'.join(sys.modules))\n"
+    )
+    output = subprocess.check_output(
+        [sys.executable, "-c", script],
+        cwd=REPO_PATH,
+        env=dict(os.environ, PYTHONPATH=CODE_PATH),
+        universal_newlines=True,
+    )
+    return set(output.split())
+
+
+def test_time_to_first_log_line():
+    first_log_times = [run_until_first_log_line([])[0] for _ in range(RUN_COUNT)]
+    import_times = [
+        parse_import_times(run_until_first_log_line(["-X", "importtime"])[1])
+        for _ in range(RUN_COUNT)
+    ]
+    import_totals = [sum(top_level.values()) for _, top_level in import_times]
+    slowest = sorted(import_times[-1][1].items(), key=lambda item: -item[1])[:5]
+
+    first_log_ms = statistics.median(first_log_times) * 1000
+    report(
+        "Startup of load_transactions ({} runs, median)".format(RUN_COUNT),
+        [
+            (
+                "time to first log line ms (target {})".format(
+                    FIRST_LOG_LINE_TARGET_MS
+                ),
+                round(first_log_ms, 1),
+            ),
+            (
+                "-X importtime total ms",
+                round(statistics.median(import_totals) / 1000, 1),
+            ),
+        ]
+        + [
+            ("  {} ms".format(name), round(microseconds / 1000, 1))
+            for name, microseconds in slowest
+        ],
+    )
+
+    assert not set(DEFERRED_MODULES) & set(import_times[-1][0])
+
+
+def test_task_creation_defers_service_imports():
+    modules = import_task_and_list_modules()
+
+    assert "tasks.task_load_transactions" in modules
+    assert not set(DEFERRED_MODULES) & modules
@@ -0,0 +1,69 @@
+import time
+
+
+def write_ofx_file(path, tran_count):
+    """
+    This public function will write a synthetic OFX 1.0.2 banking statement containing the requested number of
+    transactions to the path specified
+
+    :param path: the full path of the file to write
+    :param tran_count: the number of stmttrn aggregates to write to the file
+    :return: the path written to
+    """
+
+    header = (
+        "OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\n\n<OFX>\n<BANKMSGSRSV1>\n<STMTTRNRS>\n"
+        "<STMTRS>\n<BANKTRANLIST>\n"
+    )
+    footer = "</BANKTRANLIST>\n</STMTRS>\n</STMTTRNRS>\n</BANKMSGSRSV1>\n</OFX>\n"
+    tran_template = (
+        "<STMTTRN>\n<TRNTYPE>{trn_type}\n<DTPOSTED>2019{month:02d}{day:02d}000000\n"
+        "<DTUSER>2019{month:02d}{day:02d}\n<TRNAMT>{amount}\n<FITID>{fitid:012d}\n"
+        "<NAME>MERCHANT {merchant}\n<MEMO>PURCHASE REF {fitid}\n</STMTTRN>\n"
+    )
+
+    with open(path, "w") as ofx_file:
+        ofx_file.write(header)
+        for index in range(tran_count):
+            ofx_file.write(
+                tran_template.format(
+                    trn_type="DEBIT" if index % 3 else "CREDIT",
+                    month=index % 12 + 1,
+                    day=index % 28 + 1,
+                    amount="{}{}.{:02d}".format(
+                        "" if index % 3 == 0 else "-", index % 997, index % 100
+                    ),
+                    fitid=index,
+                    merchant=index % 50,
+                )
+            )
+        ofx_file.write(footer)
+
+    return path
+
+
+def time_call(function, *args, **kwargs):
+    """
+    This public function will time a single call of the function provided
+
+    :param function: the function to call
+    :return: tuple of (seconds taken, function return value)
+    """
+
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def report(title, rows):
+    """
+    This public function will print a simple aligned results table for a benchmark
+
+    :param title: the title of the benchmark
+    :param rows: list of (label, value) tuples to print
+    :return: None
+    """
+
+    print("\n{}".format(title))
+    for label, value in rows:
+        print("    {:<45} {}".format(label, value))
@@ -1,3 +1,9 @@
+import os
+import pickle
+
+from mock import patch
+from pytest import raises
+
 from core.config import Configuration
 
 
@@ -7,4 +13,89 @@ def test_when_init_then_config_object_returned():
     assert hasattr(config, "paths")
     assert hasattr(config.paths, "repo_path")
     assert hasattr(config.paths, "code_path")
+    assert hasattr(config.paths, "parse_cache_path")
     assert hasattr(config, "version")
+
+
+def test_when_init_twice_then_config_loaded_once_and_shared():
+    Configuration()
+    with patch.object(Configuration, "_load_config") as load_config_mock:
+        first = Configuration()
+        second = Configuration()
+
+    load_config_mock.assert_not_called()
+    assert first.paths is second.paths
+
+
+def test_when_config_file_modified_then_config_reloaded(tmp_path):
+    config_path = str(tmp_path / "config.json")
+    with open(config_path, "w") as config_file:
+        config_file.write("{}")
+
+    with patch.object(Configuration, "_get_config_file_path", return_value=config_path):
+        config = Configuration()
+        assert config.reload() is False
+
+        os.utime(config_path, ns=(0, 0))
+        assert config.reload() is True
+        assert config.reload() is False
+
+
+def test_when_set_config_value_then_raise_error():
+    config = Configuration()
+
+    with raises(AttributeError) as raised_error:
+        config.paths.db_path = "somewhere/else"
+    assert raised_error.value.args[0] == (
+        "Configuration value 'db_path' is read only, use Configuration.override to "
+        "change it"
+    )
+
+
+def test_when_change_config_list_or_dict_then_raise_error():
+    config = Configuration()
+
+    with raises(AttributeError):
+        config.ofx_parser.cast_fields.append("dtuser")
+    with raises(TypeError):
+        config.ofx_parser.currency_exponents["AUD"] = 0
+    with raises(TypeError):
+        config.database.indexes.transactions[0]["name"] = "renamed"
+    assert config.ofx_parser.currency_exponents["default"] == 2
+
+
+def test_when_override_then_all_instances_see_value_until_block_exits():
+    config = Configuration()
+    db_path = config.paths.db_path
+
+    with Configuration.override({"paths.db_path": "outer"}):
+        with Configuration.override({"paths.db_path": "inner"}):
+            assert config.paths.db_path == "inner"
+            assert Configuration().paths.db_path == "inner"
+        assert config.paths.db_path == "outer"
+        assert config.paths.input_path == Configuration().paths.input_path
+
+    assert config.paths.db_path == db_path
+
+
+def test_when_override_unknown_value_then_raise_error():
+    with raises(AttributeError) as raised_error:
+        with Configuration.override({"paths.not_a_path": "somewhere"}):
+            pass
+    assert raised_error.value.args[0] == "Configuration has no value 'not_a_path'"
+
+
+def test_when_pickled_then_overrides_kept():
+    with Configuration.override({"database.sql_cache_size": 2}):
+        pickled = pickle.dumps(Configuration())
+
+    assert Configuration().database.sql_cache_size != 2
+    assert pickle.loads(pickled).database.sql_cache_size == 2
+
+
+def test_when_pickled_then_lists_and_dicts_still_frozen():
+    config = pickle.loads(pickle.dumps(Configuration()))
+
+    assert config.ofx_parser.cast_fields == Configuration().ofx_parser.cast_fields
+    with raises(TypeError):
+        config.ofx_parser.currency_exponents["AUD"] = 0
@@ -0,0 +1,196 @@
+import os
+import threading
+from argparse import Namespace
+from decimal import Decimal
+
+from mock import MagicMock, patch
+from pytest import fixture, raises
+
+from core.config import Configuration
+from core.daemon import Daemon, DaemonDatabase
+from core.exceptions import DatabaseError
+from services.database import Database
+
+
+@fixture
+def db_path(tmp_path):
+    os.makedirs(str(tmp_path / "current"))
+    os.makedirs(str(tmp_path / "backup"))
+    with Configuration.override({"paths.db_path": str(tmp_path)}):
+        yield str(tmp_path)
+
+
+@fixture
+def daemon_db(db_path):
+    return DaemonDatabase(Database())
+
+
+@fixture
+def landing_path(tmp_path):
+    path = tmp_path / "input" / "banking_transactions" / "landing"
+    os.makedirs(str(path))
+    with Configuration.override(
+        {
+            "paths.input_path": str(tmp_path / "input"),
+            "daemon.settle_time": 0.0,
+            "daemon.backup_interval": 3600.0,
+        }
+    ):
+        yield path
+
+
+@fixture
+def args():
+    return Namespace(
+        task_type="load_transactions",
+        institution="bank",
+        account="cc",
+        workers=1,
+        daemon=True,
+    )
+
+
+def make_row(tran_id):
+    return {
+        "institution": "bank",
+        "account": "account",
+        "tran_id": tran_id,
+        "tran_type": "CREDIT",
+        "amount": Decimal("1.00"),
+        "narrative": "narrative",
+        "date_posted": "20200101000000",
+    }
+
+
+def list_backups(db_path):
+    return [
+        name
+        for name in os.listdir(os.sep.join([db_path, "backup"]))
+        if name.endswith(".db")
+    ]
+
+
+def test_when_tasks_stop_daemon_db_then_changes_committed_without_backup(
+    daemon_db, db_path
+):
+    database = daemon_db._database
+    with patch.object(database, "start_db", wraps=database.start_db) as start_db:
+        daemon_db.start_db("transactions", profile="bulk_load")
+        daemon_db.insert("transactions", "transactions", make_row("1"))
+        daemon_db.stop_db("transactions", commit=True)
+        daemon_db.start_db("transactions", profile="bulk_load")
+        daemon_db.insert("transactions", "transactions", make_row("2"))
+        daemon_db.stop_db("transactions", commit=False)
+
+    start_db.assert_called_once_with("transactions", True, "bulk_load")
+    assert list_backups(db_path) == []
+    assert database.select("transactions", "transactions", columns=["tran_id"]) == [
+        ("1",)
+    ]
+
+    daemon_db.backup()
+    daemon_db.backup()
+    assert len(list_backups(db_path)) == 1
+
+    with patch.object(database, "stop_db") as stop_db:
+        daemon_db.close()
+    stop_db.assert_called_once_with("transactions", commit=False)
+
+
+def test_when_task_commits_no_new_rows_then_db_not_backed_up(daemon_db, db_path):
+    database = daemon_db._database
+    daemon_db.start_db("transactions")
+    daemon_db.insert("transactions", "transactions", make_row("1"))
+    daemon_db.stop_db("transactions", commit=False)
+    daemon_db.start_db("transactions")
+    daemon_db.insert("transactions", "transactions", make_row("2"))
+    daemon_db.stop_db("transactions", commit=True)
+    daemon_db.backup()
+    assert len(list_backups(db_path)) == 1
+
+    daemon_db.start_db("transactions")
+    result = daemon_db.insert_many(
+        "transactions", "transactions", [make_row("2")], on_conflict="ignore"
+    )
+    daemon_db.stop_db("transactions", commit=True)
+    daemon_db.start_db("transactions")
+    daemon_db.stop_db("transactions", commit=True)
+
+    assert result.inserted == 0
+    with patch.object(database, "backup") as backup:
+        daemon_db.backup()
+    backup.assert_not_called()
+    with patch.object(database, "stop_db") as stop_db:
+        daemon_db.close()
+    stop_db.assert_called_once_with("transactions", commit=False)
+
+
+def test_when_daemon_db_pooled_or_not_started_then_error(daemon_db):
+    with raises(DatabaseError):
+        daemon_db.start_db("transactions", pooled=True)
+    with raises(DatabaseError):
+        daemon_db.stop_db("transactions")
+
+
+def test_when_poll_then_settled_files_loaded_with_shared_services(landing_path, args):
+    create_task = MagicMock()
+    create_task.return_value.execute.return_value = True
+    daemon = Daemon(args, create_task)
+    (landing_path / "first.ofx").write_text("<OFX>")
+
+    daemon.poll()
+    daemon.poll()
+    (landing_path / "second.qfx").write_text("<OFX>")
+    daemon.poll()
+    daemon._watcher.close()
+
+    assert create_task.call_count == 2
+    (first_args, first_services), (second_args, second_services) = [
+        call.args for call in create_task.call_args_list
+    ]
+    assert first_args.input_files == [str(landing_path / "first.ofx")]
+    assert second_args.input_files == [str(landing_path / "second.qfx")]
+    assert first_args.institution == "bank"
+    assert first_services is second_services
+    assert first_services["db"] is daemon._database
+
+
+def test_when_load_fails_then_daemon_carries_on_and_reports_failure(landing_path, args):
+    create_task = MagicMock()
+    create_task.return_value.execute.side_effect = [Exception("bad file"), True]
+    daemon = Daemon(args, create_task)
+
+    (landing_path / "first.ofx").write_text("<OFX>")
+    daemon.poll()
+    (landing_path / "second.ofx").write_text("<OFX>")
+    daemon.poll()
+    daemon._watcher.close()
+
+    assert create_task.call_count == 2
+    assert daemon._passed is False
+
+
+def test_when_backup_interval_passed_then_databases_backed_up(landing_path, args):
+    daemon = Daemon(args, MagicMock())
+    daemon._database = MagicMock()
+
+    daemon.poll()
+    daemon._database.backup.assert_not_called()
+
+    daemon._last_backup -= 3600
+    daemon.poll()
+    daemon._watcher.close()
+    daemon._database.backup.assert_called_once_with()
+
+
+def test_when_stopped_then_run_closes_watcher_and_databases(landing_path, args):
+    with Configuration.override({"daemon.poll_interval": 0.01}):
+        daemon = Daemon(args, MagicMock())
+        daemon._database = MagicMock()
+        stopper = threading.Timer(0.1, daemon.stop)
+        stopper.start()
+
+        assert daemon.run() is True
+
+    daemon._database.close.assert_called_once_with()
+    assert daemon._watcher._inotify_fd is None
@@ -0,0 +1,289 @@
+import json
+import os
+from argparse import Namespace
+from decimal import Decimal
+
+from mock import MagicMock, patch
+from pytest import fixture, raises
+
+from core.config import Configuration
+from core.exceptions import DatabaseError, FileSystemError, PipelineError, TaskError
+from core.pipeline import (
+    Pipeline,
+    PipelineDatabase,
+    PipelineFileSystem,
+    check_pipeline_steps,
+    read_pipeline_file,
+)
+from services.database import Database
+from services.file_system import FileSystem
+
+
+@fixture
+def pipeline_db(tmp_path):
+    os.makedirs(str(tmp_path / "current"))
+    os.makedirs(str(tmp_path / "backup"))
+    with Configuration.override({"paths.db_path": str(tmp_path)}):
+        yield PipelineDatabase(Database())
+
+
+def make_row(tran_id):
+    return {
+        "institution": "bank",
+        "account": "account",
+        "tran_id": tran_id,
+        "tran_type": "CREDIT",
+        "amount": Decimal("1.00"),
+        "narrative": "narrative",
+        "date_posted": "20200101000000",
+    }
+
+
+def write_pipeline_file(tmp_path, pipeline):
+    path = str(tmp_path / "pipeline.json")
+    with open(path, "w") as pipeline_file:
+        json.dump(pipeline, pipeline_file)
+    return path
+
+
+def test_when_read_pipeline_file_then_steps_returned_with_schedule_defaults(tmp_path):
+    tasks = [
+        {"task_type": "load_transactions", "institution": "bank", "account": "cc"},
+        {
+            "task_type": "load_transactions",
+            "name": "debit",
+            "depends_on": ["load_transactions_1"],
+            "writes": ["transactions"],
+        },
+    ]
+
+    assert read_pipeline_file(write_pipeline_file(tmp_path, {"tasks": tasks})) == [
+        dict(tasks[0], name="load_transactions_1", depends_on=[], reads=[], writes=[]),
+        dict(tasks[1], reads=[]),
+    ]
+
+
+def test_when_check_pipeline_steps_and_depends_on_later_task_then_error():
+    steps = [
+        {"task_type": "load_transactions", "depends_on": ["second"]},
+        {"task_type": "load_transactions", "name": "second"},
+    ]
+
+    with raises(PipelineError) as raised_error:
+        check_pipeline_steps(steps, "--pipeline")
+    assert raised_error.value.args[0] == (
+        "Task 'load_transactions_1' of --pipeline depends on 'second', which is not a "
+        "task listed before it"
+    )
+
+
+def test_when_check_pipeline_steps_and_duplicate_name_then_error():
+    steps = [
+        {"task_type": "first", "name": "task"},
+        {"task_type": "second", "name": "task"},
+    ]
+
+    with raises(PipelineError) as raised_error:
+        check_pipeline_steps(steps, "--pipeline")
+    assert raised_error.value.args[0] == (
+        "Task name 'task' is used more than once in --pipeline"
+    )
+
+
+def test_when_read_pipeline_file_and_task_has_no_task_type_then_error(tmp_path):
+    path = write_pipeline_file(tmp_path, {"tasks": [{"institution": "bank"}]})
+
+    with raises(PipelineError) as raised_error:
+        read_pipeline_file(path)
+    assert raised_error.value.args[0] == (
+        "Task 0 of pipeline file '{}' has no task_type".format(path)
+    )
+
+
+def test_when_read_pipeline_file_and_no_tasks_then_error(tmp_path):
+    path = write_pipeline_file(tmp_path, {"tasks": []})
+
+    with raises(PipelineError) as raised_error:
+        read_pipeline_file(path)
+    assert raised_error.value.args[0] == (
+        "There are no tasks to run in pipeline file '{}'".format(path)
+    )
+
+
+def test_when_pipeline_db_tasks_stop_then_failed_task_undone_and_committed_once(
+    pipeline_db,
+):
+    database = pipeline_db._database
+    pipeline_db.start_db("transactions", profile="bulk_load")
+    pipeline_db.insert("transactions", "transactions", make_row("1"))
+    pipeline_db.stop_db("transactions", commit=True)
+    pipeline_db.start_db("transactions")
+    pipeline_db.insert("transactions", "transactions", make_row("2"))
+    pipeline_db.stop_db("transactions", commit=False)
+
+    with patch.object(database, "stop_db", wraps=database.stop_db) as stop_db:
+        pipeline_db.close()
+
+    stop_db.assert_called_once_with("transactions", True)
+    database.start_db("transactions", current=False)
+    assert database.select("transactions", "transactions", columns=["tran_id"]) == [
+        ("1",)
+    ]
+    database.stop_db("transactions", commit=False)
+
+
+def test_when_pipeline_db_closed_with_task_open_then_task_undone(pipeline_db):
+    database = pipeline_db._database
+    pipeline_db.start_db("transactions")
+    pipeline_db.insert("transactions", "transactions", make_row("1"))
+
+    pipeline_db.close()
+
+    database.start_db("transactions")
+    assert database.select("transactions", "transactions") == []
+    database.stop_db("transactions", commit=False)
+
+
+def test_when_pipeline_db_pooled_or_not_started_then_error(pipeline_db):
+    with raises(DatabaseError):
+        pipeline_db.start_db("transactions", pooled=True)
+    with raises(DatabaseError):
+        pipeline_db.stop_db("transactions")
+
+
+def test_when_pipeline_run_then_tasks_run_in_order_with_shared_services():
+    steps = [Namespace(task_type="first"), Namespace(task_type="second")]
+    tasks = []
+
+    def create_task(args, services):
+        task = MagicMock(args=args, services=services)
+        task.execute.return_value = True
+        tasks.append(task)
+        return task
+
+    with patch("core.pipeline.PipelineDatabase") as pipeline_db_mock:
+        passed = Pipeline(steps, create_task).run()
+
+    assert passed is True
+    assert [task.args for task in tasks] == steps
+    assert tasks[0].services is tasks[1].services
+    assert tasks[0].services["db"] is pipeline_db_mock.return_value
+    pipeline_db_mock.return_value.close.assert_called_once_with(commit=True)
+
+
+def test_when_pipeline_task_fails_then_later_tasks_not_run_and_db_closed():
+    steps = [Namespace(task_type="first"), Namespace(task_type="second")]
+    create_task = MagicMock()
+    create_task.return_value.execute.return_value = False
+
+    with patch("core.pipeline.PipelineDatabase") as pipeline_db_mock:
+        passed = Pipeline(steps, create_task).run()
+
+    assert passed is False
+    assert create_task.call_count == 1
+    pipeline_db_mock.return_value.close.assert_called_once_with(commit=True)
+
+
+def test_when_pipeline_task_raises_task_error_then_pipeline_fails_and_db_committed():
+    steps = [Namespace(task_type="first"), Namespace(task_type="second")]
+    create_task = MagicMock()
+    create_task.return_value.execute.side_effect = TaskError("bad file")
+
+    with patch("core.pipeline.PipelineDatabase") as pipeline_db_mock:
+        passed = Pipeline(steps, create_task).run()
+
+    assert passed is False
+    assert create_task.call_count == 1
+    pipeline_db_mock.return_value.close.assert_called_once_with(commit=True)
+
+
+def test_when_pipeline_ended_by_unexpected_error_then_db_not_committed():
+    steps = [Namespace(task_type="first")]
+    create_task = MagicMock(side_effect=KeyError("task_type"))
+
+    with patch("core.pipeline.PipelineDatabase") as pipeline_db_mock:
+        with raises(KeyError):
+            Pipeline(steps, create_task).run()
+
+    pipeline_db_mock.return_value.close.assert_called_once_with(commit=False)
+
+
+@fixture
+def input_dirs(tmp_path):
+    for folder in ["current", "backup", "landing", "processed"]:
+        os.makedirs(str(tmp_path / folder))
+    (tmp_path / "landing" / "first.ofx").write_text("first")
+    with Configuration.override({"paths.db_path": str(tmp_path)}):
+        yield tmp_path
+
+
+def create_loading_task(tmp_path, after_task_error=None):
+    def create_task(args, services):
+        def execute():
+            services["db"].start_db("transactions")
+            services["db"].insert("transactions", "transactions", make_row(args.name))
+            services["db"].stop_db("transactions", commit=True)
+            if after_task_error is not None and args.name == "second":
+                raise after_task_error
+            services["fs"].move_file(
+                str(tmp_path / "landing" / "first.ofx"),
+                str(tmp_path / "processed" / "first.ofx"),
+            )
+            return True
+
+        return MagicMock(execute=MagicMock(side_effect=execute))
+
+    return create_task
+
+
+def select_tran_ids():
+    database = Database()
+    database.start_db("transactions")
+    tran_ids = database.select("transactions", "transactions", columns=["tran_id"])
+    database.stop_db("transactions", commit=False)
+    return tran_ids
+
+
+def test_when_pipeline_run_then_files_moved_after_commit(input_dirs):
+    steps = [Namespace(task_type="load", name="first")]
+
+    assert Pipeline(steps, create_loading_task(input_dirs)).run() is True
+
+    assert select_tran_ids() == [("first",)]
+    assert os.listdir(str(input_dirs / "landing")) == []
+    assert os.listdir(str(input_dirs / "processed")) == ["first.ofx"]
+
+
+def test_when_pipeline_later_after_task_raises_then_files_not_moved_and_db_rolled_back(
+    input_dirs,
+):
+    steps = [
+        Namespace(task_type="load", name="first"),
+        Namespace(task_type="load", name="second"),
+    ]
+    create_task = create_loading_task(input_dirs, FileSystemError("move failed"))
+
+    with raises(FileSystemError):
+        Pipeline(steps, create_task).run()
+
+    assert select_tran_ids() == []
+    assert os.listdir(str(input_dirs / "landing")) == ["first.ofx"]
+    assert os.listdir(str(input_dirs / "processed")) == []
+
+
+def test_when_pipeline_fs_move_file_then_moved_only_when_applied(tmp_path):
+    source_path = str(tmp_path / "first.ofx")
+    dest_path = str(tmp_path / "moved.ofx")
+    (tmp_path / "first.ofx").write_text("first")
+    file_system = PipelineFileSystem(FileSystem())
+
+    file_system.move_file(source_path, dest_path)
+    assert os.path.exists(source_path)
+    with raises(FileSystemError):
+        file_system.move_file(source_path, dest_path)
+    with raises(FileSystemError):
+        file_system.move_file(str(tmp_path / "missing.ofx"), dest_path)
+    file_system.apply_moves()
+
+    assert not os.path.exists(source_path)
+    assert os.path.exists(dest_path)
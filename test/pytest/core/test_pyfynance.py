@@ -11,6 +11,7 @@ from core.pyfynance import PyFynance
 def args_load_transactions():
     args = MagicMock()
     args.task_type = "load_transactions"
+    args.daemon = False
     args.runtime = datetime.datetime(2015, 2, 14, 10, 11, 12)
     return args
 
@@ -51,3 +52,46 @@ def test_when_run_and_error_then_error_raised(execute_mock, args_load_transactio
     app = PyFynance(args_load_transactions)
     with raises(TaskError) as e:
         app.run()
+
+
+@patch("core.pipeline.Pipeline.run", return_value=True)
+def test_when_run_pipeline_then_pipeline_run_with_task_factory(
+    run_mock, args_load_transactions
+):
+    args_load_transactions.task_type = "pipeline"
+    args_load_transactions.task_workers = 1
+    app = PyFynance(args_load_transactions)
+
+    with patch("core.pipeline.Pipeline.__init__", return_value=None) as init_mock:
+        assert app.run() == 0
+
+    init_mock.assert_called_once_with(args_load_transactions.steps, app._create_task)
+    run_mock.assert_called_once_with()
+
+
+@patch("core.scheduler.TaskScheduler.run", return_value=False)
+def test_when_run_pipeline_with_task_workers_then_tasks_scheduled(
+    run_mock, args_load_transactions
+):
+    args_load_transactions.task_type = "pipeline"
+    args_load_transactions.task_workers = 2
+    app = PyFynance(args_load_transactions)
+
+    with patch("core.scheduler.TaskScheduler.__init__", return_value=None) as init_mock:
+        assert app.run() == 1
+
+    init_mock.assert_called_once_with(args_load_transactions.steps, app._create_task, 2)
+
+
+@patch("core.daemon.Daemon.run", return_value=True)
+def test_when_run_daemon_then_daemon_run_with_task_factory(
+    run_mock, args_load_transactions
+):
+    args_load_transactions.daemon = True
+    app = PyFynance(args_load_transactions)
+
+    with patch("core.daemon.Daemon.__init__", return_value=None) as init_mock:
+        assert app.run() == 0
+
+    init_mock.assert_called_once_with(args_load_transactions, app._create_task)
+    run_mock.assert_called_once_with()
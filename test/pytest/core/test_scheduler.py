@@ -0,0 +1,142 @@
+import threading
+from argparse import Namespace
+
+from mock import MagicMock
+
+from core.scheduler import DatabaseLocks, TaskScheduler
+
+
+def make_step(name, depends_on=None, reads=None, writes=None):
+    return Namespace(
+        task_type="fake",
+        name=name,
+        depends_on=depends_on or [],
+        reads=reads or [],
+        writes=writes or [],
+    )
+
+
+class FakeTask:
+    READS = []
+    WRITES = []
+
+    def __init__(self, args, events, result=True, barrier=None):
+        self._args = args
+        self._events = events
+        self._result = result
+        self._barrier = barrier
+
+    def execute(self):
+        self._events.append(("start", self._args.name))
+        if self._barrier is not None:
+            self._barrier.wait()
+        self._events.append(("end", self._args.name))
+        if isinstance(self._result, Exception):
+            raise self._result
+        return self._result
+
+
+def make_create_task(events, results=None, barrier=None):
+    def create_task(args, services):
+        return FakeTask(args, events, (results or {}).get(args.name, True), barrier)
+
+    return create_task
+
+
+def test_when_acquire_then_readers_shared_and_writers_exclusive():
+    locks = DatabaseLocks()
+
+    assert locks.acquire({"transactions"}, set()) is True
+    assert locks.acquire({"transactions"}, set()) is True
+    assert locks.acquire(set(), {"transactions"}) is False
+
+    locks.release({"transactions"}, set())
+    locks.release({"transactions"}, set())
+    assert locks.acquire(set(), {"transactions"}) is True
+    assert locks.acquire({"transactions"}, set()) is False
+    assert locks.acquire({"reports"}, set()) is True
+
+
+def test_when_run_and_tasks_independent_then_run_concurrently():
+    events = []
+    barrier = threading.Barrier(2, timeout=5)
+    steps = [make_step("first", reads=["transactions"]), make_step("second")]
+    scheduler = TaskScheduler(steps, make_create_task(events, barrier=barrier), 2)
+
+    assert scheduler.run() is True
+    assert scheduler.statuses == {"first": "passed", "second": "passed"}
+    assert [event for event, _ in events[:2]] == ["start", "start"]
+
+
+def test_when_run_and_tasks_write_same_database_then_run_one_at_a_time():
+    events = []
+    steps = [
+        make_step("first", writes=["transactions"]),
+        make_step("second", reads=["transactions"]),
+    ]
+
+    assert TaskScheduler(steps, make_create_task(events), 2).run() is True
+    assert events == [
+        ("start", "first"),
+        ("end", "first"),
+        ("start", "second"),
+        ("end", "second"),
+    ]
+
+
+def test_when_run_then_task_class_locks_honoured():
+    events = []
+    create_task = make_create_task(events)
+
+    def create_writing_task(args, services):
+        task = create_task(args, services)
+        task.WRITES = ["transactions"]
+        return task
+
+    steps = [make_step("first"), make_step("second")]
+
+    assert TaskScheduler(steps, create_writing_task, 2).run() is True
+    assert events[1] == ("end", "first")
+
+
+def test_when_run_then_tasks_start_after_their_dependencies():
+    events = []
+    steps = [make_step("load"), make_step("report", depends_on=["load"])]
+
+    assert TaskScheduler(steps, make_create_task(events), 2).run() is True
+    assert events.index(("start", "report")) > events.index(("end", "load"))
+
+
+def test_when_task_fails_then_dependents_skipped_and_independent_tasks_run():
+    events = []
+    steps = [
+        make_step("load_cc"),
+        make_step("load_debit"),
+        make_step("report_cc", depends_on=["load_cc"]),
+        make_step("summary", depends_on=["report_cc", "load_debit"]),
+    ]
+    results = {"load_cc": Exception("bad file")}
+    scheduler = TaskScheduler(steps, make_create_task(events, results), 2)
+
+    assert scheduler.run() is False
+    assert scheduler.statuses == {
+        "load_cc": "failed",
+        "load_debit": "passed",
+        "report_cc": "skipped",
+        "summary": "skipped",
+    }
+    assert ("start", "report_cc") not in events
+
+
+def test_when_run_then_each_task_created_once_with_own_services():
+    create_task = MagicMock()
+    create_task.return_value.READS = []
+    create_task.return_value.WRITES = ["transactions"]
+    create_task.return_value.execute.return_value = False
+    steps = [make_step("first"), make_step("second")]
+
+    assert TaskScheduler(steps, create_task, 2).run() is False
+    assert [call.args for call in create_task.call_args_list] == [
+        (steps[0], None),
+        (steps[1], None),
+    ]
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import threading
+from unittest import mock
+
+from pytest import fixture, raises
+
+from core.config import Configuration
+from core.exceptions import DatabaseError
+from services.async_database import AsyncDatabase
+from services.database import InsertResult
+
+COLUMNS = ["tran_id", "institution", "account"]
+
+
+@fixture
+def async_db(tmp_path):
+    os.makedirs(str(tmp_path / "current"))
+    os.makedirs(str(tmp_path / "backup"))
+    with Configuration.override({"paths.db_path": str(tmp_path)}):
+        yield AsyncDatabase()
+
+
+def make_rows(count):
+    return [
+        (str(index), "bank", "account{}".format(index % 2)) for index in range(count)
+    ]
+
+
+def run(coroutine_function, *args):
+    return asyncio.run(coroutine_function(*args))
+
+
+def test_when_insert_many_and_select_then_rows_returned(async_db):
+    async def insert_and_select():
+        async with async_db:
+            await async_db.start_db("transactions")
+            inserted = await async_db.insert_many(
+                "transactions", "transactions", make_rows(10), columns=COLUMNS
+            )
+            rows = await async_db.select(
+                "transactions",
+                "transactions",
+                columns=["tran_id"],
+                where="account = ?",
+                parameters=("account1",),
+                order_by=["tran_id"],
+            )
+            return inserted, rows
+
+    inserted, rows = run(insert_and_select)
+
+    assert inserted == InsertResult(10, 0)
+    assert rows == [("1",), ("3",), ("5",), ("7",), ("9",)]
+
+
+def test_when_called_then_database_used_from_executor_thread(async_db):
+    thread_names = []
+
+    def record_thread(*args):
+        thread_names.append(threading.current_thread().name)
+
+    async def start_and_select():
+        async with async_db:
+            await async_db.start_db("transactions")
+            with mock.patch.object(
+                async_db._database, "select", side_effect=record_thread
+            ):
+                await async_db.select("transactions", "transactions")
+                await async_db.select("transactions", "transactions")
+
+    run(start_and_select)
+
+    assert len(thread_names) == 2
+    assert thread_names[0] == thread_names[1]
+    assert thread_names[0].startswith("PyFynance-db-async")
+
+
+def test_when_iter_select_then_rows_yielded_in_chunks(async_db):
+    async def insert_and_iter_select():
+        async with async_db:
+            await async_db.start_db("transactions")
+            await async_db.insert_many(
+                "transactions", "transactions", make_rows(25), columns=COLUMNS
+            )
+            return [
+                row.tran_id
+                async for row in async_db.iter_select(
+                    "transactions",
+                    "transactions",
+                    columns=["tran_id"],
+                    order_by=["tran_id"],
+                    chunk_size=10,
+                    row_type="namedtuple",
+                )
+            ]
+
+    with mock.patch.object(
+        AsyncDatabase, "_fetch_chunk", side_effect=AsyncDatabase._fetch_chunk
+    ) as fetch_chunk:
+        tran_ids = run(insert_and_iter_select)
+
+    assert tran_ids == sorted(str(index) for index in range(25))
+    assert fetch_chunk.call_count == 4
+
+
+def test_when_iter_select_cancelled_then_no_further_chunks_fetched(async_db):
+    async def cancel_iter_select():
+        first_row = asyncio.Event()
+
+        async def consume():
+            async for _ in async_db.iter_select(
+                "transactions", "transactions", chunk_size=5
+            ):
+                first_row.set()
+                await asyncio.sleep(3600)
+
+        async with async_db:
+            await async_db.start_db("transactions")
+            await async_db.insert_many(
+                "transactions", "transactions", make_rows(25), columns=COLUMNS
+            )
+            task = asyncio.create_task(consume())
+            await first_row.wait()
+            task.cancel()
+            with raises(asyncio.CancelledError):
+                await task
+            return await async_db.select("transactions", "transactions")
+
+    with mock.patch.object(
+        AsyncDatabase, "_fetch_chunk", side_effect=AsyncDatabase._fetch_chunk
+    ) as fetch_chunk:
+        rows = run(cancel_iter_select)
+
+    assert fetch_chunk.call_count == 1
+    assert len(rows) == 25
+
+
+def test_when_insert_many_cancelled_between_batches_then_rows_rolled_back(async_db):
+    first_batch_inserted = threading.Event()
+    release = threading.Event()
+
+    def slow_rows():
+        for index, row in enumerate(make_rows(30)):
+            if index == 10:
+                first_batch_inserted.set()
+                release.wait()
+            yield row
+
+    async def cancel_insert_many():
+        async with async_db:
+            await async_db.start_db("transactions")
+            task = asyncio.create_task(
+                async_db.insert_many(
+                    "transactions",
+                    "transactions",
+                    slow_rows(),
+                    columns=COLUMNS,
+                    batch_size=10,
+                )
+            )
+            await asyncio.get_running_loop().run_in_executor(
+                None, first_batch_inserted.wait
+            )
+            task.cancel()
+            await asyncio.sleep(0)
+            release.set()
+            with raises(asyncio.CancelledError):
+                await task
+            return await async_db.select("transactions", "transactions")
+
+    assert run(cancel_insert_many) == []
+
+
+def test_when_database_error_then_raised_to_caller(async_db):
+    async def select_unknown_table():
+        async with async_db:
+            await async_db.start_db("transactions")
+            await async_db.select("transactions", "not_a_table")
+
+    with raises(DatabaseError):
+        run(select_unknown_table)
+
+
+def test_when_closed_then_databases_stopped_and_calls_raise(async_db):
+    async def close_and_select():
+        await async_db.start_db("transactions")
+        await async_db.close()
+        await async_db.select("transactions", "transactions")
+
+    with mock.patch.object(
+        async_db._database, "stop_db", wraps=async_db._database.stop_db
+    ) as stop_db:
+        with raises(DatabaseError, match="The async database has been closed"):
+            run(close_and_select)
+
+    stop_db.assert_called_once_with("transactions", True)
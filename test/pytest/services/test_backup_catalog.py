@@ -0,0 +1,100 @@
+from pytest import fixture, mark
+
+from services.backup_catalog import BackupCatalog, find_expired_backups
+
+
+@fixture
+def catalog_path(tmp_path):
+    return str(tmp_path / "catalog.json")
+
+
+@fixture
+def catalog(catalog_path):
+    catalog = BackupCatalog(catalog_path)
+    catalog.add("transactions", "transactions_20191026101112.db", "20191026101112")
+    catalog.add("transactions", "transactions_20191027101112.db", "20191027101112")
+    return catalog
+
+
+def make_backups(*timestamps):
+    return [
+        {"name": "transactions_{}.db".format(timestamp), "created": timestamp}
+        for timestamp in timestamps
+    ]
+
+
+def test_when_no_catalog_file_then_no_latest_backup(catalog_path):
+    catalog = BackupCatalog(catalog_path)
+
+    assert catalog.get_latest("transactions") is None
+    assert catalog.get_backups("transactions") == []
+
+
+def test_when_add_then_backup_is_latest(catalog):
+    assert catalog.get_latest("transactions") == "transactions_20191027101112.db"
+    assert catalog.get_backups("transactions") == make_backups(
+        "20191027101112", "20191026101112"
+    )
+
+
+def test_when_add_existing_name_then_entry_replaced(catalog):
+    catalog.add("transactions", "transactions_20191026101112.db", "20191026101112")
+
+    assert catalog.get_latest("transactions") == "transactions_20191026101112.db"
+    assert catalog.get_backups("transactions") == make_backups(
+        "20191026101112", "20191027101112"
+    )
+
+
+def test_when_save_then_catalog_reloaded(catalog, catalog_path):
+    catalog.save()
+
+    reloaded = BackupCatalog(catalog_path)
+    assert reloaded.get_latest("transactions") == "transactions_20191027101112.db"
+    assert reloaded.get_backups("transactions") == catalog.get_backups("transactions")
+
+
+def test_when_remove_latest_then_next_newest_is_latest(catalog):
+    catalog.remove("transactions", ["transactions_20191027101112.db"])
+    assert catalog.get_latest("transactions") == "transactions_20191026101112.db"
+
+    catalog.remove("transactions", ["transactions_20191026101112.db"])
+    assert catalog.get_latest("transactions") is None
+
+
+@mark.parametrize(
+    "keep_recent, keep_daily, keep_monthly, expired",
+    [
+        (
+            0,
+            0,
+            0,
+            [
+                "20191201110000",
+                "20191201090000",
+                "20191130090000",
+                "20191020090000",
+                "20190901090000",
+            ],
+        ),
+        (2, 0, 0, ["20191130090000", "20191020090000", "20190901090000"]),
+        (0, 2, 0, ["20191201090000", "20191020090000", "20190901090000"]),
+        (0, 0, 2, ["20191201090000", "20191020090000", "20190901090000"]),
+        (1, 0, 3, ["20191201090000", "20190901090000"]),
+        (5, 5, 5, []),
+    ],
+)
+def test_when_find_expired_backups_then_backups_outside_policy_returned(
+    keep_recent, keep_daily, keep_monthly, expired
+):
+    backups = make_backups(
+        "20191201110000",
+        "20191201090000",
+        "20191130090000",
+        "20191020090000",
+        "20190901090000",
+    )
+
+    assert find_expired_backups(backups, keep_recent, keep_daily, keep_monthly) == [
+        "transactions_{}.db".format(timestamp) for timestamp in expired
+    ]
@@ -0,0 +1,109 @@
+import sqlite3
+import threading
+
+from pytest import fixture, raises
+
+from core.exceptions import DatabaseError
+from services.connection_pool import ConnectionPool
+
+
+@fixture
+def db_path(tmp_path):
+    db_path = str(tmp_path / "pool.db")
+    connection = sqlite3.connect(db_path)
+    connection.execute("PRAGMA journal_mode = wal;")
+    connection.execute("CREATE TABLE numbers (number integer);")
+    connection.close()
+    return db_path
+
+
+@fixture
+def pool(db_path):
+    writer = sqlite3.connect(db_path, check_same_thread=False)
+    pool = ConnectionPool(
+        writer, lambda: sqlite3.connect(db_path, check_same_thread=False), 4
+    )
+    yield pool
+    if pool.is_running():
+        pool.close()
+    writer.close()
+
+
+def insert_number(pool, number):
+    assert pool.is_writer_thread()
+    pool._writer_connection.execute("INSERT INTO numbers VALUES (?);", (number,))
+    return number
+
+
+def run_in_thread(function):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(function()))
+    thread.start()
+    thread.join()
+    return results[0]
+
+
+def test_when_get_reader_cursor_then_one_connection_per_thread(pool):
+    cursor = pool.get_reader_cursor()
+
+    assert pool.get_reader_cursor() is cursor
+    assert run_in_thread(pool.get_reader_cursor).connection is not cursor.connection
+    assert len(pool._readers) == 2
+    assert not pool.is_writer_thread()
+
+
+def test_when_write_then_run_on_writer_thread_and_committed(pool):
+    assert pool.write(insert_number, pool, 7) == 7
+
+    cursor = pool.get_reader_cursor()
+    assert cursor.execute("SELECT number FROM numbers;").fetchall() == [(7,)]
+
+
+def test_when_write_raises_then_error_raised_and_write_rolled_back(pool):
+    def insert_then_fail():
+        insert_number(pool, 1)
+        raise ValueError("write failed")
+
+    with raises(ValueError) as raised_error:
+        pool.write(insert_then_fail)
+
+    assert raised_error.value.args[0] == "write failed"
+    assert not pool._writer_connection.in_transaction
+    assert pool.get_reader_cursor().execute("SELECT * FROM numbers;").fetchall() == []
+
+
+def test_when_writes_from_many_threads_then_all_written(pool):
+    threads = [
+        threading.Thread(target=pool.write, args=(insert_number, pool, number))
+        for number in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert pool.get_reader_cursor().execute(
+        "SELECT count(*), sum(number) FROM numbers;"
+    ).fetchone() == (20, 190)
+
+
+def test_when_close_then_writer_stopped_and_readers_closed(pool):
+    cursor = pool.get_reader_cursor()
+    pool.write(insert_number, pool, 1)
+
+    pool.close()
+
+    assert not pool.is_running()
+    assert pool._readers == []
+    with raises(sqlite3.ProgrammingError):
+        cursor.execute("SELECT * FROM numbers;")
+
+
+def test_when_write_after_close_then_error(pool):
+    pool.close()
+
+    with raises(DatabaseError) as raised_error:
+        pool.write(insert_number, pool, 1)
+    assert raised_error.value.args[0] == (
+        "Cannot write to the connection pool after it has been closed"
+    )
@@ -1,4 +1,6 @@
 import os
+import sqlite3
+import threading
 import unittest
 from datetime import datetime
 from decimal import Decimal
@@ -6,15 +8,18 @@ from decimal import Decimal
 from mock import patch, call, MagicMock, mock_open
 from pytest import fixture, raises
 
+from core.config import Configuration
 from core.exceptions import DatabaseError
-from services.database import Database
+from services.database import Database, InsertResult, SQLCacheInfo
+from services.predicates import And, Between, Eq, In, Or
 
 
 @fixture
 def db():
-    db = Database()
-    db._config.paths.db_path = os.sep.join(["C:", "base", "db", "path"])
-    return db
+    with Configuration.override(
+        {"paths.db_path": os.sep.join(["C:", "base", "db", "path"])}
+    ):
+        yield Database()
 
 
 @fixture()
@@ -53,12 +58,32 @@ def test_when_init_then_database_service_returned():
 
     assert db._sql == {
         "create": "CREATE TABLE IF NOT EXISTS {table} ({col_spec}, PRIMARY KEY ({keys}));",
-        "insert": "INSERT INTO {table}({columns}) VALUES({data});",
+        "create_index": "CREATE INDEX IF NOT EXISTS {name} ON {table}({columns});",
+        "table_info": "PRAGMA table_info({table});",
+        "add_column": "ALTER TABLE {table} ADD COLUMN {column};",
+        "analyze": "ANALYZE;",
+        "insert": "INSERT INTO {table}({columns}) VALUES({placeholders});",
+        "insert_many": {
+            "none": "INSERT INTO {table}({columns}) VALUES({placeholders});",
+            "ignore": "INSERT OR IGNORE INTO {table}({columns}) VALUES({placeholders});",
+            "replace": "INSERT OR REPLACE INTO {table}({columns}) VALUES({placeholders});",
+            "upsert": "INSERT INTO {table}({columns}) VALUES({placeholders}) "
+            "ON CONFLICT({keys}) DO UPDATE SET {updates};",
+        },
+        "begin": "BEGIN;",
+        "pragma": "PRAGMA {name} = {value};",
+        "savepoint": {
+            "create": "SAVEPOINT {name};",
+            "rollback": "ROLLBACK TO {name};",
+            "release": "RELEASE {name};",
+        },
         "select": {
-            "select_all_from": "SELECT * FROM {table};",
-            "select_columns_from": "SELECT {columns} FROM {table};",
-            "select_all_from_where": "SELECT * FROM {table} WHERE {where};",
-            "select_columns_from_where": "SELECT {columns} FROM {table} WHERE {where};",
+            "select_all_from": "SELECT * FROM {table}{clauses};",
+            "select_columns_from": "SELECT {columns} FROM {table}{clauses};",
+            "select_all_from_where": "SELECT * FROM {table} WHERE {where}{clauses};",
+            "select_columns_from_where": "SELECT {columns} FROM {table} WHERE {where}{clauses};",
+            "order_by": " ORDER BY {order}",
+            "limit": " LIMIT ?",
         },
     }
 
@@ -76,7 +101,8 @@ def test_when_start_db_and_current_and_good_db_name_then_db_started(
                 call(
                     os.sep.join(
                         ["C:", "base", "db", "path", "current", "transactions.db"]
-                    )
+                    ),
+                    cached_statements=256,
                 )
             ]
         )
@@ -85,7 +111,8 @@ def test_when_start_db_and_current_and_good_db_name_then_db_started(
             [
                 call().execute(
                     "CREATE TABLE IF NOT EXISTS transactions (institution text, account text, tran_id text, "
-                    "tran_type text, amount decimal, narrative text, date_posted text, date_processed text, PRIMARY KEY "
+                    "tran_type text, amount integer, narrative text, date_posted text, date_processed text, "
+                    "amount_exponent integer, PRIMARY KEY "
                     "(institution, account, tran_id));"
                 )
             ]
@@ -118,7 +145,8 @@ def test_when_start_db_and_backup_and_good_db_name_then_db_started(
                             "backup",
                             "transactions.db29991231235959",
                         ]
-                    )
+                    ),
+                    cached_statements=256,
                 )
             ]
         )
@@ -142,32 +170,255 @@ def test_when_start_db_and_bad_db_name_then_error(db):
     )
 
 
-@patch("datetime.datetime")
-@patch("shutil.copyfile", return_value=MagicMock())
+@fixture
+def file_db(db, tmp_path):
+    os.makedirs(str(tmp_path / "current"))
+    with Configuration.override({"paths.db_path": str(tmp_path)}):
+        yield db
+    for connection in db._connections.values():
+        connection.close()
+
+
+def select_pragmas(db):
+    return [
+        db._execute("transactions", "PRAGMA {};".format(name)).fetchone()[0]
+        for name in ("journal_mode", "synchronous", "cache_size", "temp_store")
+    ]
+
+
+def test_when_start_db_and_no_profile_then_default_profile_applied(file_db):
+    file_db.start_db("transactions")
+
+    assert select_pragmas(file_db) == ["wal", 2, -8192, 0]
+
+
+def test_when_start_db_and_profile_then_profile_applied(file_db):
+    file_db.start_db("transactions", profile="bulk_load")
+
+    assert select_pragmas(file_db) == ["wal", 1, -131072, 2]
+
+
+def test_when_start_db_and_backup_then_journal_mode_not_set(db, connection_mock):
+    with patch("sqlite3.connect", return_value=connection_mock), patch(
+        "glob.glob", return_value=["transactions.db29991231235959"]
+    ):
+        db.start_db("transactions", current=False, profile="analytics")
+
+    executed = [args[0] for _, args, _ in connection_mock.cursor().execute.mock_calls]
+    assert "PRAGMA synchronous = normal;" in executed
+    assert "PRAGMA mmap_size = 1073741824;" in executed
+    assert not [sql for sql in executed if "journal_mode" in sql]
+
+
+def test_when_start_db_and_bad_profile_then_error(db):
+    with raises(DatabaseError) as raised_error:
+        db.start_db("transactions", profile="ludicrous_speed")
+    assert (
+        raised_error.value.args[0]
+        == "Exception occurred while starting database 'transactions'.  Profile "
+        "'ludicrous_speed' is unknown. Acceptable profiles are '['analytics', "
+        "'bulk_load', 'safe']'"
+    )
+
+
+@fixture
+def backup_db(file_db, insert_data):
+    os.makedirs(os.sep.join([file_db._config.paths.db_path, "backup"]))
+    file_db.start_db("transactions")
+    file_db.insert_many("transactions", "transactions", [insert_data])
+    return file_db
+
+
+def list_backup_folder(db):
+    return sorted(os.listdir(os.sep.join([db._config.paths.db_path, "backup"])))
+
+
+def stop_db_at(db, timestamp):
+    with patch("datetime.datetime") as datetime_mock:
+        datetime_mock.now = MagicMock(return_value=timestamp)
+        db.stop_db("transactions", commit=True)
+
+
+@patch("shutil.copyfile")
 def test_when_stop_db_and_commit_and_good_db_name_then_db_stopped(
-    copyfile_mock, datetime_mock, db, connection_mock
+    copyfile_mock, backup_db
 ):
-    datetime_mock.now = MagicMock(return_value=datetime(2999, 12, 31, 23, 59, 59))
-    db._connections["transactions"] = connection_mock
-    db.stop_db("transactions", commit=True)
-    connection_mock.assert_has_calls([call.commit(), call.close()])
-    copyfile_mock.assert_has_calls(
-        [
-            call(
-                os.sep.join(["C:", "base", "db", "path", "current", "transactions.db"]),
-                os.sep.join(
-                    [
-                        "C:",
-                        "base",
-                        "db",
-                        "path",
-                        "backup",
-                        "transactions_29991231235959.db",
-                    ]
-                ),
-            )
-        ]
+    stop_db_at(backup_db, datetime(2999, 12, 31, 23, 59, 59))
+
+    assert list_backup_folder(backup_db) == [
+        "catalog.json",
+        "transactions_29991231235959.db",
+    ]
+    assert backup_db._get_backup_db_name("transactions") == (
+        "transactions_29991231235959.db"
     )
+    backup_db.start_db("transactions", current=False)
+    assert backup_db.select("transactions", "transactions", columns=["tran_id"]) == [
+        ("42069",)
+    ]
+    assert backup_db._execute("transactions", "PRAGMA journal_mode;").fetchone() == (
+        "delete",
+    )
+    copyfile_mock.assert_not_called()
+
+
+def test_when_stop_db_and_no_changes_then_backup_skipped(backup_db, insert_data):
+    stop_db_at(backup_db, datetime(2999, 12, 30, 10, 0, 0))
+    backup_db.start_db("transactions")
+    backup_db.insert_many(
+        "transactions", "transactions", [insert_data], on_conflict="ignore"
+    )
+    stop_db_at(backup_db, datetime(2999, 12, 31, 10, 0, 0))
+
+    assert list_backup_folder(backup_db) == [
+        "catalog.json",
+        "transactions_29991230100000.db",
+    ]
+
+
+def test_when_backed_up_twice_in_one_second_then_both_backups_kept(
+    backup_db, insert_data
+):
+    backup_db.commit("transactions")
+    with patch("datetime.datetime") as datetime_mock:
+        datetime_mock.now = MagicMock(return_value=datetime(2999, 12, 31, 10, 0, 0))
+        backup_db.backup("transactions")
+        backup_db.insert(
+            "transactions", "transactions", dict(insert_data, tran_id="42070")
+        )
+        backup_db.commit("transactions")
+        backup_db.backup("transactions")
+
+    assert list_backup_folder(backup_db) == [
+        "catalog.json",
+        "transactions_29991231100000.db",
+        "transactions_29991231100000_1.db",
+    ]
+    assert [
+        backup["name"]
+        for backup in backup_db._get_backup_catalog().get_backups("transactions")
+    ] == ["transactions_29991231100000_1.db", "transactions_29991231100000.db"]
+
+
+def test_when_stop_db_and_backup_fails_then_connection_closed(backup_db):
+    connection = backup_db._connections["transactions"]
+    with patch.object(backup_db, "_backup_db", side_effect=OSError("disk full")):
+        with raises(DatabaseError, match="disk full"):
+            backup_db.stop_db("transactions", commit=True)
+
+    with raises(sqlite3.ProgrammingError):
+        connection.execute("SELECT 1")
+
+
+def test_when_commit_and_backup_then_db_left_started_and_committed_rows_backed_up(
+    backup_db, insert_data
+):
+    backup_db.commit("transactions")
+    with patch("datetime.datetime") as datetime_mock:
+        datetime_mock.now = MagicMock(return_value=datetime(2999, 12, 31, 10, 0, 0))
+        backup_db.backup("transactions")
+    backup_db.insert("transactions", "transactions", dict(insert_data, tran_id="42070"))
+    with raises(DatabaseError, match="The database has uncommitted changes"):
+        backup_db.backup("transactions")
+    backup_db.rollback("transactions")
+
+    assert backup_db.select("transactions", "transactions", columns=["tran_id"]) == [
+        ("42069",)
+    ]
+    backup_db._connections["transactions"].close()
+    backup_db.start_db("transactions", current=False)
+    assert backup_db.select("transactions", "transactions", columns=["tran_id"]) == [
+        ("42069",)
+    ]
+
+
+def test_when_commit_and_pooled_then_error(pooled_db):
+    with raises(DatabaseError) as raised_error:
+        pooled_db.commit("transactions")
+    assert raised_error.value.args[0] == (
+        "Exception occurred while committing database 'transactions'.  "
+        "Commits are not supported on pooled databases"
+    )
+
+
+def test_when_start_db_and_table_missing_columns_then_columns_added(
+    file_db, insert_data
+):
+    connection = sqlite3.connect(file_db._get_db_path("transactions"))
+    connection.execute(
+        "CREATE TABLE transactions (institution text, account text, tran_id text, "
+        "tran_type text, amount decimal, narrative text, date_posted text, "
+        "date_processed text, PRIMARY KEY (institution, account, tran_id))"
+    )
+    connection.execute(
+        "INSERT INTO transactions (institution, account, tran_id, amount) "
+        "VALUES ('bank', 'cc', 'old', '-19.66')"
+    )
+    connection.commit()
+    connection.close()
+
+    file_db.start_db("transactions")
+    file_db.insert(
+        "transactions",
+        "transactions",
+        dict(insert_data, amount=-1966, amount_exponent=2),
+    )
+
+    assert file_db.select(
+        "transactions",
+        "transactions",
+        columns=["tran_id", "amount", "amount_exponent"],
+        order_by=["tran_id"],
+    ) == [("42069", -1966, 2), ("old", -19.66, None)]
+
+
+def test_when_insert_then_total_changes_counts_changed_rows(backup_db, insert_data):
+    total_changes = backup_db.total_changes("transactions")
+    backup_db.insert_many(
+        "transactions", "transactions", [insert_data], on_conflict="ignore"
+    )
+    assert backup_db.total_changes("transactions") == total_changes
+
+    backup_db.insert("transactions", "transactions", dict(insert_data, tran_id="42070"))
+    assert backup_db.total_changes("transactions") == total_changes + 1
+
+
+def test_when_stop_db_and_backups_outside_retention_then_backups_removed(backup_db):
+    with Configuration.override(
+        {
+            "database.backup.keep_recent": 2,
+            "database.backup.keep_daily": 3,
+            "database.backup.keep_monthly": 2,
+        }
+    ):
+        timestamps = [
+            datetime(2999, 10, 1, 9, 0, 0),
+            datetime(2999, 10, 20, 9, 0, 0),
+            datetime(2999, 11, 29, 9, 0, 0),
+            datetime(2999, 11, 30, 9, 0, 0),
+            datetime(2999, 12, 1, 9, 0, 0),
+            datetime(2999, 12, 1, 10, 0, 0),
+            datetime(2999, 12, 1, 11, 0, 0),
+        ]
+
+        for index, timestamp in enumerate(timestamps):
+            if index:
+                backup_db.start_db("transactions")
+                backup_db.insert_many(
+                    "transactions", "transactions", [{"tran_id": str(index)}]
+                )
+            stop_db_at(backup_db, timestamp)
+
+        assert list_backup_folder(backup_db) == [
+            "catalog.json",
+            "transactions_29991129090000.db",
+            "transactions_29991130090000.db",
+            "transactions_29991201100000.db",
+            "transactions_29991201110000.db",
+        ]
+        assert backup_db._get_backup_db_name("transactions") == (
+            "transactions_29991201110000.db"
+        )
 
 
 @patch("shutil.copyfile", return_value=MagicMock())
@@ -201,8 +452,16 @@ def test_when_insert_and_db_good_and_table_good_then_sql_called(
         [
             call.execute(
                 "INSERT INTO transactions(institution, account, tran_id, tran_type, amount, narrative, "
-                'date_posted) VALUES("matts_fully_sick_bank", "multi-billion_dollar_savings", "42069", '
-                '"CREDIT", -135000.00, "sweet ass tesla", "20600707103000");'
+                "date_posted) VALUES(?, ?, ?, ?, ?, ?, ?);",
+                (
+                    "matts_fully_sick_bank",
+                    "multi-billion_dollar_savings",
+                    "42069",
+                    "CREDIT",
+                    Decimal("-135000.00"),
+                    "sweet ass tesla",
+                    "20600707103000",
+                ),
             )
         ]
     )
@@ -303,3 +562,598 @@ def test_when_select_and_bad_table_name_then_error(db):
         ".  Table name 'not_a_real_db' is not a known table for database "
         "'transactions'. Known tables are '['transactions']' "
     )
+
+
+@fixture
+def memory_db(db):
+    connection = sqlite3.connect(":memory:")
+    db._connections["transactions"] = connection
+    db._cursors["transactions"] = connection.cursor()
+    db._build_tables("transactions")
+    yield db
+    connection.close()
+
+
+def test_when_insert_many_and_dict_rows_then_rows_inserted(memory_db, insert_data):
+    second_row = dict(insert_data, tran_id="42070", narrative='the "good" tesla')
+
+    inserted = memory_db.insert_many(
+        "transactions", "transactions", [insert_data, second_row], batch_size=1
+    )
+
+    assert inserted == InsertResult(2, 0)
+    assert memory_db.select(
+        "transactions", "transactions", columns=["tran_id", "amount", "narrative"]
+    ) == [("42069", -135000, "sweet ass tesla"), ("42070", -135000, 'the "good" tesla')]
+
+
+def test_when_insert_many_and_tuple_rows_then_rows_inserted(memory_db):
+    rows = ((str(index), "bank", "account") for index in range(25))
+
+    inserted = memory_db.insert_many(
+        "transactions",
+        "transactions",
+        rows,
+        columns=["tran_id", "institution", "account"],
+        batch_size=10,
+    )
+
+    assert inserted == InsertResult(25, 0)
+    assert memory_db.select("transactions", "transactions", columns=["count(*)"]) == [
+        (25,)
+    ]
+
+
+def test_when_insert_many_and_tuple_rows_without_columns_then_error(memory_db):
+    with raises(DatabaseError) as raised_error:
+        memory_db.insert_many("transactions", "transactions", [("1", "bank")])
+    assert (
+        raised_error.value.args[0]
+        == "Exception occurred while inserting data into 'transactions.transactions'.  "
+        "Column names must be provided when inserting rows that are not dictionaries"
+    )
+
+
+def test_when_insert_many_and_no_rows_then_nothing_inserted(memory_db):
+    assert memory_db.insert_many("transactions", "transactions", []) == (0, 0)
+
+
+def test_when_insert_many_and_row_fails_then_no_rows_of_the_call_inserted(
+    memory_db, insert_data
+):
+    memory_db.insert("transactions", "transactions", insert_data)
+    new_row = dict(insert_data, tran_id="42070")
+
+    with raises(DatabaseError):
+        memory_db.insert_many(
+            "transactions", "transactions", [new_row, insert_data], batch_size=1
+        )
+
+    assert memory_db._connections["transactions"].in_transaction
+    assert memory_db.select("transactions", "transactions", columns=["tran_id"]) == [
+        ("42069",)
+    ]
+
+
+def test_when_insert_many_and_bad_table_name_then_error(db, insert_data):
+    with raises(DatabaseError) as raised_error:
+        db.insert_many("transactions", "not_a_real_db", [insert_data])
+    assert (
+        raised_error.value.args[0]
+        == "Exception occurred while inserting data into 'transactions.not_a_real_db'"
+        ".  Table name 'not_a_real_db' is not a known table for database "
+        "'transactions'. Known tables are '['transactions']' "
+    )
+
+
+@fixture
+def existing_row(memory_db, insert_data):
+    memory_db.insert("transactions", "transactions", insert_data)
+    return insert_data
+
+
+def select_narratives(db):
+    return db.select("transactions", "transactions", columns=["tran_id", "narrative"])
+
+
+def test_when_insert_many_and_ignore_then_existing_rows_skipped(
+    memory_db, existing_row
+):
+    rows = [
+        dict(existing_row, narrative="new narrative"),
+        dict(existing_row, tran_id="42070"),
+        dict(existing_row, tran_id="42070"),
+    ]
+
+    result = memory_db.insert_many(
+        "transactions", "transactions", rows, on_conflict="ignore"
+    )
+
+    assert result == InsertResult(inserted=1, skipped=2)
+    assert select_narratives(memory_db) == [
+        ("42069", "sweet ass tesla"),
+        ("42070", "sweet ass tesla"),
+    ]
+
+
+def test_when_insert_many_and_replace_then_existing_rows_replaced(
+    memory_db, existing_row
+):
+    rows = [
+        {
+            "institution": existing_row["institution"],
+            "account": existing_row["account"],
+            "tran_id": "42069",
+            "narrative": "new narrative",
+        }
+    ]
+
+    result = memory_db.insert_many(
+        "transactions", "transactions", rows, on_conflict="replace"
+    )
+
+    assert result == InsertResult(inserted=1, skipped=0)
+    assert memory_db.select(
+        "transactions", "transactions", columns=["narrative", "amount"]
+    ) == [("new narrative", None)]
+
+
+def test_when_insert_many_and_upsert_then_existing_rows_updated(
+    memory_db, existing_row
+):
+    rows = [
+        {
+            "institution": existing_row["institution"],
+            "account": existing_row["account"],
+            "tran_id": "42069",
+            "narrative": "new narrative",
+        },
+        {
+            "institution": existing_row["institution"],
+            "account": existing_row["account"],
+            "tran_id": "42070",
+            "narrative": "sweet ass tesla",
+        },
+    ]
+
+    result = memory_db.insert_many(
+        "transactions", "transactions", rows, on_conflict="upsert"
+    )
+
+    assert result == InsertResult(inserted=2, skipped=0)
+    assert memory_db.select(
+        "transactions", "transactions", columns=["tran_id", "narrative", "amount"]
+    ) == [("42069", "new narrative", -135000), ("42070", "sweet ass tesla", None)]
+
+
+def test_when_insert_many_and_upsert_only_key_columns_then_existing_rows_skipped(
+    memory_db, existing_row
+):
+    rows = [
+        {
+            "institution": existing_row["institution"],
+            "account": existing_row["account"],
+            "tran_id": "42069",
+        }
+    ]
+
+    result = memory_db.insert_many(
+        "transactions", "transactions", rows, on_conflict="upsert"
+    )
+
+    assert result == InsertResult(inserted=0, skipped=1)
+
+
+def test_when_insert_many_and_bad_conflict_policy_then_error(memory_db, insert_data):
+    with raises(DatabaseError) as raised_error:
+        memory_db.insert_many(
+            "transactions", "transactions", [insert_data], on_conflict="merge"
+        )
+    assert (
+        raised_error.value.args[0]
+        == "Exception occurred while inserting data into 'transactions.transactions'.  "
+        "Conflict policy 'merge' is unknown. Acceptable conflict policies are "
+        "'['ignore', 'replace', 'upsert']'"
+    )
+
+
+@fixture
+def select_db(memory_db):
+    rows = ((str(index), "bank", "account{}".format(index % 2)) for index in range(25))
+    memory_db.insert_many(
+        "transactions",
+        "transactions",
+        rows,
+        columns=["tran_id", "institution", "account"],
+    )
+    return memory_db
+
+
+def test_when_iter_select_then_rows_yielded_in_chunks(select_db):
+    connection = select_db._connections["transactions"]
+    cursor_spy = MagicMock(wraps=connection.cursor())
+    select_db._connections["transactions"] = MagicMock(wraps=connection)
+    select_db._connections["transactions"].cursor.return_value = cursor_spy
+
+    rows = select_db.iter_select(
+        "transactions",
+        "transactions",
+        columns=["tran_id", "account"],
+        where='account = "account1"',
+        chunk_size=5,
+    )
+
+    assert next(rows) == ("1", "account1")
+    assert cursor_spy.fetchmany.call_count == 1
+    assert sorted(list(rows)) == sorted(
+        (str(index), "account1") for index in range(3, 25, 2)
+    )
+    assert cursor_spy.fetchmany.mock_calls == [call(5)] * 4
+    select_db._connections["transactions"] = connection
+    cursor_spy.close.assert_called_once()
+
+
+def test_when_iter_select_and_namedtuple_then_named_rows_yielded(select_db):
+    rows = list(
+        select_db.iter_select(
+            "transactions",
+            "transactions",
+            columns=["min(tran_id) AS tran_id", "count(*)"],
+            row_type="namedtuple",
+        )
+    )
+
+    assert rows == [("0", 25)]
+    assert rows[0].tran_id == "0"
+    assert rows[0]._fields == ("tran_id", "_1")
+
+
+def test_when_iter_select_and_row_then_sqlite_rows_yielded(select_db):
+    rows = select_db.iter_select(
+        "transactions", "transactions", where='tran_id = "7"', row_type="row"
+    )
+    row = next(rows)
+
+    assert isinstance(row, sqlite3.Row)
+    assert row["tran_id"] == "7"
+    assert row["account"] == "account1"
+    assert list(rows) == []
+    assert select_db._cursors["transactions"].row_factory is None
+
+
+def test_when_iter_select_and_bad_row_type_then_error(select_db):
+    with raises(DatabaseError) as raised_error:
+        select_db.iter_select("transactions", "transactions", row_type="dict")
+    assert (
+        raised_error.value.args[0]
+        == "Exception occurred while selecting data from 'transactions.transactions'.  "
+        "Row type 'dict' is unknown. Acceptable row types are "
+        "'['tuple', 'namedtuple', 'row']'"
+    )
+
+
+def test_when_iter_select_and_bad_sql_then_error_raised_on_call(select_db):
+    with raises(DatabaseError) as raised_error:
+        select_db.iter_select("transactions", "transactions", where="no_column = 1")
+    assert (
+        raised_error.value.args[0]
+        == "Exception occurred while selecting data from 'transactions.transactions'.  "
+        "no such column: no_column"
+    )
+
+
+def select_index_columns(db):
+    return {
+        name: [
+            row[2]
+            for row in db._execute(
+                "transactions", "PRAGMA index_info({});".format(name)
+            ).fetchall()
+        ]
+        for (name,) in db._execute(
+            "transactions",
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL;",
+        ).fetchall()
+    }
+
+
+def test_when_build_tables_then_indexes_created(memory_db):
+    memory_db._build_tables("transactions")
+
+    assert select_index_columns(memory_db) == {
+        "transactions_date_posted": ["date_posted"],
+        "transactions_account_date_posted": [
+            "institution",
+            "account",
+            "date_posted",
+            "amount",
+        ],
+        "transactions_tran_type": ["tran_type", "date_posted"],
+    }
+
+
+def test_when_analyze_then_index_statistics_used_for_date_range(select_db):
+    select_db.analyze("transactions")
+    plan = select_db._execute(
+        "transactions",
+        "EXPLAIN QUERY PLAN SELECT sum(amount) FROM transactions WHERE institution = 'bank' "
+        "AND account = 'account1' AND date_posted BETWEEN '2019' AND '2020';",
+    ).fetchall()
+
+    assert select_db._execute(
+        "transactions", "SELECT count(*) FROM sqlite_stat1;"
+    ).fetchone()[0]
+    assert "USING COVERING INDEX transactions_account_date_posted" in plan[0][3]
+
+
+def test_when_analyze_and_bad_db_name_then_error(db):
+    with raises(DatabaseError) as raised_error:
+        db.analyze("not_a_real_db")
+    assert (
+        raised_error.value.args[0]
+        == "Exception occurred while analyzing database 'not_a_real_db'.  Database name "
+        "specified is not an acceptable PyFynance database. Acceptable PyFynance "
+        "databases include ['transactions']"
+    )
+
+
+def test_when_insert_and_value_has_quotes_then_value_bound(memory_db, insert_data):
+    memory_db.insert(
+        "transactions", "transactions", dict(insert_data, narrative='the "good" tesla')
+    )
+
+    assert memory_db.select(
+        "transactions", "transactions", columns=["narrative", "amount"]
+    ) == [('the "good" tesla', -135000)]
+
+
+def test_when_select_and_parameters_then_parameters_bound(select_db):
+    assert select_db.select(
+        "transactions",
+        "transactions",
+        columns=["tran_id"],
+        where="tran_id = ? AND account = ?",
+        parameters=("7", "account1"),
+    ) == [("7",)]
+    assert sorted(
+        select_db.iter_select(
+            "transactions",
+            "transactions",
+            columns=["tran_id"],
+            where="tran_id IN (?, ?)",
+            parameters=("7", "8"),
+        )
+    ) == [("7",), ("8",)]
+
+
+def test_when_same_statement_repeated_then_sql_cache_hit(memory_db, insert_data):
+    misses = memory_db.sql_cache_info().misses
+
+    for tran_id in ("1", "2", "3"):
+        memory_db.insert(
+            "transactions", "transactions", dict(insert_data, tran_id=tran_id)
+        )
+        memory_db.select(
+            "transactions", "transactions", where="tran_id = ?", parameters=(tran_id,)
+        )
+
+    assert memory_db.sql_cache_info() == SQLCacheInfo(
+        hits=4, misses=misses + 2, size=misses + 2, max_size=256
+    )
+
+
+def test_when_sql_cache_full_then_least_recently_used_statement_discarded(memory_db):
+    with Configuration.override({"database.sql_cache_size": 2}):
+        memory_db.select("transactions", "transactions", where="tran_id = '1'")
+        memory_db.select("transactions", "transactions", where="tran_id = '2'")
+        memory_db.select("transactions", "transactions", where="tran_id = '1'")
+        memory_db.select("transactions", "transactions", where="tran_id = '3'")
+
+        assert list(memory_db._sql_cache) == [
+            ("select", "transactions", None, "tran_id = '1'", None, False),
+            ("select", "transactions", None, "tran_id = '3'", None, False),
+        ]
+        assert memory_db.sql_cache_info().size == 2
+
+
+def test_when_select_and_predicate_then_parameterised_sql_executed(db, cursor_mock):
+    db._cursors["transactions"] = cursor_mock
+    where = And(Eq("account", 'the "good" account'), In("tran_id", ["1", "2"]))
+
+    db.select(
+        "transactions",
+        "transactions",
+        columns=["tran_id"],
+        where=where,
+        order_by=["-date_posted", "tran_id"],
+        limit=10,
+    )
+
+    cursor_mock.assert_has_calls(
+        [
+            call.execute(
+                "SELECT tran_id FROM transactions WHERE account = ? AND tran_id IN (?, ?) "
+                "ORDER BY date_posted DESC, tran_id LIMIT ?;",
+                ('the "good" account', "1", "2", 10),
+            ),
+            call.execute().fetchall(),
+        ]
+    )
+
+
+def test_when_select_and_predicate_then_rows_ordered_and_limited(select_db):
+    where = Or(Between("tran_id", "10", "13"), Eq("tran_id", "2"))
+
+    assert select_db.select(
+        "transactions",
+        "transactions",
+        columns=["tran_id"],
+        where=where,
+        order_by=["tran_id"],
+    ) == [("10",), ("11",), ("12",), ("13",), ("2",)]
+    assert list(
+        select_db.iter_select(
+            "transactions",
+            "transactions",
+            columns=["tran_id"],
+            where=where,
+            order_by=["-tran_id"],
+            limit=3,
+        )
+    ) == [("2",), ("13",), ("12",)]
+    assert select_db.select(
+        "transactions",
+        "transactions",
+        columns=["tran_id"],
+        order_by=["tran_id"],
+        limit=1,
+    ) == [("0",)]
+
+
+def test_when_select_and_predicate_with_parameters_then_error(db):
+    with raises(DatabaseError) as raised_error:
+        db.select(
+            "transactions", "transactions", where=Eq("tran_id", "1"), parameters=("1",)
+        )
+    assert (
+        raised_error.value.args[0]
+        == "Exception occurred while selecting data from 'transactions.transactions'.  "
+        "Parameters can only be provided with a where command, not a predicate"
+    )
+
+
+def test_when_select_and_bad_order_by_then_error(db):
+    with raises(DatabaseError) as raised_error:
+        db.select("transactions", "transactions", order_by=["-tran_id; DROP"])
+    assert (
+        raised_error.value.args[0]
+        == "Exception occurred while selecting data from 'transactions.transactions'.  "
+        "'tran_id; DROP' is not a valid column name"
+    )
+
+
+@fixture
+def pooled_db(file_db):
+    file_db.start_db("transactions", pooled=True)
+    yield file_db
+    if "transactions" in file_db._pools:
+        file_db._pools.pop("transactions").close()
+
+
+def test_when_start_db_pooled_then_reads_use_per_thread_query_only_connection(
+    pooled_db, insert_data
+):
+    pooled_db.insert("transactions", "transactions", insert_data)
+
+    reader = pooled_db._get_cursor("transactions")
+    assert reader is not pooled_db._cursors["transactions"]
+    assert pooled_db.select("transactions", "transactions", columns=["tran_id"]) == [
+        ("42069",)
+    ]
+    assert reader.execute("PRAGMA query_only;").fetchone() == (1,)
+    with raises(sqlite3.OperationalError):
+        reader.execute("DELETE FROM transactions;")
+
+
+def test_when_pooled_and_concurrent_reads_and_writes_then_no_errors(pooled_db):
+    errors = []
+    read_counts = []
+
+    def write_rows(start):
+        try:
+            for batch_start in range(start, start + 100, 20):
+                rows = [
+                    {"institution": "bank", "account": "account", "tran_id": str(index)}
+                    for index in range(batch_start, batch_start + 20)
+                ]
+                pooled_db.insert_many("transactions", "transactions", rows)
+        except Exception as e:
+            errors.append(e)
+
+    def read_rows():
+        try:
+            for _ in range(20):
+                read_counts.append(
+                    pooled_db.select(
+                        "transactions", "transactions", columns=["count(*)"]
+                    )[0][0]
+                )
+        except Exception as e:
+            errors.append(e)
+
+    threads = [
+        threading.Thread(target=write_rows, args=(start,)) for start in (0, 100, 200)
+    ]
+    threads += [threading.Thread(target=read_rows) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(read_counts) == 60
+    assert pooled_db.select("transactions", "transactions", columns=["count(*)"]) == [
+        (300,)
+    ]
+    assert len(pooled_db._pools["transactions"]._readers) == 4
+
+
+def test_when_stop_db_pooled_then_pool_closed_and_db_backed_up(pooled_db, insert_data):
+    os.makedirs(os.sep.join([pooled_db._config.paths.db_path, "backup"]))
+    pool = pooled_db._pools["transactions"]
+    pooled_db.insert("transactions", "transactions", insert_data)
+
+    pooled_db.stop_db("transactions", commit=True)
+
+    assert not pool.is_running()
+    assert pooled_db._pools == {}
+    assert pooled_db._get_backup_db_name("transactions").startswith("transactions_")
+
+
+def test_when_rollback_savepoint_then_rows_since_savepoint_removed(
+    memory_db, insert_data
+):
+    memory_db.insert("transactions", "transactions", insert_data)
+    memory_db.savepoint("transactions", "task")
+    memory_db.insert_many(
+        "transactions", "transactions", [dict(insert_data, tran_id="42070")]
+    )
+
+    memory_db.rollback_savepoint("transactions", "task")
+
+    assert memory_db._connections["transactions"].in_transaction
+    assert memory_db.select("transactions", "transactions", columns=["tran_id"]) == [
+        ("42069",)
+    ]
+
+
+def test_when_release_savepoint_then_rows_kept_and_not_committed(
+    memory_db, insert_data
+):
+    memory_db._connections["transactions"].commit()
+    memory_db.savepoint("transactions", "task")
+    memory_db.insert("transactions", "transactions", insert_data)
+
+    memory_db.release_savepoint("transactions", "task")
+
+    assert memory_db._connections["transactions"].in_transaction
+    memory_db._connections["transactions"].rollback()
+    assert memory_db.select("transactions", "transactions") == []
+
+
+def test_when_savepoint_and_bad_name_then_error(memory_db):
+    with raises(DatabaseError) as raised_error:
+        memory_db.savepoint("transactions", "task; DROP TABLE transactions")
+    assert raised_error.value.args[0].startswith(
+        "Exception occurred while creating savepoint 'task; DROP TABLE transactions' "
+        "of database 'transactions'."
+    )
+
+
+def test_when_savepoint_and_pooled_then_error(pooled_db):
+    with raises(DatabaseError) as raised_error:
+        pooled_db.savepoint("transactions", "task")
+    assert raised_error.value.args[0] == (
+        "Exception occurred while creating savepoint 'task' of database 'transactions'.  "
+        "Savepoints are not supported on pooled databases"
+    )
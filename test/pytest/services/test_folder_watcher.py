@@ -0,0 +1,87 @@
+import os
+
+from mock import patch
+from pytest import fixture, skip
+
+from core.config import Configuration
+from services.folder_watcher import FolderWatcher
+
+
+@fixture
+def watcher(tmp_path):
+    with Configuration.override(
+        {"daemon.settle_time": 2.0, "daemon.poll_interval": 5.0}
+    ):
+        folder_watcher = FolderWatcher(str(tmp_path), ["*.ofx"])
+        yield folder_watcher
+        folder_watcher.close()
+
+
+def write_file(tmp_path, name, content="<OFX>"):
+    path = str(tmp_path / name)
+    with open(path, "a") as ofx_file:
+        ofx_file.write(content)
+    return path
+
+
+def get_ready_files_at(watcher, now):
+    with patch("services.folder_watcher.time.monotonic", return_value=now):
+        return watcher.get_ready_files()
+
+
+def test_when_file_unchanged_for_settle_time_then_returned_once(watcher, tmp_path):
+    path = write_file(tmp_path, "first.ofx")
+    write_file(tmp_path, "ignored.csv")
+
+    assert get_ready_files_at(watcher, 100.0) == []
+    assert watcher.get_wait_time() == 2.0
+    assert get_ready_files_at(watcher, 102.0) == [path]
+    assert get_ready_files_at(watcher, 110.0) == []
+    assert watcher.get_wait_time() == 5.0
+
+
+def test_when_file_still_being_written_then_not_returned_until_settled(
+    watcher, tmp_path
+):
+    path = write_file(tmp_path, "first.ofx")
+    assert get_ready_files_at(watcher, 100.0) == []
+
+    write_file(tmp_path, "first.ofx", "<STMTTRN>")
+    assert get_ready_files_at(watcher, 101.5) == []
+    assert get_ready_files_at(watcher, 103.0) == []
+    assert get_ready_files_at(watcher, 103.5) == [path]
+
+
+def test_when_returned_file_removed_and_added_again_then_returned_again(
+    watcher, tmp_path
+):
+    path = write_file(tmp_path, "first.ofx")
+    get_ready_files_at(watcher, 100.0)
+    assert get_ready_files_at(watcher, 102.0) == [path]
+
+    os.remove(path)
+    assert get_ready_files_at(watcher, 103.0) == []
+    write_file(tmp_path, "first.ofx")
+    assert get_ready_files_at(watcher, 104.0) == []
+    assert get_ready_files_at(watcher, 106.0) == [path]
+
+
+def test_when_inotify_and_file_written_then_wait_ends_early(watcher, tmp_path):
+    if watcher._inotify_fd is None:
+        skip("inotify is not available")
+
+    assert watcher.wait(0) is False
+    write_file(tmp_path, "first.ofx")
+    assert watcher.wait(5) is True
+    assert watcher.wait(0) is False
+
+
+def test_when_inotify_disabled_then_folder_polled(tmp_path):
+    with Configuration.override({"daemon.use_inotify": False}):
+        folder_watcher = FolderWatcher(str(tmp_path), ["*.ofx"])
+
+    with patch("services.folder_watcher.time.sleep") as sleep_mock:
+        assert folder_watcher.wait(5) is False
+
+    assert folder_watcher._inotify_fd is None
+    sleep_mock.assert_called_once_with(5)
@@ -0,0 +1,73 @@
+from decimal import Decimal
+
+from pytest import mark, raises
+
+from core.exceptions import OFXParserError
+from services.ofx_amounts import (
+    cast_ofx_amount_to_minor_units,
+    get_currency_exponent,
+    minor_units_to_decimal,
+    stored_amount_to_decimal,
+)
+
+
+@mark.parametrize(
+    "value, exponent, expected",
+    [
+        ("-19.66", 2, -1966),
+        ("-0.40", 2, -40),
+        ("+12", 2, 1200),
+        (".5", 2, 50),
+        ("200.00", 2, 20000),
+        ("1500", 0, 1500),
+        ("1500.00", 0, 1500),
+        ("1.234", 3, 1234),
+    ],
+)
+def test_when_cast_ofx_amount_to_minor_units_then_integer_returned(
+    value, exponent, expected
+):
+    assert cast_ofx_amount_to_minor_units(value, exponent) == expected
+
+
+def test_when_cast_ofx_amount_to_minor_units_and_too_precise_then_raise_error():
+    with raises(OFXParserError) as error_msg:
+        cast_ofx_amount_to_minor_units("1.001")
+    assert error_msg.value.args[0] == "Amount '1.001' has more than 2 decimal places"
+
+
+@mark.parametrize("value", ["", "-", "1.2.3", "abc", "1,50"])
+def test_when_cast_ofx_amount_to_minor_units_and_invalid_then_raise_error(value):
+    with raises(OFXParserError) as error_msg:
+        cast_ofx_amount_to_minor_units(value)
+    assert error_msg.value.args[0] == "Amount '{}' is not a valid OFX amount".format(
+        value
+    )
+
+
+def test_when_minor_units_to_decimal_then_exact_decimal_returned():
+    assert minor_units_to_decimal(-1966) == Decimal("-19.66")
+    assert str(minor_units_to_decimal(20000)) == "200.00"
+    assert minor_units_to_decimal(1500, 0) == Decimal("1500")
+
+
+def test_when_get_currency_exponent_then_currency_or_default_returned():
+    exponents = {"default": 2, "JPY": 0}
+    assert get_currency_exponent("JPY", exponents) == 0
+    assert get_currency_exponent("AUD", exponents) == 2
+    assert get_currency_exponent(None, exponents) == 2
+
+
+@mark.parametrize(
+    "amount, exponent, expected",
+    [
+        (-1966, 2, Decimal("-19.66")),
+        (1500, 0, Decimal("1500")),
+        (-19.66, None, Decimal("-19.66")),
+        ("25000.60", None, Decimal("25000.60")),
+    ],
+)
+def test_when_stored_amount_to_decimal_then_exact_decimal_returned(
+    amount, exponent, expected
+):
+    assert stored_amount_to_decimal(amount, exponent) == expected
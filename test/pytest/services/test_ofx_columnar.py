@@ -0,0 +1,148 @@
+import io
+
+import numpy as np
+from mock import patch
+from pytest import fixture, raises
+
+from core.exceptions import OFXParserError
+from services.ofx_columnar import BankingTransactionColumnBuilder
+from services.ofx_tokenizer import OFXTokenizer
+
+
+@fixture
+def builder():
+    return BankingTransactionColumnBuilder(["CREDIT", "DEBIT"])
+
+
+@fixture
+def raw_ofx():
+    return """<OFX>
+<BANKTRANLIST>
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20190913101112
+<DTUSER>20190912
+<TRNAMT>-19.6
+<FITID>118896
+<MEMO>memo_txt
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>XFER
+<DTPOSTED>20190912
+<TRNAMT>200
+<FITID>717166
+<NAME>name_txt
+</STMTTRN>
+</BANKTRANLIST>
+</OFX>"""
+
+
+def build(builder, raw_ofx):
+    return builder.build(OFXTokenizer().iter_elements(io.StringIO(raw_ofx)))
+
+
+def test_when_build_then_columns_returned(builder, raw_ofx):
+    columns = build(builder, raw_ofx)
+
+    assert len(columns) == 2
+    assert columns.amount.dtype == np.int64
+    assert columns.amount.tolist() == [-1960, 20000]
+    assert columns.date_posted.tolist() == [
+        np.datetime64("2019-09-13T10:11:12", "s").item(),
+        np.datetime64("2019-09-12T00:00:00", "s").item(),
+    ]
+    assert str(columns.date_user[0]) == "2019-09-12T00:00:00"
+    assert np.isnat(columns.date_user[1])
+    assert columns.trn_type.dtype == np.int8
+    assert columns.trn_type.tolist() == [1, 2]
+    assert columns.trn_type_categories == ["CREDIT", "DEBIT", "XFER"]
+    assert columns.fitid.tolist() == ["118896", "717166"]
+    assert columns.name.tolist() == [None, "name_txt"]
+    assert columns.memo.tolist() == ["memo_txt", None]
+    assert columns.currency is None
+    assert columns.amount_exponent == 2
+
+
+def test_when_build_and_no_transactions_then_empty_columns_returned(builder):
+    columns = build(builder, "<OFX></OFX>")
+    assert len(columns) == 0
+    assert columns.amount.dtype == np.int64
+
+
+def test_when_build_and_missing_required_tag_then_raise_error(builder):
+    with raises(OFXParserError) as error_msg:
+        build(builder, "<STMTTRN><TRNTYPE>DEBIT<FITID>1<TRNAMT>1.00</STMTTRN>")
+    assert (
+        error_msg.value.args[0]
+        == "Transaction '1' is missing required tags '['dtposted']'"
+    )
+
+
+def test_when_build_and_currency_then_amounts_scaled_by_currency_exponent():
+    builder = BankingTransactionColumnBuilder(["DEBIT"], {"default": 2, "JPY": 0})
+    columns = build(
+        builder,
+        "<CURDEF>JPY<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20190913<TRNAMT>-1500<FITID>1</STMTTRN>",
+    )
+
+    assert columns.currency == "JPY"
+    assert columns.amount_exponent == 0
+    assert columns.amount.tolist() == [-1500]
+
+
+def test_when_build_and_amount_too_precise_then_raise_error(builder):
+    with raises(OFXParserError) as error_msg:
+        build(
+            builder,
+            "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20190913<TRNAMT>1.001<FITID>1</STMTTRN>",
+        )
+    assert error_msg.value.args[0] == "Amount '1.001' has more than 2 decimal places"
+
+
+def test_when_build_and_mixed_currencies_then_raise_error(builder):
+    with raises(OFXParserError) as error_msg:
+        build(builder, "<CURDEF>AUD<CURDEF>USD")
+    assert (
+        error_msg.value.args[0]
+        == "Statements of mixed currencies 'AUD' and 'USD' cannot be built into one set of columns"
+    )
+
+
+def make_trn_types_ofx(count):
+    return "<OFX>{}</OFX>".format(
+        "".join(
+            "<STMTTRN><TRNTYPE>TYPE{0}<DTPOSTED>20190912<TRNAMT>1<FITID>{0}"
+            "</STMTTRN>".format(index)
+            for index in range(count)
+        )
+    )
+
+
+def test_when_build_and_many_trn_types_then_codes_widened(builder):
+    columns = build(builder, make_trn_types_ofx(200))
+    data_frame = columns.to_dataframe()
+
+    assert columns.trn_type.dtype == np.int16
+    assert columns.trn_type.tolist() == list(range(2, 202))
+    assert data_frame["trn_type"].tolist()[-1] == "TYPE199"
+    assert np.shares_memory(data_frame["trn_type"].array.codes, columns.trn_type)
+
+
+def test_when_build_and_too_many_trn_types_then_raise_error(builder):
+    with patch("services.ofx_columnar._INT16_CATEGORY_LIMIT", 4):
+        with raises(OFXParserError) as error_msg:
+            build(builder, make_trn_types_ofx(3))
+    assert error_msg.value.args[0] == (
+        "Transaction '1' has trn_type 'TYPE1', but no more than 3 trn_types can be "
+        "built into one set of columns"
+    )
+
+
+def test_when_to_dataframe_then_columns_not_copied(builder, raw_ofx):
+    columns = build(builder, raw_ofx)
+    data_frame = columns.to_dataframe()
+
+    assert data_frame["fitid"].tolist() == ["118896", "717166"]
+    assert data_frame["trn_type"].tolist() == ["DEBIT", "XFER"]
+    assert np.shares_memory(data_frame["amount"].values, columns.amount)
+    assert np.shares_memory(data_frame["trn_type"].array.codes, columns.trn_type)
@@ -0,0 +1,57 @@
+import datetime
+
+import numpy as np
+from pytest import raises, mark
+
+from core.exceptions import OFXParserError
+from services.ofx_dates import (
+    cast_ofx_datetime,
+    cast_ofx_datetime_column,
+    date_cache_info,
+)
+
+
+@mark.parametrize(
+    "value, expected",
+    [
+        ("20190913", datetime.datetime(2019, 9, 13)),
+        ("201909131011", datetime.datetime(2019, 9, 13, 10, 11)),
+        ("20190913101112", datetime.datetime(2019, 9, 13, 10, 11, 12)),
+        ("20190913101112.5", datetime.datetime(2019, 9, 13, 10, 11, 12, 500000)),
+        (
+            "20190913101112.123[-5:EST]",
+            datetime.datetime(2019, 9, 13, 10, 11, 12, 123000),
+        ),
+        ("20190913101112[0:GMT]", datetime.datetime(2019, 9, 13, 10, 11, 12)),
+    ],
+)
+def test_when_cast_ofx_datetime_then_datetime_returned(value, expected):
+    assert cast_ofx_datetime(value) == expected
+
+
+@mark.parametrize(
+    "value",
+    ["", "2019091", "2019-09-13", "20191313", "20190913.5", "20190913101112[-5:EST"],
+)
+def test_when_cast_ofx_datetime_and_bad_value_then_raise_error(value):
+    with raises(OFXParserError) as error_msg:
+        cast_ofx_datetime(value)
+    assert error_msg.value.args[0].startswith(
+        "Value '{}' is not a valid OFX date".format(value)
+    )
+
+
+def test_when_cast_ofx_datetime_repeated_then_cache_hit():
+    cast_ofx_datetime("20010203")
+    hits = date_cache_info().hits
+    cast_ofx_datetime("20010203")
+    assert date_cache_info().hits == hits + 1
+
+
+def test_when_cast_ofx_datetime_column_then_datetime64_array_returned():
+    column = cast_ofx_datetime_column(["20190913101112", None, "20190913101112", ""])
+    assert column.dtype == np.dtype("datetime64[s]")
+    assert str(column[0]) == "2019-09-13T10:11:12"
+    assert column[0] == column[2]
+    assert np.isnat(column[1])
+    assert np.isnat(column[3])
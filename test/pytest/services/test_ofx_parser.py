@@ -1,4 +1,5 @@
 import datetime
+import types
 from decimal import Decimal
 
 from mock import patch, call, MagicMock, mock_open
@@ -72,6 +73,264 @@ def test_when_parse_and_banking_transactions_then_return_transations(
     assert transacions[1].fitid == "717166"
     assert transacions[1].name == "name_txt"
     assert transacions[1].trn_type == "CREDIT"
+    assert transacions[0].name is None
+    assert transacions[1].memo is None
+    assert transacions[0].date_user is None
+    assert not hasattr(transacions[0], "__dict__")
+
+
+@patch("os.path.isfile", return_value=True)
+def test_when_iter_parse_then_transactions_yielded_one_at_a_time(
+    isfile, ofx_parser, raw_ofx
+):
+    mock_open_obj = mock_open(read_data=raw_ofx)
+    with patch("builtins.open", mock_open_obj):
+        transactions = ofx_parser.iter_parse(
+            "banking_transactions", "fake/path/to/file.ofx"
+        )
+        assert isinstance(transactions, types.GeneratorType)
+        mock_open_obj.assert_not_called()
+
+        first_tran = next(transactions)
+        assert first_tran.fitid == "118896"
+        assert first_tran.amount == Decimal("-19.66")
+        second_tran = next(transactions)
+        assert second_tran.fitid == "717166"
+        assert second_tran.date_posted == datetime.datetime(2019, 9, 12, 0, 0, 0)
+        assert list(transactions) == []
+
+
+@patch("os.path.isfile", return_value=True)
+def test_when_parse_and_trusted_then_same_transactions_returned(
+    isfile, ofx_parser, raw_ofx
+):
+    with patch("builtins.open", mock_open(read_data=raw_ofx)):
+        validated = ofx_parser.parse("banking_transactions", "fake/path/to/file.ofx")
+    with patch("builtins.open", mock_open(read_data=raw_ofx)):
+        trusted = ofx_parser.parse(
+            "banking_transactions", "fake/path/to/file.ofx", trusted=True
+        )
+
+    assert trusted == validated
+    assert trusted[0].date_posted == datetime.datetime(2019, 9, 13, 0, 0, 0)
+    assert trusted[1].amount == Decimal("200.00")
+
+
+@patch("os.path.isfile", return_value=True)
+def test_when_parse_and_batch_smaller_than_file_then_all_transactions_returned(
+    isfile, ofx_parser, raw_ofx
+):
+    with Configuration.override({"ofx_parser.load_batch_size": 1}):
+        with patch("builtins.open", mock_open(read_data=raw_ofx)):
+            transactions = ofx_parser.parse(
+                "banking_transactions", "fake/path/to/file.ofx"
+            )
+        assert [tran.fitid for tran in transactions] == ["118896", "717166"]
+
+
+@patch("os.path.isfile", return_value=True)
+def test_when_parse_and_columnar_then_columns_returned(isfile, ofx_parser, raw_ofx):
+    with patch("builtins.open", mock_open(read_data=raw_ofx)):
+        columns = ofx_parser.parse(
+            "banking_transactions", "fake/path/to/file.ofx", output="columnar"
+        )
+
+    assert columns.amount.tolist() == [-1966, 20000]
+    assert columns.fitid.tolist() == ["118896", "717166"]
+    assert [columns.trn_type_categories[code] for code in columns.trn_type] == [
+        "DEBIT",
+        "CREDIT",
+    ]
+    assert str(columns.date_posted[1]) == "2019-09-12T00:00:00"
+
+
+@patch("os.path.isfile", return_value=True)
+def test_when_parse_and_minor_units_then_integer_amounts_returned(
+    isfile, ofx_parser, raw_ofx
+):
+    with Configuration.override({"ofx_parser.amount_format": "minor_units"}):
+        with patch("builtins.open", mock_open(read_data=raw_ofx)):
+            validated = ofx_parser.parse(
+                "banking_transactions", "fake/path/to/file.ofx"
+            )
+        with patch("builtins.open", mock_open(read_data=raw_ofx)):
+            trusted = ofx_parser.parse(
+                "banking_transactions", "fake/path/to/file.ofx", trusted=True
+            )
+
+        assert [tran.amount for tran in validated] == [-1966, 20000]
+        assert type(validated[0].amount) is int
+        assert [tran.amount_exponent for tran in validated] == [2, 2]
+        assert trusted == validated
+
+
+@patch("os.path.isfile", return_value=True)
+def test_when_parse_and_minor_units_then_statement_currency_exponent_used(
+    isfile, ofx_parser, raw_ofx
+):
+    with Configuration.override({"ofx_parser.amount_format": "minor_units"}):
+        raw_ofx = raw_ofx.replace("<STMTRS>", "<STMTRS>\n<CURDEF>JPY").replace(
+            "200.00", "200"
+        )
+        with patch("builtins.open", mock_open(read_data=raw_ofx)):
+            with raises(OFXParserError) as error_msg:
+                ofx_parser.parse("banking_transactions", "fake/path/to/file.ofx")
+        assert (
+            error_msg.value.args[0] == "Amount '-19.66' has more than 0 decimal places"
+        )
+
+
+def test_when_cast_amount_and_decimal_then_decimal_returned(ofx_parser):
+    assert ofx_parser._cast_amount("-19.660", "JPY") == Decimal("-19.660")
+
+
+@patch("os.path.isfile", return_value=True)
+def test_when_parse_and_cached_then_file_not_parsed(isfile, config):
+    parse_cache = MagicMock()
+    parse_cache.get.return_value = ["cached_transaction"]
+    ofx_parser = OFXParser(config, parse_cache)
+
+    with patch.object(ofx_parser, "iter_parse") as iter_parse_mock:
+        transactions = ofx_parser.parse("banking_transactions", "fake/path/file.ofx")
+
+    assert transactions == ["cached_transaction"]
+    iter_parse_mock.assert_not_called()
+    parse_cache.get_file_key.assert_called_once_with(
+        "fake/path/file.ofx", ofx_parser._get_cache_version("banking_transactions")
+    )
+    parse_cache.put.assert_not_called()
+
+
+@patch("os.path.isfile", return_value=True)
+def test_when_parse_and_not_cached_then_parsed_objects_cached(isfile, config, raw_ofx):
+    parse_cache = MagicMock()
+    parse_cache.get.return_value = None
+    ofx_parser = OFXParser(config, parse_cache)
+
+    with patch("builtins.open", mock_open(read_data=raw_ofx)):
+        transactions = ofx_parser.parse("banking_transactions", "fake/path/file.ofx")
+
+    assert [tran.fitid for tran in transactions] == ["118896", "717166"]
+    parse_cache.put.assert_called_once_with(
+        parse_cache.get_file_key.return_value, transactions
+    )
+
+
+def test_when_get_cache_version_and_amount_format_changes_then_version_changes(
+    ofx_parser
+):
+    version = ofx_parser._get_cache_version("banking_transactions")
+    with Configuration.override({"ofx_parser.amount_format": "minor_units"}):
+        assert ofx_parser._get_cache_version("banking_transactions") != version
+
+
+def test_when_get_cache_version_and_trusted_then_version_changes(ofx_parser):
+    assert ofx_parser._get_cache_version(
+        "banking_transactions", trusted=True
+    ) != ofx_parser._get_cache_version("banking_transactions")
+
+
+@fixture
+def large_ofx_path(tmp_path):
+    statements = []
+    for currency, amount in [("AUD", "-19.66"), ("JPY", "1500"), ("USD", "0.40")]:
+        transactions = "".join(
+            "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>201909{:02d}\n<TRNAMT>{}\n"
+            "<FITID>{}{}\n<NAME>name_txt\n</STMTTRN>\n".format(
+                index % 28 + 1, amount, currency, index
+            )
+            for index in range(50)
+        )
+        statements.append(
+            "<STMTRS>\n<CURDEF>{}\n<BANKTRANLIST>\n{}</BANKTRANLIST>\n"
+            "</STMTRS>\n".format(currency, transactions)
+        )
+    file_path = str(tmp_path / "large.ofx")
+    with open(file_path, "w") as ofx_file:
+        ofx_file.write("<OFX>\n{}</OFX>\n".format("".join(statements)))
+    return file_path
+
+
+def test_when_parse_with_workers_then_same_result_as_serial(ofx_parser, large_ofx_path):
+    with Configuration.override(
+        {"ofx_parser.amount_format": "minor_units", "ofx_parser.parallel_min_size": 0}
+    ):
+        serial = ofx_parser.parse("banking_transactions", large_ofx_path)
+
+        with patch.object(
+            ofx_parser,
+            "_parse_banking_transactions_parallel",
+            wraps=ofx_parser._parse_banking_transactions_parallel,
+        ) as parallel_mock:
+            with patch("os.cpu_count", return_value=3):
+                parallel = ofx_parser.parse(
+                    "banking_transactions", large_ofx_path, trusted=True, workers=4
+                )
+
+        parallel_mock.assert_called_once_with(large_ofx_path, True, 3)
+        assert len(serial) == 150
+        assert parallel == serial
+        assert [tran.amount for tran in parallel[49:52]] == [-1966, 1500, 1500]
+
+
+def test_when_parse_with_workers_and_file_below_min_size_then_parsed_serially(
+    ofx_parser, large_ofx_path
+):
+    with patch.object(
+        ofx_parser, "_parse_banking_transactions_parallel"
+    ) as parallel_mock:
+        transactions = ofx_parser.parse(
+            "banking_transactions", large_ofx_path, workers=4
+        )
+
+    parallel_mock.assert_not_called()
+    assert len(transactions) == 150
+
+
+def test_when_parse_with_workers_and_one_cpu_then_parsed_serially(
+    ofx_parser, large_ofx_path
+):
+    with Configuration.override({"ofx_parser.parallel_min_size": 0}):
+        with patch.object(
+            ofx_parser, "_parse_banking_transactions_parallel"
+        ) as parallel_mock:
+            with patch("os.cpu_count", return_value=1):
+                transactions = ofx_parser.parse(
+                    "banking_transactions", large_ofx_path, workers=4
+                )
+
+    parallel_mock.assert_not_called()
+    assert len(transactions) == 150
+
+
+def test_when_parse_and_bad_output_then_raise_error(ofx_parser):
+    with raises(OFXParserError) as error_msg:
+        ofx_parser.parse("banking_transactions", "fake/path/file.ofx", output="rows")
+    assert (
+        error_msg.value.args[0]
+        == "Output value 'rows' is unknown. Acceptable output values are "
+        "'['objects', 'columnar']'"
+    )
+
+
+def test_when_get_loader_then_loader_cached(ofx_parser):
+    loader = ofx_parser._get_loader("banking_transactions")
+    trusted_loader = ofx_parser._get_loader("banking_transactions", trusted=True)
+    assert ofx_parser._get_loader("banking_transactions") is loader
+    assert ofx_parser._get_loader("banking_transactions", trusted=True) is (
+        trusted_loader
+    )
+    assert loader is not trusted_loader
+
+
+def test_when_iter_parse_and_bad_object_type_then_raise_error_before_iteration(
+    ofx_parser
+):
+    with raises(OFXParserError) as error_msg:
+        ofx_parser.iter_parse("bad_object_type", "fake/path/to/file.ofx")
+    assert error_msg.value.args[0].startswith(
+        "Object_type value 'bad_object_type' is unknown."
+    )
 
 
 def test_when_parse_and_bad_object_type_then_raise_error(ofx_parser):
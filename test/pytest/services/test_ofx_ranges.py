@@ -0,0 +1,92 @@
+import io
+import mmap
+
+from mock import patch
+from pytest import fixture
+
+from services.ofx_ranges import (
+    MappedRange,
+    find_aggregate_ranges,
+    find_last_element_value,
+)
+
+
+@fixture
+def ofx_bytes():
+    return (
+        b"<OFX><STMTRS><CURDEF>AUD\n<BANKTRANLIST>"
+        + b"".join(
+            b"<STMTTRN><FITID>%d<TRNAMT>1.00</STMTTRN>\n" % index for index in range(10)
+        )
+        + b"</BANKTRANLIST></STMTRS><STMTRS><curdef>JPY<BANKTRANLIST>"
+        + b"<stmttrn><FITID>10<TRNAMT>100</stmttrn>"
+        + b"</BANKTRANLIST></STMTRS><STMTTRNRS></STMTTRNRS></OFX>"
+    )
+
+
+@fixture
+def mapped_file(ofx_bytes, tmp_path):
+    file_path = tmp_path / "statement.ofx"
+    file_path.write_bytes(ofx_bytes)
+    with open(str(file_path), "rb") as ofx_file:
+        with mmap.mmap(ofx_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+
+def test_when_find_aggregate_ranges_then_ranges_cover_file_and_start_on_aggregates(
+    mapped_file, ofx_bytes
+):
+    byte_ranges = find_aggregate_ranges(mapped_file, "stmttrn", 4)
+
+    assert len(byte_ranges) == 4
+    assert byte_ranges[0][0] == 0
+    assert byte_ranges[-1][1] == len(ofx_bytes)
+    for (_, end), (start, _) in zip(byte_ranges, byte_ranges[1:]):
+        assert end == start
+        assert ofx_bytes[start:].lower().startswith(b"<stmttrn>")
+
+
+def test_when_find_aggregate_ranges_and_more_parts_than_aggregates_then_ranges_merged(
+    mapped_file, ofx_bytes
+):
+    byte_ranges = find_aggregate_ranges(mapped_file, "stmttrn", 100)
+
+    assert len(byte_ranges) == 12
+    assert [start for start, _ in byte_ranges] == sorted(
+        {start for start, _ in byte_ranges}
+    )
+
+
+def test_when_find_aggregate_ranges_and_one_part_then_whole_file_returned(
+    mapped_file, ofx_bytes
+):
+    assert find_aggregate_ranges(mapped_file, "stmttrn", 1) == [(0, len(ofx_bytes))]
+
+
+def test_when_find_last_element_value_then_value_before_offset_returned(
+    mapped_file, ofx_bytes
+):
+    jpy_offset = ofx_bytes.index(b"<stmttrn>")
+    assert find_last_element_value(mapped_file, "curdef", 0) is None
+    assert find_last_element_value(mapped_file, "curdef", 30) == "AUD"
+    assert find_last_element_value(mapped_file, "curdef", jpy_offset) == "JPY"
+
+
+def test_when_find_last_element_value_and_mixed_case_then_value_returned(tmp_path):
+    file_path = tmp_path / "mixed.ofx"
+    file_path.write_bytes(b"<OFX><CurDef>USD\n<STMTTRN>" + b" " * 100 + b"<STMTTRN>")
+    with open(str(file_path), "rb") as ofx_file:
+        with mmap.mmap(ofx_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            with patch("services.ofx_ranges.SCAN_CHUNK_SIZE", 8):
+                assert find_last_element_value(mapped_file, "curdef", 120) == "USD"
+                assert find_last_element_value(mapped_file, "curdef", 10) is None
+
+
+def test_when_read_mapped_range_then_only_range_returned(mapped_file, ofx_bytes):
+    start = ofx_bytes.index(b"<STMTTRN>")
+    end = ofx_bytes.index(b"</STMTTRN>") + len(b"</STMTTRN>")
+
+    with io.TextIOWrapper(
+        io.BufferedReader(MappedRange(mapped_file, start, end))
+    ) as range_file:
+        assert range_file.read() == "<STMTTRN><FITID>0<TRNAMT>1.00</STMTTRN>"
@@ -0,0 +1,115 @@
+import io
+
+from pytest import fixture
+
+from services.ofx_tokenizer import OFXTokenizer
+
+
+@fixture
+def tokenizer():
+    return OFXTokenizer()
+
+
+@fixture
+def raw_ofx():
+    return """OFXHEADER:100
+DATA:OFXSGML
+VERSION:102
+
+<OFX>
+<BANKMSGSRSV1>
+<STMTTRNRS>
+<STMTRS>
+<BANKTRANLIST>
+<DTSTART>20190901
+<STMTTRN>
+<TRNTYPE>DEBIT
+<DTPOSTED>20190913000000
+<TRNAMT>-19.66
+<FITID>118896
+<MEMO>fish &amp; chips<br>
+</STMTTRN>
+<STMTTRN>
+<TRNTYPE>CREDIT
+<DTPOSTED>20190912000000
+<TRNAMT>200.00
+<FITID>717166
+<NAME>name_txt
+</STMTTRN>
+</BANKTRANLIST>
+</STMTRS>
+</STMTTRNRS>
+</BANKMSGSRSV1>
+</OFX>"""
+
+
+@fixture
+def expected_transactions():
+    return [
+        {
+            "trntype": "DEBIT",
+            "dtposted": "20190913000000",
+            "trnamt": "-19.66",
+            "fitid": "118896",
+            "memo": "fish & chips",
+        },
+        {
+            "trntype": "CREDIT",
+            "dtposted": "20190912000000",
+            "trnamt": "200.00",
+            "fitid": "717166",
+            "name": "name_txt",
+        },
+    ]
+
+
+def test_when_init_then_tokenizer_returned():
+    tokenizer = OFXTokenizer(chunk_size=10, ignore_tags=["BR"])
+    assert isinstance(tokenizer, OFXTokenizer)
+    assert tokenizer._chunk_size == 10
+    assert tokenizer._ignore_tags == {"br"}
+
+
+def test_when_iter_elements_then_header_skipped_and_values_stripped(tokenizer):
+    ofx_file = io.StringIO("OFXHEADER:100\n\n<OFX>\n<CODE>0 \n</OFX>")
+    elements = list(tokenizer.iter_elements(ofx_file))
+    assert elements == [(False, "ofx", ""), (False, "code", "0"), (True, "ofx", "")]
+
+
+def test_when_iter_aggregates_then_one_dict_per_aggregate(
+    raw_ofx, expected_transactions
+):
+    tokenizer = OFXTokenizer(ignore_tags=["br"])
+    transactions = tokenizer.iter_aggregates(io.StringIO(raw_ofx), "STMTTRN")
+    assert list(transactions) == expected_transactions
+
+
+def test_when_iter_aggregates_and_small_chunks_then_same_result(
+    raw_ofx, expected_transactions
+):
+    for chunk_size in [1, 2, 7, 64]:
+        tokenizer = OFXTokenizer(chunk_size=chunk_size, ignore_tags=["br"])
+        transactions = tokenizer.iter_aggregates(io.StringIO(raw_ofx), "stmttrn")
+        assert list(transactions) == expected_transactions
+
+
+def test_when_iter_aggregates_and_missing_closing_tags_then_aggregates_split(tokenizer):
+    ofx_file = io.StringIO("<STMTTRN><FITID>1<TRNAMT>1.00<STMTTRN><FITID>2<TRNAMT>2.00")
+    transactions = list(tokenizer.iter_aggregates(ofx_file, "stmttrn"))
+    assert transactions == [
+        {"fitid": "1", "trnamt": "1.00"},
+        {"fitid": "2", "trnamt": "2.00"},
+    ]
+
+
+def test_when_iter_aggregates_and_no_aggregates_then_nothing_returned(tokenizer):
+    ofx_file = io.StringIO("<OFX><SONRS><CODE>0</SONRS></OFX>")
+    assert list(tokenizer.iter_aggregates(ofx_file, "stmttrn")) == []
+
+
+def test_when_iter_aggregates_and_context_then_context_values_captured(tokenizer):
+    ofx_file = io.StringIO("<STMTRS><CURDEF>AUD<STMTTRN><FITID>1<CURDEF>USD</STMTTRN>")
+    context = {"curdef": None}
+    transactions = list(tokenizer.iter_aggregates(ofx_file, "stmttrn", context))
+    assert transactions == [{"fitid": "1", "curdef": "USD"}]
+    assert context == {"curdef": "AUD"}
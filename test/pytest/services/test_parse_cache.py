@@ -0,0 +1,94 @@
+import os
+import time
+
+from pytest import fixture
+
+from services.parse_cache import ParseCache
+
+
+@fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache")
+
+
+@fixture
+def cache(cache_path):
+    return ParseCache(cache_path, 1024 * 1024)
+
+
+@fixture
+def input_file(tmp_path):
+    file_path = str(tmp_path / "statement.ofx")
+    with open(file_path, "w") as input_file:
+        input_file.write("<OFX><STMTTRN><FITID>1</STMTTRN></OFX>")
+    return file_path
+
+
+def test_when_init_then_cache_directory_not_created(cache, cache_path):
+    assert not os.path.exists(cache_path)
+
+
+def test_when_get_and_not_cached_then_none_returned(cache):
+    assert cache.get("missing") is None
+
+
+def test_when_put_then_get_returns_equal_value(cache):
+    value = [{"fitid": "1", "amount": 1966}, {"fitid": "2", "amount": -40}]
+    cache.put("key", value)
+    assert cache.get("key") == value
+
+
+def test_when_get_file_key_then_key_depends_on_contents_and_version(
+    cache, input_file, tmp_path
+):
+    copy_path = str(tmp_path / "copy.ofx")
+    with open(input_file) as source, open(copy_path, "w") as dest:
+        dest.write(source.read())
+
+    key = cache.get_file_key(input_file, "v1")
+    assert len(key) == 64
+    assert cache.get_file_key(copy_path, "v1") == key
+    assert cache.get_file_key(input_file, "v2") != key
+
+    with open(copy_path, "a") as dest:
+        dest.write(" ")
+    assert cache.get_file_key(copy_path, "v1") != key
+
+
+def test_when_put_over_size_cap_then_least_recently_used_evicted(cache_path):
+    value = os.urandom(400)
+    cache = ParseCache(cache_path, 1000)
+    cache.put("first", value)
+    time.sleep(0.01)
+    cache.put("second", value)
+    time.sleep(0.01)
+    assert cache.get("first") == value
+    time.sleep(0.01)
+    cache.put("third", value)
+
+    assert cache.get("second") is None
+    assert cache.get("first") == value
+    assert cache.get("third") == value
+
+
+def test_when_put_and_value_larger_than_cap_then_not_stored(cache_path):
+    cache = ParseCache(cache_path, 10)
+    cache.put("key", os.urandom(100))
+    assert cache.get("key") is None
+
+
+def test_when_get_and_entry_corrupt_then_entry_removed(cache, cache_path):
+    cache.put("key", [1, 2, 3])
+    entry_path = os.sep.join([cache_path, "key.cache"])
+    with open(entry_path, "wb") as entry_file:
+        entry_file.write(b"not a cache entry")
+
+    assert cache.get("key") is None
+    assert not os.path.exists(entry_path)
+
+
+def test_when_clear_then_all_entries_removed(cache, cache_path):
+    cache.put("first", 1)
+    cache.put("second", 2)
+    cache.clear()
+    assert os.listdir(cache_path) == []
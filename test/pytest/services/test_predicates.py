@@ -0,0 +1,96 @@
+from pytest import mark, raises
+
+from core.exceptions import DatabaseError
+from services.predicates import (
+    And,
+    Between,
+    Compound,
+    Eq,
+    Ge,
+    Gt,
+    In,
+    Le,
+    Lt,
+    Ne,
+    Or,
+    Predicate,
+)
+
+
+@mark.parametrize(
+    "predicate, template, parameters",
+    [
+        (Eq("account", 'the "good" account'), "account = ?", ('the "good" account',)),
+        (Ne("tran_type", "DEBIT"), "tran_type != ?", ("DEBIT",)),
+        (Gt("amount", 0), "amount > ?", (0,)),
+        (Ge("amount", 0), "amount >= ?", (0,)),
+        (Lt("amount", 0), "amount < ?", (0,)),
+        (Le("amount", 0), "amount <= ?", (0,)),
+        (In("tran_id", ["1", "2"]), "tran_id IN (?, ?)", ("1", "2")),
+        (In("tran_id", []), "0 = 1", ()),
+        (
+            Between("date_posted", "20190101", "20191231"),
+            "date_posted BETWEEN ? AND ?",
+            ("20190101", "20191231"),
+        ),
+    ],
+)
+def test_when_compile_predicate_then_parameterised_template_returned(
+    predicate, template, parameters
+):
+    assert predicate.compile() == (template, parameters)
+
+
+def test_when_compile_nested_predicates_then_groups_parenthesised():
+    predicate = And(
+        Eq("institution", "bank"),
+        Or(Eq("account", "savings"), And(Eq("account", "cc"), Lt("amount", 0))),
+        Between("date_posted", "2019", "2020"),
+    )
+
+    assert predicate.compile() == (
+        "institution = ? AND (account = ? OR (account = ? AND amount < ?)) "
+        "AND date_posted BETWEEN ? AND ?",
+        ("bank", "savings", "cc", 0, "2019", "2020"),
+    )
+
+
+def test_when_predicates_have_same_values_then_equal():
+    assert And(Eq("account", "cc"), In("tran_id", ["1"])) == And(
+        Eq("account", "cc"), In("tran_id", ("1",))
+    )
+    assert Eq("account", "cc") != Ne("account", "cc")
+    assert repr(Eq("account", "cc")) == "Eq(column='account', value='cc')"
+
+
+@mark.parametrize("column", ["account; DROP TABLE transactions", "1account", "", None])
+def test_when_column_not_identifier_then_error(column):
+    with raises(DatabaseError) as raised_error:
+        Eq(column, "cc")
+    assert raised_error.value.args[0] == "'{}' is not a valid column name".format(
+        column
+    )
+
+
+def test_when_compound_predicate_empty_then_error():
+    with raises(DatabaseError) as raised_error:
+        Or()
+    assert raised_error.value.args[0] == "Or requires at least one predicate"
+
+
+def test_when_compound_predicates_then_and_and_or_are_distinct():
+    predicate = Or(Eq("account", "cc"), Eq("account", "savings"))
+
+    assert isinstance(predicate, Compound)
+    assert not isinstance(predicate, And)
+    assert predicate != And(Eq("account", "cc"), Eq("account", "savings"))
+
+
+def test_when_predicate_does_not_implement_compile_then_error():
+    class NoCompile(Predicate):
+        pass
+
+    with raises(TypeError):
+        Predicate()
+    with raises(TypeError):
+        NoCompile()
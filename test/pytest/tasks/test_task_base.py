@@ -3,7 +3,11 @@ import datetime
 from mock import patch
 from pytest import raises, fixture
 
+from core.config import Configuration
 from core.exceptions import TaskError
+from services.database import Database
+from services.file_system import FileSystem
+from services.parse_cache import ParseCache
 from tasks.task_base import BaseTask
 
 
@@ -45,3 +49,45 @@ def test_when_get_args_repr_then_correct_string_returned(args):
         task.get_args_repr()
         == "task_type=load_transactions, runtime=2015-02-14 10:11:12"
     )
+
+
+def test_when_init_then_services_not_created_until_used(args):
+    task = BaseTask(args)
+    assert task._services == {}
+
+    db = task._db
+    assert isinstance(db, Database)
+    assert task._db is db
+    assert list(task._services) == ["db"]
+
+
+def test_when_service_deleted_then_new_service_created_on_next_use(args):
+    task = BaseTask(args)
+    fs = task._fs
+
+    del task._fs
+    assert isinstance(task._fs, FileSystem)
+    assert task._fs is not fs
+
+
+def test_when_init_with_services_then_services_shared_between_tasks(args):
+    services = {}
+    first_task = BaseTask(args, services)
+    second_task = BaseTask(args, services)
+
+    assert first_task._fs is second_task._fs
+    assert services == {"fs": first_task._fs}
+
+
+def test_when_parse_cache_disabled_by_default_then_no_parse_cache(args):
+    assert BaseTask(args)._parse_cache is None
+
+
+def test_when_parse_cache_enabled_then_parse_cache_created(args, tmp_path):
+    with Configuration.override(
+        {
+            "ofx_parser.parse_cache_enabled": True,
+            "paths.parse_cache_path": str(tmp_path / "cache"),
+        }
+    ):
+        assert isinstance(BaseTask(args)._parse_cache, ParseCache)
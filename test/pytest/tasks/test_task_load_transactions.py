@@ -1,12 +1,21 @@
 import datetime
 import os
+import sqlite3
 from decimal import Decimal
 
 from mock import MagicMock, patch, call
-from pytest import fixture, raises
+from pytest import fixture, mark, raises
 
+from core.config import Configuration
 from core.exceptions import TaskLoadTransactionsError
-from tasks.task_load_transactions import LoadTransactionsTask
+from schemas.model import BankingTransaction
+from services.database import InsertResult
+from services.ofx_amounts import stored_amount_to_decimal
+from services.ofx_parser import OFXParser
+from services.parse_cache import ParseCache
+from services.predicates import And, Eq
+from tasks import task_load_transactions
+from tasks.task_load_transactions import LoadTransactionsTask, _init_parse_worker
 
 
 @fixture
@@ -24,24 +33,31 @@ def args():
 
 @fixture
 def task(args):
-    with patch(
-        "os.path.abspath",
-        MagicMock(
-            return_value=os.sep.join(
-                ["BASE", "REPO", "PATH", "PyFynance", "core", "config.py"]
-            )
-        ),
+    with Configuration.override(
+        {"paths.input_path": os.sep.join(["BASE", "REPO", "PATH", "input"])}
     ):
-        return LoadTransactionsTask(args)
+        yield LoadTransactionsTask(args)
 
 
 @fixture
 def tran01():
-    tran = MagicMock(spec=["fitid", "trn_type", "amount", "name", "date_posted"])
+    tran = MagicMock(
+        spec=[
+            "fitid",
+            "trn_type",
+            "amount",
+            "amount_exponent",
+            "name",
+            "memo",
+            "date_posted",
+        ]
+    )
     tran.fitid = "tran0001"
     tran.trn_type = "CREDIT"
     tran.amount = Decimal(-69.10)
+    tran.amount_exponent = None
     tran.name = "xbox.com.au subscription"
+    tran.memo = None
     tran.date_posted = datetime.datetime(2019, 9, 24, 20, 37, 12)
     return tran
 
@@ -54,6 +70,7 @@ def tran01_data():
         "tran_id": "tran0001",
         "tran_type": "CREDIT",
         "amount": Decimal(-69.10),
+        "amount_exponent": None,
         "narrative": "xbox.com.au subscription",
         "date_posted": "20190924203712",
         "date_processed": "20150214101112",
@@ -62,10 +79,22 @@ def tran01_data():
 
 @fixture
 def tran02():
-    tran = MagicMock(spec=["fitid", "trn_type", "amount", "memo", "date_posted"])
+    tran = MagicMock(
+        spec=[
+            "fitid",
+            "trn_type",
+            "amount",
+            "amount_exponent",
+            "name",
+            "memo",
+            "date_posted",
+        ]
+    )
     tran.fitid = "tran0002"
     tran.trn_type = "DEBIT"
     tran.amount = Decimal(150000000.00)
+    tran.amount_exponent = None
+    tran.name = None
     tran.memo = "powerball winnings"
     tran.date_posted = datetime.datetime(2019, 9, 13, 21, 42, 55)
     return tran
@@ -79,6 +108,7 @@ def tran02_data():
         "tran_id": "tran0002",
         "tran_type": "DEBIT",
         "amount": Decimal(150000000.00),
+        "amount_exponent": None,
         "narrative": "powerball winnings",
         "date_posted": "20190913214255",
         "date_processed": "20150214101112",
@@ -88,11 +118,20 @@ def tran02_data():
 @fixture
 def tran03():
     tran = MagicMock(
-        spec=["fitid", "trn_type", "amount", "name", "memo", "date_posted"]
+        spec=[
+            "fitid",
+            "trn_type",
+            "amount",
+            "amount_exponent",
+            "name",
+            "memo",
+            "date_posted",
+        ]
     )
     tran.fitid = "tran0003"
     tran.trn_type = "CREDIT"
     tran.amount = Decimal(25000.60)
+    tran.amount_exponent = None
     tran.name = "Company co."
     tran.memo = "fortnightly pay"
     tran.date_posted = datetime.datetime(2019, 9, 24, 18, 0, 0)
@@ -107,6 +146,7 @@ def tran03_data():
         "tran_id": "tran0003",
         "tran_type": "CREDIT",
         "amount": Decimal(25000.60),
+        "amount_exponent": None,
         "narrative": "Company co. - fortnightly pay",
         "date_posted": "20190924180000",
         "date_processed": "20150214101112",
@@ -115,12 +155,12 @@ def tran03_data():
 
 @fixture
 def tran_no_name_memo():
-    tran = MagicMock(spec=["fitid", "trn_type", "amount", "date_posted"])
-    tran.fitid = "tran0003"
-    tran.trn_type = "CREDIT"
-    tran.amount = Decimal(25000.60)
-    tran.date_posted = datetime.datetime(2019, 9, 24, 18, 0, 0)
-    return tran
+    return BankingTransaction(
+        trn_type="CREDIT",
+        date_posted=datetime.datetime(2019, 9, 24, 18, 0, 0),
+        amount=Decimal("25000.60"),
+        fitid="tran0003",
+    )
 
 
 @fixture
@@ -150,111 +190,143 @@ def test_when_repr_then_correct_str_returned(task):
 def test_when_before_task_then_correct_methods_called(task):
     with patch.object(task, "_db", return_value=MagicMock()) as db_mock:
         task.before_task()
-    db_mock.assert_has_calls([call.start_db("transactions")])
+    db_mock.assert_has_calls([call.start_db("transactions", profile="bulk_load")])
 
 
-def test_when_do_task_and_no_trans_in_db_then_load_correct_trans(
-    task, transactions, tran01_data, tran02_data, tran03_data
-):
+@fixture
+def task_db(task):
+    connection = sqlite3.connect(":memory:")
+    task._db._connections["transactions"] = connection
+    task._db._cursors["transactions"] = connection.cursor()
+    task._db._build_tables("transactions")
+    yield task._db
+    connection.close()
+
+
+def do_task_with_transactions(task, transactions):
     files_to_parse = [os.sep.join(["C:", "fake", "path", "file1.ofx"])]
     with patch("core.helpers.find_all_files", return_value=files_to_parse):
         with patch("services.ofx_parser.OFXParser.parse", return_value=transactions):
-            with patch("shutil.move", MagicMock()):
-                with patch("services.database.Database.select", return_value=[]):
-                    with patch(
-                        "services.database.Database.insert", MagicMock()
-                    ) as db_insert_mock:
-                        task.do_task()
+            task.do_task()
+
+
+def select_tran_ids(db):
+    where = And(Eq("institution", "MyBank"), Eq("account", "CreditCard"))
+    return [
+        row[0]
+        for row in db.select(
+            "transactions",
+            "transactions",
+            columns=["tran_id"],
+            where=where,
+            order_by=["tran_id"],
+        )
+    ]
+
+
+def test_when_do_task_and_no_trans_in_db_then_load_correct_trans(
+    task, transactions, tran01_data, tran02_data, tran03_data
+):
+    with patch(
+        "services.database.Database.insert_many",
+        MagicMock(return_value=InsertResult(3, 0)),
+    ) as db_insert_mock:
+        do_task_with_transactions(task, transactions)
     assert task._transactions == transactions
-    db_insert_mock.assert_has_calls(
-        [
-            call("transactions", "transactions", tran01_data),
-            call("transactions", "transactions", tran02_data),
-            call("transactions", "transactions", tran03_data),
-        ]
+    db_insert_mock.assert_called_once_with(
+        "transactions",
+        "transactions",
+        [tran01_data, tran02_data, tran03_data],
+        on_conflict="ignore",
     )
 
 
+def test_when_do_task_and_minor_unit_amounts_then_exact_integers_stored(task, task_db):
+    transactions = [
+        BankingTransaction(
+            trn_type="DEBIT",
+            date_posted=datetime.datetime(2019, 9, 14, 12, 0, 0),
+            amount=amount,
+            fitid=fitid,
+            name="name",
+            amount_exponent=2,
+        )
+        for fitid, amount in [("tran0001", -6910), ("tran0002", 1999), ("tran0003", 1)]
+    ]
+    do_task_with_transactions(task, transactions)
+
+    rows = task_db._execute(
+        "transactions",
+        "SELECT typeof(amount), typeof(amount_exponent) FROM transactions",
+    ).fetchall()
+    assert set(rows) == {("integer", "integer")}
+    (total, exponent), = task_db._execute(
+        "transactions", "SELECT SUM(amount), MAX(amount_exponent) FROM transactions"
+    ).fetchall()
+    assert total == -4910
+    assert stored_amount_to_decimal(total, exponent) == Decimal("-49.10")
+
+
 def test_when_do_task_and_some_trans_in_db_then_load_correct_trans(
-    task, transactions, tran01_data, tran02_data, tran03_data
+    task, task_db, transactions, tran02_data
 ):
-    files_to_parse = [os.sep.join(["C:", "fake", "path", "file1.ofx"])]
-    with patch("core.helpers.find_all_files", return_value=files_to_parse):
-        with patch("services.ofx_parser.OFXParser.parse", return_value=transactions):
-            with patch("shutil.move", MagicMock()):
-                with patch(
-                    "services.database.Database.select",
-                    return_value=[("MyBank", "CreditCard", "tran0002")],
-                ):
-                    with patch(
-                        "services.database.Database.insert", MagicMock()
-                    ) as db_insert_mock:
-                        task.do_task()
-    assert task._transactions == [transactions[0], transactions[2]]
-    db_insert_mock.assert_has_calls(
-        [
-            call("transactions", "transactions", tran01_data),
-            call("transactions", "transactions", tran03_data),
-        ]
-    )
-    assert (
-        call("transactions", "transactions", tran02_data)
-        not in db_insert_mock.mock_calls
+    task_db.insert("transactions", "transactions", dict(tran02_data, narrative="old"))
+
+    with patch.object(task._logger, "info") as info_mock:
+        do_task_with_transactions(task, transactions)
+
+    assert select_tran_ids(task_db) == ["tran0001", "tran0002", "tran0003"]
+    assert task_db.select(
+        "transactions",
+        "transactions",
+        columns=["narrative"],
+        where="tran_id = 'tran0002'",
+    ) == [("old",)]
+    info_mock.assert_any_call(
+        "Loaded 2 new transactions, skipped 1 transactions already processed"
     )
 
 
 def test_when_do_task_and_all_trans_in_db_then_load_no_trans(
-    task, transactions, tran01_data, tran02_data, tran03_data
+    task, task_db, transactions
 ):
-    files_to_parse = [os.sep.join(["C:", "fake", "path", "file1.ofx"])]
-    with patch("core.helpers.find_all_files", return_value=files_to_parse):
-        with patch("services.ofx_parser.OFXParser.parse", return_value=transactions):
-            with patch("shutil.move", MagicMock()):
-                with patch(
-                    "services.database.Database.select",
-                    return_value=[
-                        ("MyBank", "CreditCard", "tran0001"),
-                        ("MyBank", "CreditCard", "tran0002"),
-                        ("MyBank", "CreditCard", "tran0003"),
-                    ],
-                ):
-                    with patch(
-                        "services.database.Database.insert", MagicMock()
-                    ) as db_insert_mock:
-                        task.do_task()
-    assert task._transactions == []
-    assert (
-        call("transactions", "transactions", tran01_data)
-        not in db_insert_mock.mock_calls
-    )
-    assert (
-        call("transactions", "transactions", tran02_data)
-        not in db_insert_mock.mock_calls
-    )
-    assert (
-        call("transactions", "transactions", tran03_data)
-        not in db_insert_mock.mock_calls
+    do_task_with_transactions(task, transactions)
+    task._transactions = []
+    task._input_files = []
+    with patch.object(task._logger, "info") as info_mock:
+        do_task_with_transactions(task, transactions)
+
+    assert select_tran_ids(task_db) == ["tran0001", "tran0002", "tran0003"]
+    info_mock.assert_any_call(
+        "Loaded 0 new transactions, skipped 3 transactions already processed"
     )
 
 
+@mark.parametrize("analyze_min_rows, analyzed", [(3, True), (4, False)])
+def test_when_do_task_then_db_analyzed_after_large_loads(
+    task, task_db, transactions, analyze_min_rows, analyzed
+):
+    with Configuration.override({"database.analyze_min_rows": analyze_min_rows}):
+        with patch.object(task_db, "analyze", wraps=task_db.analyze) as analyze_mock:
+            do_task_with_transactions(task, transactions)
+
+        assert analyze_mock.called is analyzed
+
+
 def test_when_do_task_and_tran_no_name_memo_then_raise_error(task, tran_no_name_memo):
     files_to_parse = [os.sep.join(["C:", "fake", "path", "file1.ofx"])]
     error_msg = (
-        "Transaction does not have a memo or name attribute.  The transaction has the following attributes "
-        "'dict_keys(['_mock_return_value', '_mock_parent', '_mock_name', '_mock_new_name', "
-        "'_mock_new_parent', '_mock_sealed', '_spec_class', '_spec_set', '_spec_signature', '_mock_methods', "
-        "'_mock_children', '_mock_wraps', '_mock_delegate', '_mock_called', '_mock_call_args', "
-        "'_mock_call_count', '_mock_call_args_list', '_mock_mock_calls', 'method_calls', '_mock_unsafe', "
-        "'_mock_side_effect', 'fitid', 'trn_type', 'amount', 'date_posted'])'"
+        "Transaction does not have a memo or name value.  The transaction is "
+        "'BankingTransaction(trn_type='CREDIT', date_posted=datetime.datetime(2019, 9, 24, 18, 0), "
+        "date_user=None, amount=Decimal('25000.60'), fitid='tran0003', name=None, memo=None, "
+        "amount_exponent=None)'"
     )
     with patch("core.helpers.find_all_files", return_value=files_to_parse):
         with patch(
             "services.ofx_parser.OFXParser.parse", return_value=[tran_no_name_memo]
         ):
-            with patch("shutil.move", MagicMock()):
-                with patch("services.database.Database.select", return_value=[]):
-                    with raises(TaskLoadTransactionsError) as raised_error:
-                        task.do_task()
+            with raises(TaskLoadTransactionsError) as raised_error:
+                task.do_task()
     assert error_msg in raised_error.value.args[0]
 
 
@@ -304,3 +376,131 @@ def test_when_do_task_and_no_files_then_raise_error(task, tran_no_name_memo):
         with raises(TaskLoadTransactionsError) as raised_error:
             task.do_task()
     assert error_msg in raised_error.value.args[0]
+
+
+def test_when_input_files_arg_set_then_only_those_files_parsed(task):
+    task._args.input_files = ["landing/first.ofx", "landing/second.qfx"]
+
+    with patch("core.helpers.find_all_files") as find_all_files_mock:
+        task._get_files_to_parse()
+
+    find_all_files_mock.assert_not_called()
+    assert task._input_files == ["landing/first.ofx", "landing/second.qfx"]
+
+
+def test_when_input_glob_arg_set_then_only_matching_files_found(task):
+    task._args.input_glob = "cc_*.ofx"
+
+    with patch(
+        "core.helpers.find_all_files", return_value=["landing/cc_first.ofx"]
+    ) as find_all_files_mock:
+        task._get_files_to_parse()
+
+    assert find_all_files_mock.call_args.args[1] == ["cc_*.ofx"]
+    assert task._input_files == ["landing/cc_first.ofx"]
+
+
+@fixture
+def cached_task(task, tmp_path):
+    task._parse_cache = ParseCache(str(tmp_path / "cache"), 1024 * 1024)
+    task._ofx_parser = OFXParser(task._config, task._parse_cache)
+    return task
+
+
+@fixture
+def input_files(tmp_path):
+    resource_path = os.sep.join(
+        [
+            Configuration().paths.test_path,
+            "resources",
+            "task_execution_load_transactions",
+            "input_files",
+        ]
+    )
+    file_paths = []
+    for file_name in ["bankaus_debit.qfx", "mybank_cc.ofx", "some_trans.ofx"]:
+        file_path = str(tmp_path / file_name)
+        with open(os.sep.join([resource_path, file_name])) as source:
+            with open(file_path, "w") as dest:
+                dest.write(source.read())
+        file_paths.append(file_path)
+    return file_paths
+
+
+def test_when_load_transactions_with_workers_then_same_order_as_serial(
+    cached_task, input_files
+):
+    task = cached_task
+    with patch("core.helpers.find_all_files", return_value=input_files):
+        task._load_transactions_from_file()
+        serial_transactions = task._transactions
+        task._transactions = []
+        task._input_files = []
+        task._args.workers = 3
+        task._load_transactions_from_file()
+
+    assert len(serial_transactions) > 0
+    assert task._transactions == serial_transactions
+
+
+def test_when_init_parse_worker_then_parser_uses_task_config(cached_task):
+    task = cached_task
+    with patch.object(task_load_transactions, "_worker_ofx_parser", None):
+        _init_parse_worker(task._config, task._parse_cache)
+        ofx_parser = task_load_transactions._worker_ofx_parser
+
+    assert ofx_parser._config is task._config
+    assert ofx_parser._parse_cache is task._parse_cache
+
+
+def test_when_load_transactions_with_workers_and_bad_file_then_raise_error(
+    cached_task, input_files, tmp_path
+):
+    task = cached_task
+    bad_file = str(tmp_path / "bad.ofx")
+    with open(bad_file, "w") as ofx_file:
+        ofx_file.write(
+            "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>bad<TRNAMT>1<FITID>1</STMTTRN>"
+        )
+
+    task._args.workers = 2
+    with patch("core.helpers.find_all_files", return_value=input_files + [bad_file]):
+        with raises(TaskLoadTransactionsError) as raised_error:
+            task._load_transactions_from_file()
+
+    assert raised_error.value.args[0] == (
+        "Failed to parse 1 input file(s).  '{}': Value 'bad' is not a valid OFX "
+        "date".format(bad_file)
+    )
+    assert task._input_files == input_files + [bad_file]
+
+
+def test_when_load_transactions_and_files_fail_then_all_failures_reported(task):
+    files_to_parse = ["file1.ofx", "file2.ofx"]
+    with patch("core.helpers.find_all_files", return_value=files_to_parse):
+        with patch(
+            "services.ofx_parser.OFXParser.parse", side_effect=ValueError("bad file")
+        ):
+            with raises(TaskLoadTransactionsError) as raised_error:
+                task._load_transactions_from_file()
+
+    assert raised_error.value.args[0] == (
+        "Failed to parse 2 input file(s).  'file1.ofx': bad file  'file2.ofx': bad file"
+    )
+
+
+def test_when_load_transactions_again_then_transactions_served_from_cache(
+    cached_task, input_files
+):
+    with patch("core.helpers.find_all_files", return_value=input_files):
+        cached_task._load_transactions_from_file()
+        parsed_transactions = cached_task._transactions
+        cached_task._transactions = []
+        cached_task._input_files = []
+        with patch(
+            "services.ofx_parser.OFXParser.iter_parse", MagicMock()
+        ) as iter_parse_mock:
+            cached_task._load_transactions_from_file()
+
+    iter_parse_mock.assert_not_called()
+    assert cached_task._transactions == parsed_transactions